@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+ALICE Command Line
+One entry point for the pipeline stages; each subcommand imports its stage module (and
+pandas/geopandas/openpyxl with it) only when it runs, so --help and stats start instantly
+"""
+
+import sys
+import json
+import argparse
+import importlib
+from pathlib import Path
+
+# Subcommand -> (module, entry function, help); modules are imported on dispatch only
+COMMANDS = {
+    'scrape': ('alice_data_scraper', 'main', "Download the state ALICE data sheets"),
+    'consolidate': ('alice_data_consolidator', 'main', "Consolidate state workbooks into master CSVs"),
+    'clean': ('alice_data_cleaner', 'create_clean_datasets', "Build the cleaned mapping datasets"),
+    'integrate-tiger': ('alice_tiger_integration', 'main', "Join ALICE data to TIGER boundaries"),
+    'integrate-census': ('alice_census_integration', 'main', "Add ACS demographics and analytics"),
+    'publish': ('alice_publish', 'main', "Publish content-hashed data assets for the pages"),
+    'tiles': ('alice_tiles', 'main', "Seed or serve raster choropleth tiles"),
+    'factsheets': ('alice_factsheets', 'main', "Render county fact sheets from the Census dataset"),
+    'watch': ('alice_watch', 'main', "Rebuild changed states as new workbooks arrive"),
+}
+
+# Stages that parse their own arguments; the rest take none
+PASSTHROUGH_COMMANDS = {'publish', 'tiles', 'factsheets', 'watch'}
+
+# Summary statistics written by the integrators, read by `alice stats`
+STATS_FILES = {
+    'tiger': Path('alice_tiger_output') / 'alice_integration_stats.json',
+    'census': Path('alice_census_output') / 'alice_census_stats.json',
+}
+
+# Modules that must not be imported to show help or stats (checked by alice_benchmark.py)
+HEAVY_MODULES = ['pandas', 'numpy', 'geopandas', 'pyogrio', 'shapely', 'openpyxl', 'requests', 'scipy']
+
+# Wall-clock budget for `alice --help` and `alice stats`, in seconds
+STARTUP_BUDGET_S = 0.25
+
+def _flatten(stats, prefix=''):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+def show_stats(args):
+    """Print the integrators' summary statistics without loading any data"""
+    root = Path(args.root)
+    found = {name: json.loads((root / path).read_text()) for name, path in STATS_FILES.items()
+             if (root / path).exists()}
+    if not found:
+        print("No statistics yet; run `alice integrate-tiger` or `alice integrate-census` first")
+        return 1
+
+    if args.json:
+        print(json.dumps(found, indent=2))
+        return 0
+
+    for name, stats in found.items():
+        print(f"\n{name.upper()} ({STATS_FILES[name]})")
+        for key, value in _flatten(stats):
+            if isinstance(value, float):
+                value = f"{value:,.2f}"
+            print(f"  {key:<45} {value}")
+    return 0
+
+def run_stage(command, argv):
+    """Import the stage module and run its entry point with the remaining arguments"""
+    module_name, function, _ = COMMANDS[command]
+    # Stage modules that parse their own arguments see `alice <command> ...`
+    sys.argv = [f"alice {command}"] + argv
+    module = importlib.import_module(module_name)
+    result = getattr(module, function)()
+    return result if isinstance(result, int) else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='alice', description="ALICE data pipeline")
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    for command, (_, _, help_text) in COMMANDS.items():
+        # Passthrough stages print their own --help once imported
+        subparsers.add_parser(command, help=help_text, description=help_text,
+                              add_help=command not in PASSTHROUGH_COMMANDS)
+
+    stats_parser = subparsers.add_parser('stats', help="Show summary statistics from the last integration")
+    stats_parser.add_argument('--root', default='.', help="Directory holding the output folders")
+    stats_parser.add_argument('--json', action='store_true', help="Print raw JSON")
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, remaining = parser.parse_known_args(argv)
+
+    if remaining and args.command not in PASSTHROUGH_COMMANDS:
+        parser.error(f"unrecognized arguments: {' '.join(remaining)}")
+    if args.command == 'stats':
+        return show_stats(args)
+    return run_stage(args.command, remaining)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+// Resolves the data files the ALICE pages fetch to their published, content-hashed URLs.
+// alice_published/alice_manifest.json is written by alice_publish.py; without it (local
+// development, unpublished checkouts) the original paths are fetched unchanged.
+(function () {
+    const MANIFEST_URL = 'alice_published/alice_manifest.json';
+    let manifestPromise = null;
+
+    function loadManifest() {
+        if (!manifestPromise) {
+            manifestPromise = fetch(MANIFEST_URL, { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => null);
+        }
+        return manifestPromise;
+    }
+
+    async function aliceAssetUrl(path) {
+        const manifest = await loadManifest();
+        const key = path.replace(/^\.\//, '');
+        const entry = manifest && manifest.assets && manifest.assets[key];
+        return entry ? entry.url : path;
+    }
+
+    async function aliceFetch(path, options) {
+        return fetch(await aliceAssetUrl(path), options);
+    }
+
+    function keyString(value) {
+        const text = String(value);
+        return text.endsWith('.0') ? text.slice(0, -2) : text;
+    }
+
+    // Same semantics as alice_delta.apply_patch: data is a FeatureCollection or an
+    // array of row objects parsed from the CSV
+    function aliceApplyPatch(data, patch) {
+        const geojson = data && data.type === 'FeatureCollection';
+        const rows = geojson ? data.features : data;
+        const props = row => geojson ? row.properties : row;
+
+        const index = new Map();
+        rows.forEach(row => index.set(keyString(props(row)[patch.key]), row));
+        patch.removed.forEach(key => index.delete(key));
+
+        const updated = new Map();
+        index.forEach((row, key) => {
+            const properties = {};
+            patch.columns.forEach(column => { properties[column] = props(row)[column]; });
+            updated.set(key, geojson ? { ...row, properties } : properties);
+        });
+        Object.entries(patch.changed).forEach(([column, values]) => {
+            Object.entries(values).forEach(([key, value]) => {
+                if (!updated.has(key)) throw new Error(`Patch does not fit this release: ${key} missing`);
+                props(updated.get(key))[column] = value;
+            });
+        });
+        Object.entries(patch.geometry).forEach(([key, geometry]) => { updated.get(key).geometry = geometry; });
+        patch.added.forEach(row => updated.set(keyString(props(row)[patch.key]), row));
+
+        const order = patch.order || Array.from(updated.keys());
+        const result = order.map(key => updated.get(key));
+        return geojson ? { ...data, features: result } : result;
+    }
+
+    // Bring a cached copy ({sha256, data}) up to date, downloading only the delta patch
+    // when the manifest has one from the cached release; parse turns a full download
+    // into data (defaults to JSON)
+    async function aliceFetchUpdate(path, cached, parse = response => response.json()) {
+        const manifest = await loadManifest();
+        const entry = manifest && manifest.assets && manifest.assets[path.replace(/^\.\//, '')];
+        if (!entry) {
+            return { sha256: null, data: await parse(await fetch(path)) };
+        }
+        if (cached && cached.sha256 === entry.sha256) {
+            return cached;
+        }
+        const patch = cached && entry.patches && entry.patches[cached.sha256];
+        if (patch) {
+            try {
+                const response = await fetch(patch.url);
+                if (response.ok) {
+                    return { sha256: entry.sha256, data: aliceApplyPatch(cached.data, await response.json()) };
+                }
+            } catch (error) {
+                console.warn('Delta patch failed, downloading the full file:', error);
+            }
+        }
+        return { sha256: entry.sha256, data: await parse(await fetch(entry.url)) };
+    }
+
+    // Raster choropleth tiles from alice_tiles.py, when the page is opened with
+    // ?tiles=<base>: either the seeded tile directory (alice_tiger_output/tiles) or a
+    // running `alice tiles serve`. Returns null without ?tiles= so pages draw vectors.
+    function aliceTileBase() {
+        return new URLSearchParams(window.location.search).get('tiles');
+    }
+
+    async function aliceTileLayer(layer, metric, method = 'page') {
+        const base = aliceTileBase();
+        if (!base) return null;
+        const prefix = `${base.replace(/\/$/, '')}/${layer}/${metric}/${method}`;
+        const response = await fetch(`${prefix}/legend.json`, { cache: 'no-cache' });
+        if (!response.ok) {
+            console.warn(`No ${layer} tiles for ${metric}; drawing vectors instead`);
+            return null;
+        }
+        const legend = await response.json();
+        const options = { opacity: 1, maxZoom: 18 };
+        if (legend.max_zoom != null) {
+            // Static tiles stop at the seeded zoom; Leaflet scales them up beyond it
+            options.maxNativeZoom = legend.max_zoom;
+        }
+        const tiles = L.tileLayer(`${prefix}/${legend.version}/{z}/{x}/{y}.png`, options);
+        tiles.legend = legend;
+        return tiles;
+    }
+
+    window.aliceAssetUrl = aliceAssetUrl;
+    window.aliceFetch = aliceFetch;
+    window.aliceApplyPatch = aliceApplyPatch;
+    window.aliceFetchUpdate = aliceFetchUpdate;
+    window.aliceTileBase = aliceTileBase;
+    window.aliceTileLayer = aliceTileLayer;
+})();
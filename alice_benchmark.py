@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+ALICE Pipeline Benchmarks
+Times every pipeline stage on synthetic state workbooks, TIGER-like boundaries and ACS
+responses at 1x/10x/100x scale, tracking wall time and peak RSS against stored baselines
+"""
+
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+import resource
+import tempfile
+import subprocess
+import statistics
+import multiprocessing
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+import logging
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path("alice_benchmark_output") / "baselines.json"
+
+# Roughly the size of the real inputs at 1x: 51 state sheets, ~62 counties each
+STATE_FIPS = [
+    '01', '02', '04', '05', '06', '08', '09', '10', '11', '12', '13', '15', '16', '17', '18', '19', '20',
+    '21', '22', '23', '24', '25', '26', '27', '28', '29', '30', '31', '32', '33', '34', '35', '36', '37',
+    '38', '39', '40', '41', '42', '44', '45', '46', '47', '48', '49', '50', '51', '53', '54', '55', '56'
+]
+BASE_COUNTIES_PER_STATE = 62
+BASE_SUBCOUNTY_PER_STATE = 500
+YEARS = [2019, 2021, 2022, 2023]
+VERTICES_PER_COUNTY = 200
+
+# County FIPS codes are 3 digits, so county counts cap out per state; larger scales still grow
+# the subcounty sheets, the long-format time series and everything downstream of them
+MAX_COUNTIES_PER_STATE = 999
+
+STAGES = [
+    'consolidate', 'clean', 'tiger_join', 'web_geojson', 'census_integrate'
+]
+
+# Fraction slower (or larger) than baseline that counts as a regression
+REGRESSION_TOLERANCE = 0.25
+
+# `alice` invocations held to alice.STARTUP_BUDGET_S without importing alice.HEAVY_MODULES
+STARTUP_COMMANDS = [['--help'], ['stats']]
+STARTUP_RUNS = 5
+
+def counties_per_state(scale):
+    return min(BASE_COUNTIES_PER_STATE * scale, MAX_COUNTIES_PER_STATE)
+
+def generate_state_workbooks(workdir, scale, seed=42):
+    """Write synthetic ALICE state data sheets with County and Subcounty sheets"""
+    rng = np.random.default_rng(seed)
+    input_dir = workdir / "alice_state_data"
+    input_dir.mkdir(parents=True, exist_ok=True)
+
+    n_counties = counties_per_state(scale)
+    n_subcounty = BASE_SUBCOUNTY_PER_STATE * scale
+
+    for state_fips in STATE_FIPS:
+        state_name = f"State {state_fips}"
+
+        county_rows = len(YEARS) * n_counties
+        households = rng.integers(1000, 500000, county_rows)
+        poverty = (households * rng.uniform(0.05, 0.25, county_rows)).astype(int)
+        alice = (households * rng.uniform(0.15, 0.35, county_rows)).astype(int)
+        county_df = pd.DataFrame({
+            'State': state_name,
+            'Year': np.repeat(YEARS, n_counties),
+            'GEO id2': np.tile([float(f"{state_fips}{i + 1:03d}") for i in range(n_counties)], len(YEARS)),
+            'GEO display_label': np.tile([f"County {i + 1}, {state_name}" for i in range(n_counties)], len(YEARS)),
+            'County': np.tile([f"County {i + 1}" for i in range(n_counties)], len(YEARS)),
+            'State Abbr': f"S{state_fips}",
+            'Households': households,
+            'Poverty Households': poverty,
+            'ALICE Households': alice,
+            'Above ALICE Households': households - poverty - alice,
+            'ALICE Threshold - HH under 65': rng.uniform(40000, 90000, county_rows).round(),
+            'ALICE Threshold - HH 65 years and over': rng.uniform(35000, 80000, county_rows).round()
+        })
+
+        sub_rows = len(YEARS) * n_subcounty
+        sub_households = rng.integers(50, 50000, sub_rows)
+        sub_poverty = (sub_households * rng.uniform(0.05, 0.25, sub_rows)).astype(int)
+        sub_alice = (sub_households * rng.uniform(0.15, 0.35, sub_rows)).astype(int)
+        subcounty_df = pd.DataFrame({
+            'State': state_name,
+            'Year': np.repeat(YEARS, n_subcounty),
+            'Type': np.tile(rng.choice(['Place', 'County Subdivision'], n_subcounty), len(YEARS)),
+            'GEO id2': np.tile([float(f"{state_fips}{i + 1:05d}") for i in range(n_subcounty)], len(YEARS)),
+            'GEO display_label': np.tile([f"Place {i + 1}, {state_name}" for i in range(n_subcounty)], len(YEARS)),
+            'Households': sub_households,
+            'Poverty Households': sub_poverty,
+            'ALICE Households': sub_alice,
+            'Above ALICE Households': sub_households - sub_poverty - sub_alice,
+            'County': np.tile([f"County {i % n_counties + 1}" for i in range(n_subcounty)], len(YEARS))
+        })
+
+        workbook = input_dir / f"2025_ALICE_State_{state_fips}_Data_Sheet.xlsx"
+        with pd.ExcelWriter(workbook, engine='openpyxl') as writer:
+            county_df.to_excel(writer, sheet_name='County', index=False)
+            subcounty_df.to_excel(writer, sheet_name='Subcounty', index=False)
+
+    logger.info(f"Generated {len(STATE_FIPS)} workbooks at {scale}x ({n_counties} counties, {n_subcounty} subcounty areas per state)")
+    return input_dir
+
+def generate_county_boundaries(workdir, scale, seed=42):
+    """Write a TIGER-like cb_2023_us_county_500k.zip of jittered polygons on a grid"""
+    import geopandas as gpd
+    from shapely.geometry import Polygon
+
+    rng = np.random.default_rng(seed)
+    n_counties = counties_per_state(scale)
+    angles = np.linspace(0, 2 * np.pi, VERTICES_PER_COUNTY, endpoint=False)
+
+    records = []
+    geometries = []
+    for s, state_fips in enumerate(STATE_FIPS):
+        for i in range(n_counties):
+            cx, cy = -125 + (i % 40) * 0.5, 25 + s * 0.5 + (i // 40) * 0.02
+            radius = 0.2 * (1 + rng.uniform(-0.15, 0.15, VERTICES_PER_COUNTY))
+            geometries.append(Polygon(np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])))
+            records.append({
+                'STATEFP': state_fips,
+                'COUNTYFP': f"{i + 1:03d}",
+                'GEOID': f"{state_fips}{i + 1:03d}",
+                'NAME': f"County {i + 1}",
+                'STUSPS': f"S{state_fips}",
+                'ALAND': int(rng.integers(1e8, 1e10)),
+                'AWATER': int(rng.integers(0, 1e9))
+            })
+
+    gdf = gpd.GeoDataFrame(records, geometry=geometries, crs='EPSG:4269')
+
+    shp_dir = workdir / "shp_build"
+    shp_dir.mkdir(exist_ok=True)
+    gdf.to_file(shp_dir / "cb_2023_us_county_500k.shp")
+
+    tiger_dir = workdir / "data" / "tiger"
+    tiger_dir.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(tiger_dir / "cb_2023_us_county_500k.zip", 'w') as zip_ref:
+        for component in shp_dir.iterdir():
+            zip_ref.write(component, component.name)
+
+    logger.info(f"Generated {len(gdf)} TIGER-like county boundaries at {scale}x")
+    return tiger_dir
+
+def generate_acs_response(workdir, scale, seed=42):
+    """Write a synthetic Census API county response in the API's list-of-lists layout"""
+    from alice_census_integration import ACS_VARIABLES
+
+    rng = np.random.default_rng(seed)
+    n_counties = counties_per_state(scale)
+    variables = list(ACS_VARIABLES)
+
+    rows = [variables + ['state', 'county']]
+    for state_fips in STATE_FIPS:
+        values = rng.integers(0, 500000, (n_counties, len(variables)))
+        for i in range(n_counties):
+            rows.append([str(v) for v in values[i]] + [state_fips, f"{i + 1:03d}"])
+
+    response_path = workdir / "acs_response.json"
+    with open(response_path, 'w') as f:
+        json.dump(rows, f)
+
+    logger.info(f"Generated synthetic ACS response with {len(rows) - 1} counties at {scale}x")
+    return response_path
+
+@contextmanager
+def working_directory(path):
+    """Run a stage from inside the synthetic workspace (several stages use relative paths)"""
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def peak_rss_mb():
+    """Peak resident set size of this process in megabytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def _run_stage(stage, workdir, result_queue):
+    """Child process entry point: set up a stage's inputs, time it, then persist its outputs"""
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    with working_directory(workdir):
+        if stage == 'consolidate':
+            from alice_data_consolidator import ALICEDataConsolidator
+            consolidator = ALICEDataConsolidator()
+            start = time.perf_counter()
+            consolidator.process_all_files()
+            elapsed = time.perf_counter() - start
+            # Later stages read the master CSVs
+            consolidator.output_dir.mkdir(exist_ok=True)
+            consolidator.master_county.to_csv(consolidator.output_dir / "ALICE_Master_County_Data.csv", index=False)
+            consolidator.master_subcounty.to_csv(consolidator.output_dir / "ALICE_Master_Subcounty_Data.csv", index=False)
+
+        elif stage == 'clean':
+            from alice_data_cleaner import create_clean_datasets
+            with open(os.devnull, 'w') as devnull, mock.patch('sys.stdout', devnull):
+                start = time.perf_counter()
+                create_clean_datasets()
+                elapsed = time.perf_counter() - start
+
+        elif stage == 'tiger_join':
+            from alice_tiger_integration import ALICETigerIntegrator
+            integrator = ALICETigerIntegrator()
+            start = time.perf_counter()
+            gdf = integrator.create_county_choropleth_data()
+            elapsed = time.perf_counter() - start
+            # The census stage reads the joined GeoJSON
+            integrator.save_choropleth_data(gdf, format_types=['geojson'])
+
+        elif stage == 'web_geojson':
+            from alice_tiger_integration import ALICETigerIntegrator
+            integrator = ALICETigerIntegrator()
+            gdf = integrator.create_county_choropleth_data()
+            start = time.perf_counter()
+            integrator.create_web_ready_geojson(gdf)
+            elapsed = time.perf_counter() - start
+
+        elif stage == 'census_integrate':
+            from alice_census_integration import ALICECensusIntegrator
+            with open("acs_response.json") as f:
+                acs_rows = json.load(f)
+            response = mock.Mock()
+            response.json.return_value = acs_rows
+            response.raise_for_status.return_value = None
+            integrator = ALICECensusIntegrator()
+            with mock.patch('alice_census_integration.requests.get', return_value=response):
+                start = time.perf_counter()
+                integrator.integrate_all_data()
+                elapsed = time.perf_counter() - start
+
+        else:
+            raise ValueError(f"Unknown stage: {stage}")
+
+    result_queue.put({'wall_s': elapsed, 'peak_rss_mb': peak_rss_mb()})
+
+def run_stage(stage, workdir):
+    """Run one stage in a fresh process so its peak RSS isn't polluted by earlier stages"""
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=_run_stage, args=(stage, str(workdir), result_queue))
+    process.start()
+    process.join()
+
+    if process.exitcode != 0:
+        raise RuntimeError(f"Benchmark stage {stage} failed with exit code {process.exitcode}")
+    return result_queue.get()
+
+def run_benchmarks(scales, stages=STAGES, keep_workdir=None):
+    """Generate synthetic inputs per scale and time each stage in order"""
+    results = {}
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"alice_bench_{scale}x_") as temp_dir:
+            workdir = Path(keep_workdir) / f"{scale}x" if keep_workdir else Path(temp_dir)
+            workdir.mkdir(parents=True, exist_ok=True)
+
+            logger.info(f"Generating synthetic inputs at {scale}x in {workdir}")
+            generate_state_workbooks(workdir, scale)
+            generate_county_boundaries(workdir, scale)
+            generate_acs_response(workdir, scale)
+
+            for stage in stages:
+                key = f"{stage}@{scale}x"
+                results[key] = run_stage(stage, workdir)
+                logger.info(f"{key}: {results[key]['wall_s']:.2f}s, peak RSS {results[key]['peak_rss_mb']:.0f} MB")
+
+    return results
+
+def measure_cli_startup(runs=STARTUP_RUNS):
+    """Median wall time of each light `alice` command, plus the heavy modules it imported"""
+    import alice
+
+    script = Path(__file__).resolve().parent / "alice.py"
+    results = {}
+    for command in STARTUP_COMMANDS:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(script)] + command, capture_output=True, check=False)
+            timings.append(time.perf_counter() - start)
+
+        # One more run under -X importtime to see what got loaded
+        traced_run = subprocess.run([sys.executable, '-X', 'importtime', str(script)] + command,
+                                    capture_output=True, text=True, check=False)
+        imported = {line.rsplit('|', 1)[-1].strip().split('.')[0]
+                    for line in traced_run.stderr.splitlines() if line.startswith('import time:')}
+        results[' '.join(command)] = {
+            'wall_s': statistics.median(timings),
+            'heavy_imports': sorted(imported & set(alice.HEAVY_MODULES))
+        }
+    return results
+
+def check_cli_startup(startup, budget):
+    """Return the (command, problem) pairs that broke the startup budget"""
+    failures = []
+    for command, metrics in startup.items():
+        if metrics['wall_s'] > budget:
+            failures.append((command, f"{metrics['wall_s']:.3f}s over the {budget:.3f}s budget"))
+        if metrics['heavy_imports']:
+            failures.append((command, f"imports {', '.join(metrics['heavy_imports'])}"))
+    return failures
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Return the (key, metric, baseline, current) tuples that regressed beyond tolerance"""
+    regressions = []
+    for key, metrics in results.items():
+        if key not in baseline:
+            continue
+        for metric in ['wall_s', 'peak_rss_mb']:
+            if metrics[metric] > baseline[key][metric] * (1 + tolerance):
+                regressions.append((key, metric, baseline[key][metric], metrics[metric]))
+    return regressions
+
+def main():
+    """Run the benchmark suite and check it against the stored baselines"""
+    parser = argparse.ArgumentParser(description="Benchmark the ALICE pipeline on synthetic data")
+    parser.add_argument('--scales', default='1,10', help="Comma-separated scale factors (e.g. 1,10,100)")
+    parser.add_argument('--stages', default=','.join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--keep-workdir', help="Keep the synthetic inputs and outputs under this directory")
+    parser.add_argument('--startup-only', action='store_true', help="Only check the `alice` CLI startup budget")
+    args = parser.parse_args()
+
+    from alice import STARTUP_BUDGET_S
+    startup = measure_cli_startup()
+    startup_failures = check_cli_startup(startup, STARTUP_BUDGET_S)
+
+    print("\n" + "="*70)
+    print(f"ALICE CLI STARTUP (budget {STARTUP_BUDGET_S:.2f}s)")
+    print("="*70)
+    for command, metrics in startup.items():
+        heavy = ', '.join(metrics['heavy_imports']) or 'none'
+        print(f"alice {command:<22} {metrics['wall_s']:>10.3f}s   heavy imports: {heavy}")
+    if startup_failures:
+        print("\nStartup budget exceeded:")
+        for command, problem in startup_failures:
+            print(f"  alice {command}: {problem}")
+    if args.startup_only:
+        sys.exit(1 if startup_failures else 0)
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    stages = args.stages.split(',')
+    results = run_benchmarks(scales, stages, keep_workdir=args.keep_workdir)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    regressions = compare_to_baseline(results, baseline)
+
+    print("\n" + "="*70)
+    print("ALICE PIPELINE BENCHMARKS")
+    print("="*70)
+    print(f"{'Stage':<28} {'Wall (s)':>10} {'Baseline':>10} {'Peak RSS':>10} {'Baseline':>10}")
+    for key, metrics in results.items():
+        base = baseline.get(key, {})
+        base_wall = f"{base['wall_s']:.2f}" if base else '-'
+        base_rss = f"{base['peak_rss_mb']:.0f}MB" if base else '-'
+        print(f"{key:<28} {metrics['wall_s']:>10.2f} {base_wall:>10} {metrics['peak_rss_mb']:>8.0f}MB {base_rss:>10}")
+    print("="*70)
+
+    if args.save_baseline:
+        baseline.update(results)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(baseline, indent=2))
+        print(f"Saved baseline to {baseline_path}")
+
+    if regressions:
+        print("\nRegressions:")
+        for key, metric, base_value, value in regressions:
+            print(f"  {key} {metric}: {base_value:.2f} -> {value:.2f}")
+    if regressions or startup_failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,100 +5,141 @@ Joins ALICE data with comprehensive Census ACS demographic data
 """
 
 import os
+import time
+import hashlib
 import pandas as pd
-import geopandas as gpd
-import zipfile
-import tempfile
 import json
 import requests
 from pathlib import Path
 import logging
 
+import alice_schema
+from alice_correlations import ALICECorrelationAnalytics
+from alice_similarity import ALICESimilarityIndex
+from alice_scenarios import ACS_BRACKET_VARIABLES, ALICEScenarioEngine, UNDER_65_THRESHOLD, SENIOR_THRESHOLD
+from alice_tracing import StageTracer, traced
+from alice_geojson import write_geojson
+from alice_snapshot import save_snapshot
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Key demographic variables from ACS 5-Year estimates
+ACS_VARIABLES = {
+    'B01003_001E': 'Total_Population',
+    'B25001_001E': 'Total_Housing_Units',
+    'B25003_002E': 'Owner_Occupied_Housing',
+    'B25003_003E': 'Renter_Occupied_Housing',
+    'B19013_001E': 'Median_Household_Income',
+    'B25077_001E': 'Median_Home_Value',
+    'B08303_001E': 'Total_Commuters',
+    'B08301_021E': 'Work_From_Home',
+    'B15003_022E': 'Bachelors_Degree',
+    'B15003_023E': 'Masters_Degree',
+    'B15003_024E': 'Professional_Degree',
+    'B15003_025E': 'Doctorate_Degree',
+    'B02001_002E': 'White_Alone',
+    'B02001_003E': 'Black_Alone',
+    'B02001_004E': 'Native_American_Alone',
+    'B02001_005E': 'Asian_Alone',
+    'B02001_006E': 'Pacific_Islander_Alone',
+    'B02001_007E': 'Other_Race_Alone',
+    'B02001_008E': 'Two_Or_More_Races',
+    'B03001_003E': 'Hispanic_Latino',
+    'B01001_002E': 'Male_Population',
+    'B01001_026E': 'Female_Population',
+    'B01001_003E': 'Under_5_Years',
+    'B01001_020E': 'Age_65_To_74',
+    'B01001_021E': 'Age_75_To_84',
+    'B01001_022E': 'Age_85_Plus',
+    'B08006_008E': 'No_Vehicle_Available',
+    'B08006_002E': 'One_Vehicle_Available',
+    'B08006_014E': 'Three_Plus_Vehicles',
+    'B27001_005E': 'No_Health_Insurance_Under_19',
+    'B27001_008E': 'No_Health_Insurance_19_34',
+    'B27001_011E': 'No_Health_Insurance_35_64',
+    'C17002_002E': 'Income_Under_50_Poverty',
+    'C17002_003E': 'Income_50_99_Poverty',
+    'B23025_005E': 'Unemployed',
+    # Household income brackets (all households and householder 65+) for threshold scenarios
+    **ACS_BRACKET_VARIABLES
+}
+
+# The Census API accepts at most 50 variables per request
+ACS_MAX_VARIABLES = 45
+
+ACS_BASE_URL = "https://api.census.gov/data/2022/acs/acs5"
+
+# A published ACS vintage never changes, so fetched responses are reused for this long
+ACS_CACHE_MAX_AGE_DAYS = 30
+
+# Key demographics kept in the web-optimized GeoJSON
+CENSUS_WEB_COLUMNS = [
+    'GEOID', 'NAME', 'State', 'County',
+    'Households', 'Total_Population', 'Population_Per_Household',
+    'ALICE_Percentage', 'Poverty_Percentage', 'ALICE_Population', 'Poverty_Population',
+    'Median_Household_Income', 'Median_Home_Value',
+    'College_Degree_Rate', 'Homeownership_Rate', 'Elderly_Population_Rate',
+    'Work_From_Home_Rate', 'Unemployment_Rate', 'Minority_Population_Rate',
+    'geometry'
+]
+
+def add_alice_populations(gdf):
+    """Derived metrics combining the ACS population with the ALICE household shares"""
+    gdf['Population_Per_Household'] = (gdf['Total_Population'] / gdf['Households']).round(2)
+    gdf['ALICE_Population'] = (gdf['Total_Population'] * gdf['ALICE_Percentage'] / 100).round(0)
+    gdf['Poverty_Population'] = (gdf['Total_Population'] * gdf['Poverty_Percentage'] / 100).round(0)
+    return gdf
+
 class ALICECensusIntegrator:
     def __init__(self, data_dir="data/tiger", alice_dir="alice_clean_data", output_dir="alice_census_output"):
         self.data_dir = Path(data_dir)
         self.alice_dir = Path(alice_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.tracer = StageTracer('census', self.output_dir)
         
         # Census API key (you may need to get one from census.gov)
         self.census_api_key = None  # Set this if you have a Census API key
         
+    @traced('load')
     def get_census_demographics(self):
         """Fetch key Census demographic data for all US counties"""
         logger.info("Fetching Census demographic data...")
         
-        # Key demographic variables from ACS 5-Year estimates
-        variables = {
-            'B01003_001E': 'Total_Population',
-            'B25001_001E': 'Total_Housing_Units',
-            'B25003_002E': 'Owner_Occupied_Housing',
-            'B25003_003E': 'Renter_Occupied_Housing',
-            'B19013_001E': 'Median_Household_Income',
-            'B25077_001E': 'Median_Home_Value',
-            'B08303_001E': 'Total_Commuters',
-            'B08301_021E': 'Work_From_Home',
-            'B15003_022E': 'Bachelors_Degree',
-            'B15003_023E': 'Masters_Degree',
-            'B15003_024E': 'Professional_Degree',
-            'B15003_025E': 'Doctorate_Degree',
-            'B02001_002E': 'White_Alone',
-            'B02001_003E': 'Black_Alone',
-            'B02001_004E': 'Native_American_Alone',
-            'B02001_005E': 'Asian_Alone',
-            'B02001_006E': 'Pacific_Islander_Alone',
-            'B02001_007E': 'Other_Race_Alone',
-            'B02001_008E': 'Two_Or_More_Races',
-            'B03001_003E': 'Hispanic_Latino',
-            'B01001_002E': 'Male_Population',
-            'B01001_026E': 'Female_Population',
-            'B01001_003E': 'Under_5_Years',
-            'B01001_020E': 'Age_65_To_74',
-            'B01001_021E': 'Age_75_To_84',
-            'B01001_022E': 'Age_85_Plus',
-            'B08006_008E': 'No_Vehicle_Available',
-            'B08006_002E': 'One_Vehicle_Available',
-            'B08006_014E': 'Three_Plus_Vehicles',
-            'B27001_005E': 'No_Health_Insurance_Under_19',
-            'B27001_008E': 'No_Health_Insurance_19_34',
-            'B27001_011E': 'No_Health_Insurance_35_64',
-            'C17002_002E': 'Income_Under_50_Poverty',
-            'C17002_003E': 'Income_50_99_Poverty',
-            'B23025_005E': 'Unemployed'
-        }
-        
-        # Create variable list for API call
-        var_list = ','.join(variables.keys())
-        
-        # Build Census API URL
-        base_url = "https://api.census.gov/data/2022/acs/acs5"
-        params = {
-            'get': var_list,
-            'for': 'county:*',
-            'in': 'state:*'
-        }
-        
-        if self.census_api_key:
-            params['key'] = self.census_api_key
+        variables = list(ACS_VARIABLES)
+        base_url = ACS_BASE_URL
+
+        cache_path = self._acs_cache_path(variables)
+        if cache_path.exists() and time.time() - cache_path.stat().st_mtime < ACS_CACHE_MAX_AGE_DAYS * 86400:
+            df = alice_schema.read_csv(cache_path)
+            logger.info(f"Using cached Census data from {cache_path}")
+            return df
             
         try:
-            logger.info("Making Census API request...")
-            response = requests.get(base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            headers = data[0]
-            rows = data[1:]
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(rows, columns=headers)
+            df = None
+            for start in range(0, len(variables), ACS_MAX_VARIABLES):
+                chunk = variables[start:start + ACS_MAX_VARIABLES]
+                params = {
+                    'get': ','.join(chunk),
+                    'for': 'county:*',
+                    'in': 'state:*'
+                }
+                if self.census_api_key:
+                    params['key'] = self.census_api_key
+                
+                logger.info(f"Making Census API request ({len(chunk)} variables)...")
+                response = requests.get(base_url, params=params, timeout=30)
+                response.raise_for_status()
+                
+                data = response.json()
+                chunk_df = pd.DataFrame(data[1:], columns=data[0])
+                chunk_df = chunk_df[[col for col in chunk if col in chunk_df.columns] + ['state', 'county']]
+                df = chunk_df if df is None else df.merge(chunk_df, on=['state', 'county'], how='outer')
             
             # Rename columns
-            for api_var, readable_name in variables.items():
+            for api_var, readable_name in ACS_VARIABLES.items():
                 if api_var in df.columns:
                     df[readable_name] = pd.to_numeric(df[api_var], errors='coerce')
                     df.drop(columns=[api_var], inplace=True)
@@ -115,7 +156,12 @@ class ALICECensusIntegrator:
             df['Work_From_Home_Rate'] = (df['Work_From_Home'] / df['Total_Commuters'] * 100).round(1)
             df['Unemployment_Rate'] = (df['Unemployed'] / df['Total_Population'] * 100).round(1)
             
-            logger.info(f"Retrieved Census data for {len(df)} counties")
+            df = alice_schema.apply_schema(df)
+            logger.info(f"Retrieved Census data for {len(df)} counties ({alice_schema.memory_usage_mb(df):.2f} MB)")
+
+            # Only real API responses are cached, never the mock fallback
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(cache_path, index=False)
             return df
             
         except requests.exceptions.RequestException as e:
@@ -123,18 +169,32 @@ class ALICECensusIntegrator:
             logger.info("Creating mock demographic data for demonstration...")
             return self._create_mock_demographics()
     
+    def _acs_cache_path(self, variables):
+        """Cache file for one ACS endpoint and variable list"""
+        digest = hashlib.sha256(f"{ACS_BASE_URL}|{','.join(variables)}".encode()).hexdigest()[:16]
+        return self.output_dir / "acs_cache" / f"acs5_2022_{digest}.csv"
+
     def _create_mock_demographics(self):
         """Create mock demographic data based on typical US county patterns"""
+        import math
         import numpy as np
+        from alice_scenarios import ALL_BRACKET_COLUMNS, SENIOR_BRACKET_COLUMNS, BRACKET_EDGES
+        
+        def income_brackets(households, median_income, columns):
+            # Log-normal household incomes around the county median
+            cdf = [0.0] + [0.5 * (1 + math.erf((math.log(edge) - math.log(max(median_income, 10000))) / (0.8 * math.sqrt(2))))
+                           for edge in BRACKET_EDGES[1:-1]] + [1.0]
+            return {col: int(households * (cdf[i + 1] - cdf[i])) for i, col in enumerate(columns)}
         
         # Load existing county data to get FIPS codes
-        alice_df = pd.read_csv(self.alice_dir / "ALICE_Mapping_County_Data.csv")
+        alice_df = alice_schema.read_csv(self.alice_dir / "ALICE_Mapping_County_Data.csv")
+        alice_df['FIPS'] = alice_schema.fips_codes(alice_df['GEO id2'])
         
         np.random.seed(42)  # For reproducible results
         
         mock_data = []
         for _, row in alice_df.iterrows():
-            fips = str(row['GEO id2']).split('.')[0].zfill(5)
+            fips = row['FIPS']
             if len(fips) != 5:
                 continue
                 
@@ -148,11 +208,13 @@ class ALICECensusIntegrator:
             rural_factor = 1 if households < 5000 else 0.5 if households < 25000 else 0.2
             urban_factor = 1 - rural_factor
             
+            median_income = int(35000 + np.random.normal(0, 15000) + urban_factor * 20000)
+            
             mock_data.append({
                 'FIPS': fips,
                 'Total_Population': population,
                 'Total_Housing_Units': int(households * 1.15),
-                'Median_Household_Income': int(35000 + np.random.normal(0, 15000) + urban_factor * 20000),
+                'Median_Household_Income': median_income,
                 'Median_Home_Value': int(120000 + np.random.normal(0, 80000) + urban_factor * 100000),
                 'White_Alone': int(population * (0.6 + rural_factor * 0.2 + np.random.normal(0, 0.1))),
                 'Black_Alone': int(population * (0.12 + np.random.normal(0, 0.08))),
@@ -163,30 +225,37 @@ class ALICECensusIntegrator:
                 'Elderly_Population_Rate': round(12 + rural_factor * 5 + np.random.normal(0, 3), 1),
                 'Work_From_Home_Rate': round(3 + urban_factor * 8 + np.random.normal(0, 3), 1),
                 'Unemployment_Rate': round(4 + np.random.normal(0, 2), 1),
-                'Minority_Population_Rate': round((1 - (0.6 + rural_factor * 0.2)) * 100, 1)
+                'Minority_Population_Rate': round((1 - (0.6 + rural_factor * 0.2)) * 100, 1),
+                **income_brackets(households, median_income, ALL_BRACKET_COLUMNS),
+                **income_brackets(households * 0.25, median_income * 0.7, SENIOR_BRACKET_COLUMNS)
             })
         
         logger.info(f"Generated mock demographic data for {len(mock_data)} counties")
-        return pd.DataFrame(mock_data)
+        return alice_schema.apply_schema(pd.DataFrame(mock_data))
     
+    @traced('load')
     def load_alice_tiger_data(self):
         """Load the existing ALICE-Tiger integrated data"""
         logger.info("Loading ALICE-Tiger integrated data...")
-        
-        gdf = gpd.read_file("alice_tiger_output/alice_counties_choropleth.geojson")
-        logger.info(f"Loaded {len(gdf)} counties with ALICE data")
+        # GDAL is only needed here, not for the ACS fetch or the CSV-based analytics
+        import geopandas as gpd
+
+        gdf = alice_schema.apply_schema(gpd.read_file("alice_tiger_output/alice_counties_choropleth.geojson"))
+        logger.info(f"Loaded {len(gdf)} counties with ALICE data ({alice_schema.memory_usage_mb(gdf):.2f} MB)")
         
         return gdf
     
+    @traced('join')
     def integrate_all_data(self):
         """Combine ALICE, Tiger, and Census demographic data"""
         logger.info("Starting comprehensive data integration...")
         
-        # Load existing ALICE-Tiger data
-        alice_gdf = self.load_alice_tiger_data()
-        
-        # Get Census demographics
-        census_df = self.get_census_demographics()
+        # Read the ALICE-Tiger GeoJSON while the ACS request (or cache read) is in flight
+        inputs = self.tracer.gather({
+            'alice_tiger': self.load_alice_tiger_data,
+            'census_acs': self.get_census_demographics
+        })
+        alice_gdf, census_df = inputs['alice_tiger'], inputs['census_acs']
         
         # Merge with Census data
         logger.info("Merging with Census demographics...")
@@ -198,9 +267,7 @@ class ALICECensusIntegrator:
         )
         
         # Calculate additional derived metrics
-        merged_gdf['Population_Per_Household'] = (merged_gdf['Total_Population'] / merged_gdf['Households']).round(2)
-        merged_gdf['ALICE_Population'] = (merged_gdf['Total_Population'] * merged_gdf['ALICE_Percentage'] / 100).round(0)
-        merged_gdf['Poverty_Population'] = (merged_gdf['Total_Population'] * merged_gdf['Poverty_Percentage'] / 100).round(0)
+        merged_gdf = add_alice_populations(merged_gdf)
         
         # Clean up columns
         merged_gdf = merged_gdf.drop(columns=['FIPS'], errors='ignore')
@@ -210,34 +277,27 @@ class ALICECensusIntegrator:
         
         return merged_gdf
     
+    @traced('save')
     def save_integrated_data(self, gdf):
         """Save the comprehensive integrated dataset"""
         logger.info("Saving integrated dataset...")
         
-        # Save full GeoJSON
+        # Save full GeoJSON (6 coordinate decimals is ~10 cm)
         full_path = self.output_dir / "alice_census_integrated.geojson"
-        gdf.to_file(full_path, driver='GeoJSON')
+        write_geojson(gdf, full_path, precision=6, float_digits=4)
         logger.info(f"Saved full dataset to {full_path}")
         
         # Save web-optimized version with key demographics
-        web_columns = [
-            'GEOID', 'NAME', 'State', 'County',
-            'Households', 'Total_Population', 'Population_Per_Household',
-            'ALICE_Percentage', 'Poverty_Percentage', 'ALICE_Population', 'Poverty_Population',
-            'Median_Household_Income', 'Median_Home_Value',
-            'College_Degree_Rate', 'Homeownership_Rate', 'Elderly_Population_Rate',
-            'Work_From_Home_Rate', 'Unemployment_Rate', 'Minority_Population_Rate',
-            'geometry'
-        ]
-        
-        available_columns = [col for col in web_columns if col in gdf.columns]
+        available_columns = [col for col in CENSUS_WEB_COLUMNS if col in gdf.columns]
         web_gdf = gdf[available_columns].copy()
         
         # Simplify geometries for web use
-        web_gdf['geometry'] = web_gdf['geometry'].simplify(0.01)
+        with self.tracer.span('simplify', 'save_integrated_data', rows_in=len(web_gdf)) as span:
+            web_gdf['geometry'] = web_gdf['geometry'].simplify(0.01)
+            span.rows_out = len(web_gdf)
         
         web_path = self.output_dir / "alice_census_web.geojson"
-        web_gdf.to_file(web_path, driver='GeoJSON')
+        write_geojson(web_gdf, web_path, precision=4)
         logger.info(f"Saved web-optimized dataset to {web_path}")
         
         # Save comprehensive CSV for analysis
@@ -246,20 +306,67 @@ class ALICECensusIntegrator:
         csv_data.to_csv(csv_path, index=False)
         logger.info(f"Saved CSV data to {csv_path}")
         
+        # Attributes plus WKB geometry for workers to memory-map
+        snapshot_path = save_snapshot(gdf, self.output_dir / "alice_census_integrated.arrow")
+        
         # Generate enhanced statistics
+        stats_path = self.save_stats(gdf)
+        
+        return {
+            'full_geojson': full_path,
+            'web_geojson': web_path, 
+            'csv_data': csv_path,
+            'statistics': stats_path,
+            'snapshot': snapshot_path
+        }
+    
+    def save_stats(self, gdf):
+        """Write the national summary statistics to alice_census_stats.json"""
         stats = self._generate_enhanced_stats(gdf)
         stats_path = self.output_dir / "alice_census_stats.json"
         with open(stats_path, 'w') as f:
             json.dump(stats, f, indent=2, default=str)
         logger.info(f"Saved statistics to {stats_path}")
-        
+        return stats_path
+    
+    @traced('analytics')
+    def compute_correlation_analytics(self, gdf):
+        """Household-weighted correlation matrices and regressions, national and per state"""
+        analytics = ALICECorrelationAnalytics(self.output_dir)
+        return analytics.export(*analytics.compute(gdf))
+    
+    @traced('analytics')
+    def build_similarity_index(self, gdf, k=10):
+        """Index county profiles for "counties like this one" lookups"""
+        index = ALICESimilarityIndex.from_frame(gdf)
         return {
-            'full_geojson': full_path,
-            'web_geojson': web_path, 
-            'csv_data': csv_path,
-            'statistics': stats_path
+            'similarity_index': index.save(self.output_dir / "alice_similarity_index.npz"),
+            'similar_counties': index.export_neighbours(self.output_dir / "alice_similar_counties.json", k=k)
         }
     
+    @traced('analytics')
+    def simulate_threshold_scenarios(self, gdf, scenarios=None):
+        """Households below raised/lowered ALICE thresholds for every county, cached per scenario"""
+        current_path = self.alice_dir / "ALICE_Current_County_Data.csv"
+        if not current_path.exists():
+            logger.warning(f"{current_path} not found, skipping threshold scenarios")
+            return {}
+        
+        current = alice_schema.read_csv(current_path)
+        current['GEOID'] = alice_schema.fips_codes(current['GEO id2'])
+        thresholds = current[['GEOID', UNDER_65_THRESHOLD, SENIOR_THRESHOLD]].drop_duplicates('GEOID')
+        df = pd.DataFrame(gdf.drop(columns=['geometry'], errors='ignore')).merge(thresholds, on='GEOID', how='left')
+        
+        try:
+            engine = ALICEScenarioEngine.from_frame(df, cache_dir=self.output_dir / "analytics_cache")
+        except ValueError as e:
+            logger.warning(f"Skipping threshold scenarios: {e}")
+            return {}
+        
+        path = self.output_dir / "alice_threshold_scenarios.json"
+        return {'threshold_scenarios': engine.export(path, scenarios) if scenarios else engine.export(path)}
+    
+    @traced('stats')
     def _generate_enhanced_stats(self, gdf):
         """Generate comprehensive statistics"""
         stats = {
@@ -272,20 +379,20 @@ class ALICECensusIntegrator:
                 'data_completeness_percent': (gdf['ALICE_Percentage'].notna().sum() / len(gdf)) * 100
             },
             'alice_metrics': {
-                'avg_alice_percentage': gdf['ALICE_Percentage'].mean(),
-                'avg_poverty_percentage': gdf['Poverty_Percentage'].mean(),
+                'avg_alice_percentage': float(gdf['ALICE_Percentage'].mean()),
+                'avg_poverty_percentage': float(gdf['Poverty_Percentage'].mean()),
                 'total_alice_population': gdf['ALICE_Population'].sum(),
                 'total_poverty_population': gdf['Poverty_Population'].sum()
             },
             'demographic_metrics': {
-                'avg_median_income': gdf['Median_Household_Income'].mean(),
-                'avg_home_value': gdf['Median_Home_Value'].mean(),
-                'avg_college_rate': gdf['College_Degree_Rate'].mean(),
-                'avg_homeownership_rate': gdf['Homeownership_Rate'].mean(),
-                'avg_elderly_rate': gdf['Elderly_Population_Rate'].mean(),
-                'avg_work_from_home_rate': gdf['Work_From_Home_Rate'].mean(),
-                'avg_unemployment_rate': gdf['Unemployment_Rate'].mean(),
-                'avg_minority_rate': gdf['Minority_Population_Rate'].mean()
+                'avg_median_income': float(gdf['Median_Household_Income'].mean()),
+                'avg_home_value': float(gdf['Median_Home_Value'].mean()),
+                'avg_college_rate': float(gdf['College_Degree_Rate'].mean()),
+                'avg_homeownership_rate': float(gdf['Homeownership_Rate'].mean()),
+                'avg_elderly_rate': float(gdf['Elderly_Population_Rate'].mean()),
+                'avg_work_from_home_rate': float(gdf['Work_From_Home_Rate'].mean()),
+                'avg_unemployment_rate': float(gdf['Unemployment_Rate'].mean()),
+                'avg_minority_rate': float(gdf['Minority_Population_Rate'].mean())
             }
         }
         
@@ -301,6 +408,10 @@ class ALICECensusIntegrator:
             
             # Save results
             result_files = self.save_integrated_data(integrated_gdf)
+            result_files.update(self.compute_correlation_analytics(integrated_gdf))
+            result_files.update(self.build_similarity_index(integrated_gdf))
+            result_files.update(self.simulate_threshold_scenarios(integrated_gdf))
+            result_files['run_report'] = self.tracer.write_report()
             
             logger.info("Integration complete!")
             
@@ -326,7 +437,14 @@ def main():
     print(f"Full dataset: {result['files']['full_geojson']}")
     print(f"Web-optimized: {result['files']['web_geojson']}")
     print(f"CSV data: {result['files']['csv_data']}")
+    if result['files'].get('snapshot'):
+        print(f"Arrow snapshot: {result['files']['snapshot']}")
     print(f"Statistics: {result['files']['statistics']}")
+    print(f"Correlations: {result['files']['correlations']}")
+    print(f"Similar counties: {result['files']['similar_counties']}")
+    if 'threshold_scenarios' in result['files']:
+        print(f"Threshold scenarios: {result['files']['threshold_scenarios']}")
+    print(f"Run report: {result['files']['run_report']}")
     print("\n" + "="*70)
 
 if __name__ == "__main__":
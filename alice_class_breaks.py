@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+ALICE Choropleth Class Breaks
+Precomputes quantile, Jenks natural breaks and equal-interval classes for every variable,
+nationally and per state, into a compact legend file for the choropleth pages
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+import alice_schema
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLASSES = 5
+METHODS = ['quantile', 'jenks', 'equal_interval']
+
+def _finite_sorted(values):
+    values = np.asarray(values, dtype=np.float64)
+    return np.sort(values[np.isfinite(values)])
+
+def quantile_breaks(values, n_classes=DEFAULT_CLASSES):
+    """Class boundaries [min, q1, ..., max] with equal counts per class"""
+    x = _finite_sorted(values)
+    if len(x) == 0:
+        return []
+    return np.unique(np.quantile(x, np.linspace(0, 1, n_classes + 1))).tolist()
+
+def equal_interval_breaks(values, n_classes=DEFAULT_CLASSES):
+    """Class boundaries [min, ..., max] with equal widths"""
+    x = _finite_sorted(values)
+    if len(x) == 0:
+        return []
+    return np.unique(np.linspace(x[0], x[-1], n_classes + 1)).tolist()
+
+def jenks_breaks(values, n_classes=DEFAULT_CLASSES):
+    """Fisher-Jenks optimal natural breaks [min, upper_1, ..., upper_k]
+
+    Solves the within-class sum of squares DP with divide-and-conquer optimisation
+    (optimal split points are monotone), processing every node of a recursion level
+    in one vectorized pass: O(k * n log n) work and O(k * log n) NumPy calls.
+    """
+    x = _finite_sorted(values)
+    n = len(x)
+    if n == 0:
+        return []
+
+    unique = np.unique(x)
+    if len(unique) <= n_classes:
+        return [float(x[0])] + unique.tolist()
+
+    # Standardise so the prefix sums of squares keep their precision for household counts
+    z = (x - x.mean()) / (x.std() or 1.0)
+    s1 = np.concatenate([[0.0], np.cumsum(z)])
+    s2 = np.concatenate([[0.0], np.cumsum(z * z)])
+
+    def ssd(j, i):
+        # Sum of squared deviations of z[j..i] (inclusive)
+        count = i - j + 1
+        total = s1[i + 1] - s1[j]
+        return (s2[i + 1] - s2[j]) - total * total / count
+
+    idx = np.arange(n)
+    cost = ssd(np.zeros(n, dtype=np.int64), idx)
+    splits = []
+
+    for k in range(2, n_classes + 1):
+        prev = cost
+        cost = np.full(n, np.inf)
+        split = np.zeros(n, dtype=np.int64)
+
+        # Pending (lo, hi, opt_lo, opt_hi) nodes of the divide-and-conquer recursion
+        lo = np.array([k - 1])
+        hi = np.array([n - 1])
+        opt_lo = np.array([k - 1])
+        opt_hi = np.array([n - 1])
+
+        while len(lo):
+            mid = (lo + hi) // 2
+            end = np.minimum(mid, opt_hi)
+            lengths = end - opt_lo + 1
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+            node = np.repeat(np.arange(len(lo)), lengths)
+            j = opt_lo[node] + (np.arange(lengths.sum()) - offsets[node])
+            candidates = prev[j - 1] + ssd(j, mid[node])
+
+            best = np.minimum.reduceat(candidates, offsets)
+            hits = np.flatnonzero(candidates == best[node])
+            _, first = np.unique(node[hits], return_index=True)
+            best_j = j[hits[first]]
+
+            cost[mid] = best
+            split[mid] = best_j
+
+            left = mid - 1 >= lo
+            right = mid + 1 <= hi
+            lo, hi, opt_lo, opt_hi = (
+                np.concatenate([lo[left], mid[right] + 1]),
+                np.concatenate([mid[left] - 1, hi[right]]),
+                np.concatenate([opt_lo[left], best_j[right]]),
+                np.concatenate([best_j[left], opt_hi[right]])
+            )
+
+        splits.append(split)
+
+    # Walk the split points back from the last element
+    uppers = []
+    end = n - 1
+    for split in reversed(splits):
+        uppers.append(float(x[end]))
+        end = split[end] - 1
+    uppers.append(float(x[end]))
+
+    return [float(x[0])] + uppers[::-1]
+
+BREAK_FUNCTIONS = {
+    'quantile': quantile_breaks,
+    'jenks': jenks_breaks,
+    'equal_interval': equal_interval_breaks
+}
+
+def _round_breaks(breaks, digits=4):
+    return [float(f"{value:.{digits}g}") for value in breaks]
+
+def compute_class_breaks(df, variables=None, state_column=None, n_classes=DEFAULT_CLASSES, methods=METHODS):
+    """Class breaks for every variable at national scope and for each state"""
+    variables = variables or alice_schema.numeric_variables(df)
+    if state_column is None:
+        state_column = next((col for col in ['STUSPS', 'State Abbr', 'State'] if col in df.columns), None)
+
+    values = df[variables].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    states = df[state_column].astype(object).to_numpy() if state_column else None
+
+    scopes = {'national': np.ones(len(df), dtype=bool)}
+    if states is not None:
+        for state in sorted(s for s in pd.unique(states) if pd.notna(s)):
+            scopes[state] = states == state
+
+    legend = {}
+    for v, variable in enumerate(variables):
+        column = values[:, v]
+        entry = {}
+        for scope, mask in scopes.items():
+            scope_values = column[mask]
+            if not np.isfinite(scope_values).any():
+                continue
+            entry[scope] = {method: _round_breaks(BREAK_FUNCTIONS[method](scope_values, n_classes))
+                            for method in methods}
+        legend[variable] = entry
+
+    logger.info(f"Computed {len(methods)} break methods for {len(variables)} variables across {len(scopes)} scopes")
+    return legend
+
+def save_legend(legend, path, n_classes=DEFAULT_CLASSES, methods=METHODS):
+    """Write the legend file
+
+    Breaks are stored as breaks[method][variable_index][scope_index] (null when a scope
+    has no data) so variable, scope and method names appear only once.
+    """
+    path = Path(path)
+    variables = list(legend)
+    scopes = ['national'] + sorted({scope for entry in legend.values() for scope in entry} - {'national'})
+    payload = {
+        'classes': n_classes,
+        'methods': methods,
+        'variables': variables,
+        'scopes': scopes,
+        'breaks': {
+            method: [[legend[variable][scope][method] if scope in legend[variable] else None
+                      for scope in scopes] for variable in variables]
+            for method in methods
+        }
+    }
+    with open(path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    logger.info(f"Saved class breaks legend to {path} ({path.stat().st_size / 1024:.1f} KB)")
+    return path
+
+def main():
+    """Precompute legends for the county and comprehensive Census datasets"""
+    datasets = [
+        ('alice_tiger_output/alice_counties_choropleth_data.csv', 'alice_tiger_output/alice_counties_legend.json'),
+        ('alice_census_output/alice_census_data.csv', 'alice_census_output/alice_census_legend.json'),
+        ('alice_census_comprehensive/alice_census_comprehensive.csv', 'alice_census_comprehensive/alice_census_comprehensive_legend.json')
+    ]
+
+    for data_path, legend_path in datasets:
+        if not Path(data_path).exists():
+            continue
+        df = alice_schema.read_csv(data_path)
+        save_legend(compute_class_breaks(df), legend_path)
+
+if __name__ == "__main__":
+    main()
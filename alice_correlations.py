@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+ALICE Correlation Analytics
+Household-weighted Pearson/Spearman correlation matrices and simple regressions over the
+integrated ALICE + Census variables, computed in batched NumPy passes
+"""
+
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+import alice_schema
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TARGET_VARIABLES = ['ALICE_Percentage', 'Below_ALICE_Threshold_Percentage']
+WEIGHT_COLUMN = 'Households'
+
+# Pairs observed together in fewer rows than this get NaN
+MIN_OBSERVATIONS = 3
+
+def dataset_version(df, variables, weight_column=WEIGHT_COLUMN):
+    """Content hash of the analysed columns, used as the cache key"""
+    digest = hashlib.sha256()
+    digest.update('|'.join(variables).encode())
+    for col in variables + [weight_column]:
+        if col in df.columns:
+            digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def column_means(values):
+    """Mean of the observed values per column (0 for all-missing columns)"""
+    mask = np.isfinite(values)
+    counts = mask.sum(axis=0)
+    return np.where(mask, values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+
+def weighted_moments(values, weights):
+    """Pairwise-complete weighted moments for every variable pair in one batched pass
+
+    Returns (count, mean_a, mean_b, var_a, var_b, cov), each p x p, where entry [a, b] is
+    computed over the rows in which both a and b are observed.
+    """
+    mask = np.isfinite(values)
+    weights = np.where(np.isfinite(weights) & (weights > 0), weights, 0.0)
+
+    # Center each column first so the sums of squares don't lose precision
+    offsets = column_means(values)
+    centered = values - offsets
+    x = np.where(mask, centered, 0.0)
+    m = mask.astype(np.float64)
+    wm = m * weights[:, None]
+
+    count = m.T @ m
+    sw = wm.T @ m
+    sx = (x * weights[:, None]).T @ m
+    sxx = (x * x * weights[:, None]).T @ m
+    sxy = (x * weights[:, None]).T @ x
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_a = sx / sw
+        mean_b = mean_a.T
+        var_a = sxx / sw - mean_a ** 2
+        var_b = var_a.T
+        cov = sxy / sw - mean_a * mean_b
+
+    insufficient = (count < MIN_OBSERVATIONS) | (sw <= 0)
+    for matrix in (mean_a, mean_b, var_a, var_b, cov):
+        matrix[insufficient] = np.nan
+
+    # Undo the centering on the means
+    return count, mean_a + offsets[:, None], mean_b + offsets[None, :], var_a, var_b, cov
+
+def weighted_pearson(values, weights):
+    """Household-weighted Pearson correlation matrix with pairwise-complete observations"""
+    count, _, _, var_a, var_b, cov = weighted_moments(values, weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.sqrt(var_a * var_b)
+    return np.clip(corr, -1, 1), count
+
+def rank_columns(values):
+    """Average ranks per column, NaN preserved"""
+    return pd.DataFrame(values).rank(method='average').to_numpy(dtype=np.float64)
+
+def weighted_spearman(values, weights):
+    """Household-weighted Spearman correlation (weighted Pearson on column ranks)"""
+    return weighted_pearson(rank_columns(values), weights)
+
+def simple_regressions(values, weights, variables, targets):
+    """Weighted least-squares fit of each target on each variable (target = a + b * variable)"""
+    _, mean_x, mean_y, var_x, var_y, cov = weighted_moments(values, weights)
+    rows = []
+    index = {variable: i for i, variable in enumerate(variables)}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for target in targets:
+            t = index[target]
+            slope = cov[:, t] / var_x[:, t]
+            intercept = mean_y[:, t] - slope * mean_x[:, t]
+            r_squared = cov[:, t] ** 2 / (var_x[:, t] * var_y[:, t])
+            for v, variable in enumerate(variables):
+                if variable == target:
+                    continue
+                rows.append({
+                    'target': target,
+                    'variable': variable,
+                    'slope': slope[v],
+                    'intercept': intercept[v],
+                    'r_squared': r_squared[v]
+                })
+
+    return pd.DataFrame(rows)
+
+class ALICECorrelationAnalytics:
+    def __init__(self, output_dir, targets=TARGET_VARIABLES, weight_column=WEIGHT_COLUMN, state_column='STUSPS'):
+        self.output_dir = Path(output_dir)
+        self.cache_dir = self.output_dir / "analytics_cache"
+        self.targets = targets
+        self.weight_column = weight_column
+        self.state_column = state_column
+
+    def compute_scope(self, df, variables):
+        """Pearson, Spearman and regressions for one national or state subset"""
+        values = df[variables].to_numpy(dtype=np.float64, na_value=np.nan)
+        weights = df[self.weight_column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        pearson, count = weighted_pearson(values, weights)
+        spearman, _ = weighted_spearman(values, weights)
+        targets = [target for target in self.targets if target in variables]
+        regressions = simple_regressions(values, weights, variables, targets)
+
+        return {'pearson': pearson, 'spearman': spearman, 'count': count, 'regressions': regressions}
+
+    def compute(self, gdf):
+        """National and per-state matrices, reusing the cache for an unchanged dataset"""
+        df = pd.DataFrame(gdf.drop(columns=['geometry'], errors='ignore'))
+        variables = alice_schema.numeric_variables(df)
+        version = dataset_version(df, variables, self.weight_column)
+        cache_path = self.cache_dir / f"correlations_{version}.npz"
+
+        if cache_path.exists():
+            logger.info(f"Using cached correlation analytics for dataset version {version}")
+            return self.load_cache(cache_path)
+
+        scopes = {'national': df}
+        if self.state_column in df.columns:
+            for state, state_df in df.groupby(df[self.state_column].astype(object), sort=True):
+                scopes[state] = state_df
+
+        results = {scope: self.compute_scope(scope_df, variables) for scope, scope_df in scopes.items()}
+        logger.info(f"Computed correlation analytics for {len(variables)} variables across {len(scopes)} scopes")
+
+        self.save_cache(cache_path, version, variables, results)
+        return version, variables, results
+
+    def save_cache(self, cache_path, version, variables, results):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        scopes = list(results)
+        regressions = pd.concat([results[scope]['regressions'].assign(scope=scope) for scope in scopes],
+                                ignore_index=True)
+        np.savez_compressed(
+            cache_path,
+            version=np.array(version),
+            variables=np.array(variables, dtype=str),
+            scopes=np.array(scopes, dtype=str),
+            pearson=np.stack([results[scope]['pearson'] for scope in scopes]),
+            spearman=np.stack([results[scope]['spearman'] for scope in scopes]),
+            count=np.stack([results[scope]['count'] for scope in scopes])
+        )
+        regressions.to_csv(cache_path.with_suffix('.regressions.csv'), index=False)
+
+    def load_cache(self, cache_path):
+        with np.load(cache_path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+
+        regressions = pd.read_csv(cache_path.with_suffix('.regressions.csv'))
+        regressions_by_scope = {scope: group.drop(columns=['scope']) for scope, group in regressions.groupby('scope')}
+        results = {
+            scope: {
+                'pearson': arrays['pearson'][i],
+                'spearman': arrays['spearman'][i],
+                'count': arrays['count'][i],
+                'regressions': regressions_by_scope.get(scope, pd.DataFrame())
+            }
+            for i, scope in enumerate(arrays['scopes'].tolist())
+        }
+        return str(arrays['version']), arrays['variables'].tolist(), results
+
+    def export(self, version, variables, results):
+        """Write national matrices as CSV and target correlations per scope as JSON"""
+        national = results['national']
+        pearson_path = self.output_dir / "alice_census_correlation_pearson.csv"
+        spearman_path = self.output_dir / "alice_census_correlation_spearman.csv"
+        regression_path = self.output_dir / "alice_census_regressions.csv"
+        pd.DataFrame(national['pearson'], index=variables, columns=variables).to_csv(pearson_path)
+        pd.DataFrame(national['spearman'], index=variables, columns=variables).to_csv(spearman_path)
+        national['regressions'].to_csv(regression_path, index=False)
+
+        def rounded(row):
+            return [None if np.isnan(value) else round(float(value), 4) for value in row]
+
+        index = {variable: i for i, variable in enumerate(variables)}
+        targets = [target for target in self.targets if target in index]
+        summary = {
+            'version': version,
+            'weight': self.weight_column,
+            'variables': variables,
+            'scopes': list(results),
+            'correlations': {
+                target: {
+                    method: {scope: rounded(result[method][index[target]]) for scope, result in results.items()}
+                    for method in ['pearson', 'spearman']
+                }
+                for target in targets
+            }
+        }
+        summary_path = self.output_dir / "alice_census_correlations.json"
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, separators=(',', ':'))
+
+        logger.info(f"Saved correlation analytics to {summary_path}")
+        return {
+            'correlations': summary_path,
+            'pearson_matrix': pearson_path,
+            'spearman_matrix': spearman_path,
+            'regressions': regression_path
+        }
+
+def main():
+    """Compute correlation analytics for the comprehensive ALICE + Census dataset"""
+    df = alice_schema.read_csv('alice_census_comprehensive/alice_census_comprehensive.csv')
+    analytics = ALICECorrelationAnalytics('alice_census_comprehensive')
+    files = analytics.export(*analytics.compute(df))
+
+    for file_type, file_path in files.items():
+        print(f"- {file_type}: {file_path}")
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,58 @@ import numpy as np
 from pathlib import Path
 import logging
 
+import alice_schema
+from alice_timeseries import ALICETimeSeriesStore
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CLEAN_DIR = Path('alice_clean_data')
+
+# Key fields kept in the mapping-ready datasets
+MAPPING_FIELDS = [
+    'State', 'State Abbr', 'County', 'GEO id2', 'GEO display_label',
+    'Households', 'Poverty_Percentage', 'ALICE_Percentage', 
+    'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage'
+]
+SUBCOUNTY_MAPPING_FIELDS = [
+    'State', 'Type', 'GEO id2', 'GEO display_label', 'County',
+    'Households', 'Poverty_Percentage', 'ALICE_Percentage',
+    'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage'
+]
+
+def create_aggregates(county_df, current_county, output_dir=CLEAN_DIR):
+    """Trend cubes and the summary row, derived from the whole county time series"""
+    output_dir = Path(output_dir)
+    
+    # Build dense time series cubes so trend lookups don't rescan the long-format CSV
+    county_store = ALICETimeSeriesStore.from_frame(county_df)
+    county_store.save(output_dir / 'ALICE_TimeSeries_County_Cube.npz')
+    county_store.aggregate_by_state().save(output_dir / 'ALICE_TimeSeries_State_Cube.npz')
+    
+    # Create summary statistics
+    stats = {
+        'Current Year Data': county_df['Year'].max(),
+        'Total Counties (Current)': len(current_county),
+        'Total States': current_county['State'].nunique(),
+        'Total Households (Current)': f"{current_county['Households'].sum():,}",
+        'Average ALICE Percentage': f"{current_county['ALICE_Percentage'].mean():.2f}%",
+        'Average Below ALICE Threshold': f"{current_county['Below_ALICE_Threshold_Percentage'].mean():.2f}%",
+        'Time Series Years Available': f"{county_df['Year'].min()}-{county_df['Year'].max()}",
+        'Total Time Series Records': f"{len(county_df):,}"
+    }
+    
+    # Save summary
+    summary_df = pd.DataFrame([stats])
+    summary_df.to_csv(output_dir / 'ALICE_Data_Summary.csv', index=False)
+    return stats
+
 def create_clean_datasets():
     """Create cleaned versions of the ALICE data for mapping and analysis"""
     
     # Load the consolidated data
-    county_df = pd.read_csv('alice_master_data/ALICE_Master_County_Data.csv')
-    subcounty_df = pd.read_csv('alice_master_data/ALICE_Master_Subcounty_Data.csv')
+    county_df = alice_schema.read_csv('alice_master_data/ALICE_Master_County_Data.csv')
+    subcounty_df = alice_schema.read_csv('alice_master_data/ALICE_Master_Subcounty_Data.csv')
     
     logger.info(f"Loaded {len(county_df):,} county records and {len(subcounty_df):,} subcounty records")
     
@@ -31,7 +74,7 @@ def create_clean_datasets():
     logger.info(f"Total households (current year): {total_households_current:,}")
     
     # Create output directory
-    output_dir = Path('alice_clean_data')
+    output_dir = CLEAN_DIR
     output_dir.mkdir(exist_ok=True)
     
     # Save current year datasets (best for mapping)
@@ -45,40 +88,15 @@ def create_clean_datasets():
     county_df.to_csv(output_dir / 'ALICE_TimeSeries_County_Data.csv', index=False)
     subcounty_df.to_csv(output_dir / 'ALICE_TimeSeries_Subcounty_Data.csv', index=False)
     
-    # Create summary statistics
-    stats = {
-        'Current Year Data': county_df['Year'].max(),
-        'Total Counties (Current)': len(current_county),
-        'Total States': current_county['State'].nunique(),
-        'Total Households (Current)': f"{total_households_current:,}",
-        'Average ALICE Percentage': f"{current_county['ALICE_Percentage'].mean():.2f}%",
-        'Average Below ALICE Threshold': f"{current_county['Below_ALICE_Threshold_Percentage'].mean():.2f}%",
-        'Time Series Years Available': f"{county_df['Year'].min()}-{county_df['Year'].max()}",
-        'Total Time Series Records': f"{len(county_df):,}"
-    }
-    
-    # Save summary
-    summary_df = pd.DataFrame([stats])
-    summary_df.to_csv(output_dir / 'ALICE_Data_Summary.csv', index=False)
+    # Trend cubes and summary statistics
+    create_aggregates(county_df, current_county, output_dir)
     
     # Create a mapping-ready dataset with key fields only
-    mapping_fields = [
-        'State', 'State Abbr', 'County', 'GEO id2', 'GEO display_label',
-        'Households', 'Poverty_Percentage', 'ALICE_Percentage', 
-        'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage'
-    ]
-    
-    mapping_county = current_county[mapping_fields].copy()
+    mapping_county = current_county[MAPPING_FIELDS].copy()
     mapping_county.to_csv(output_dir / 'ALICE_Mapping_County_Data.csv', index=False)
     
     # Create subcounty mapping dataset
-    subcounty_mapping_fields = [
-        'State', 'Type', 'GEO id2', 'GEO display_label', 'County',
-        'Households', 'Poverty_Percentage', 'ALICE_Percentage',
-        'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage'
-    ]
-    
-    mapping_subcounty = current_subcounty[subcounty_mapping_fields].copy()
+    mapping_subcounty = current_subcounty[SUBCOUNTY_MAPPING_FIELDS].copy()
     mapping_subcounty.to_csv(output_dir / 'ALICE_Mapping_Subcounty_Data.csv', index=False)
     
     print(f"""
@@ -103,6 +121,7 @@ FILES CREATED:
 ✓ ALICE_Mapping_Subcounty_Data.csv - Streamlined subcounty mapping
 ✓ ALICE_TimeSeries_County_Data.csv - Full historical data
 ✓ ALICE_TimeSeries_Subcounty_Data.csv - Full historical subcounty data
+✓ ALICE_TimeSeries_County_Cube.npz / ALICE_TimeSeries_State_Cube.npz - Trend cubes with YoY deltas and slopes
 ✓ ALICE_Data_Summary.csv - Key statistics
 
 All files saved to: {output_dir.absolute()}
@@ -10,15 +10,29 @@ import numpy as np
 from pathlib import Path
 import logging
 
+import alice_schema
+from alice_excel import ExcelWorkbook
+from alice_tracing import StageTracer, traced
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Columns kept from each state sheet; the Excel reader pulls only these
+COUNTY_COLUMNS = ['State', 'Year', 'GEO id2', 'GEO display_label', 'County', 'State Abbr',
+                  'Households', 'Poverty Households', 'ALICE Households', 'Above ALICE Households',
+                  'ALICE Threshold - HH under 65', 'ALICE Threshold - HH 65 years and over']
+SUBCOUNTY_COLUMNS = ['State', 'Year', 'Type', 'GEO id2', 'GEO display_label',
+                     'Households', 'Poverty Households', 'ALICE Households', 'Above ALICE Households', 'County']
+
 class ALICEDataConsolidator:
-    def __init__(self, input_dir="alice_state_data", output_dir="alice_master_data"):
+    def __init__(self, input_dir="alice_state_data", output_dir="alice_master_data", excel_backend=None):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
+        # None picks calamine when installed, else streaming openpyxl (see alice_excel)
+        self.excel_backend = excel_backend
         self.output_dir.mkdir(exist_ok=True)
+        self.tracer = StageTracer('consolidator', self.output_dir)
         
         # Master dataframes
         self.master_county = pd.DataFrame()
@@ -47,30 +61,35 @@ class ALICEDataConsolidator:
                 self.processing_stats['files_failed'] += 1
                 self.processing_stats['failed_files'].append(file_path.name)
         
+        # Cast once after concatenation so categoricals share one set of categories
+        self.master_county = alice_schema.apply_schema(self.master_county)
+        self.master_subcounty = alice_schema.apply_schema(self.master_subcounty)
+        logger.info(f"Master data memory: county {alice_schema.memory_usage_mb(self.master_county):.2f} MB, "
+                    f"subcounty {alice_schema.memory_usage_mb(self.master_subcounty):.2f} MB")
+        
         logger.info(f"Processing complete. {self.processing_stats['files_processed']} files processed, {self.processing_stats['files_failed']} failed")
     
+    @traced('parse')
     def process_single_file(self, file_path):
         """Process a single Excel file and add to master datasets"""
         state_name = self.extract_state_name(file_path.name)
         logger.info(f"Processing: {state_name}")
         
         try:
-            # Read Excel file
-            xl = pd.ExcelFile(file_path)
-            
-            # Process County data
-            if 'County' in xl.sheet_names:
-                county_df = pd.read_excel(file_path, sheet_name='County')
-                county_df = self.clean_county_data(county_df, state_name)
-                self.master_county = pd.concat([self.master_county, county_df], ignore_index=True)
-                self.processing_stats['total_counties'] += len(county_df)
-            
-            # Process Subcounty data
-            if 'Subcounty' in xl.sheet_names:
-                subcounty_df = pd.read_excel(file_path, sheet_name='Subcounty')
-                subcounty_df = self.clean_subcounty_data(subcounty_df, state_name)
-                self.master_subcounty = pd.concat([self.master_subcounty, subcounty_df], ignore_index=True)
-                self.processing_stats['total_subcounty_areas'] += len(subcounty_df)
+            with ExcelWorkbook(file_path, self.excel_backend) as workbook:
+                # Process County data
+                if 'County' in workbook.sheet_names:
+                    county_df = workbook.read_sheet('County', COUNTY_COLUMNS)
+                    county_df = self.clean_county_data(county_df, state_name)
+                    self.master_county = pd.concat([self.master_county, county_df], ignore_index=True)
+                    self.processing_stats['total_counties'] += len(county_df)
+                
+                # Process Subcounty data
+                if 'Subcounty' in workbook.sheet_names:
+                    subcounty_df = workbook.read_sheet('Subcounty', SUBCOUNTY_COLUMNS)
+                    subcounty_df = self.clean_subcounty_data(subcounty_df, state_name)
+                    self.master_subcounty = pd.concat([self.master_subcounty, subcounty_df], ignore_index=True)
+                    self.processing_stats['total_subcounty_areas'] += len(subcounty_df)
                 
         except Exception as e:
             logger.error(f"Error processing {file_path}: {e}")
@@ -84,18 +103,14 @@ class ALICEDataConsolidator:
             return '_'.join(parts[2:-2]).replace('_', ' ')
         return filename
     
+    @traced('clean')
     def clean_county_data(self, df, state_name):
         """Clean and standardize county data"""
         # Remove any completely empty rows
         df = df.dropna(how='all')
         
-        # Ensure we have the expected columns
-        expected_cols = ['State', 'Year', 'GEO id2', 'GEO display_label', 'County', 'State Abbr', 
-                        'Households', 'Poverty Households', 'ALICE Households', 'Above ALICE Households',
-                        'ALICE Threshold - HH under 65', 'ALICE Threshold - HH 65 years and over']
-        
         # Keep only expected columns that exist
-        existing_cols = [col for col in expected_cols if col in df.columns]
+        existing_cols = [col for col in COUNTY_COLUMNS if col in df.columns]
         df = df[existing_cols].copy()
         
         # Add calculated fields for analysis
@@ -112,17 +127,14 @@ class ALICEDataConsolidator:
         
         return df
     
+    @traced('clean')
     def clean_subcounty_data(self, df, state_name):
         """Clean and standardize subcounty data"""
         # Remove any completely empty rows
         df = df.dropna(how='all')
         
-        # Ensure we have the expected columns
-        expected_cols = ['State', 'Year', 'Type', 'GEO id2', 'GEO display_label', 
-                        'Households', 'Poverty Households', 'ALICE Households', 'Above ALICE Households', 'County']
-        
         # Keep only expected columns that exist
-        existing_cols = [col for col in expected_cols if col in df.columns]
+        existing_cols = [col for col in SUBCOUNTY_COLUMNS if col in df.columns]
         df = df[existing_cols].copy()
         
         # Add calculated fields for analysis
@@ -139,6 +151,7 @@ class ALICEDataConsolidator:
         
         return df
     
+    @traced('stats')
     def create_summary_statistics(self):
         """Create summary statistics for the combined dataset"""
         summary_stats = {}
@@ -166,6 +179,7 @@ class ALICEDataConsolidator:
         
         return summary_stats
     
+    @traced('save')
     def save_master_files(self):
         """Save consolidated data to multiple formats"""
         logger.info("Saving master files...")
@@ -273,6 +287,7 @@ def main():
     
     # Generate report
     report = consolidator.generate_report()
+    output_files['run_report'] = consolidator.tracer.write_report()
     
     # Print summary
     print("\n" + "="*50)
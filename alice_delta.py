@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+ALICE Release Deltas
+Diffs two releases of a published dataset by geography key and column, writes compact
+patches clients can apply instead of re-downloading, and summarizes them as a changelog
+"""
+
+import csv
+import json
+import argparse
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PATCH_FORMAT = 'alice-delta/1'
+
+# Geography key columns, in order of preference
+KEY_COLUMNS = ['GEOID', 'GEO id2']
+
+# Patches larger than this fraction of the new file aren't worth shipping over the full file
+MAX_PATCH_RATIO = 0.5
+
+class DeltaError(ValueError):
+    """Raised when two releases can't be diffed or a patch doesn't fit its base"""
+
+def _key_string(value):
+    """Canonical text key: GEO id2 floats such as 41001.0 become '41001'"""
+    text = str(value)
+    return text[:-2] if text.endswith('.0') else text
+
+def _state_fips(key):
+    """State FIPS of a county (5-digit) or place/county subdivision (7/10-digit) key"""
+    digits = key.split('.')[0]
+    if not digits.isdigit():
+        return None
+    width = 5 if len(digits) <= 5 else (7 if len(digits) <= 7 else 10)
+    return digits.zfill(width)[:2]
+
+def load_release(path):
+    """(key column, columns, {key: properties}, {key: geometry} or None, feature order)
+
+    CSVs are read as text so values round-trip exactly; GeoJSON keeps its JSON types.
+    """
+    path = Path(path)
+    if path.suffix in ('.geojson', '.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('type') != 'FeatureCollection':
+            raise DeltaError(f"{path} is not a FeatureCollection")
+        properties = [feature.get('properties') or {} for feature in data['features']]
+        geometries = [feature.get('geometry') for feature in data['features']]
+        columns = list(properties[0]) if properties else []
+    else:
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            properties = list(reader)
+            columns = reader.fieldnames or []
+        geometries = None
+
+    key = next((col for col in KEY_COLUMNS if col in columns), None)
+    if key is None:
+        raise DeltaError(f"{path} has no geography key column ({', '.join(KEY_COLUMNS)})")
+
+    keys = [_key_string(row.get(key)) for row in properties]
+    if len(set(keys)) != len(keys):
+        raise DeltaError(f"{path} has duplicate {key} values")
+
+    records = dict(zip(keys, properties))
+    geometry = dict(zip(keys, geometries)) if geometries is not None else None
+    return key, list(columns), records, geometry, keys
+
+def diff_releases(old_path, new_path, asset=None, from_version=None, to_version=None):
+    """Patch turning the old release into the new one
+
+    Changed values are stored column-major ({column: {key: value}}), so a metric revised
+    for a few hundred counties costs one column name plus key/value pairs.
+    """
+    old_key, old_columns, old_records, old_geometry, old_order = load_release(old_path)
+    new_key, new_columns, new_records, new_geometry, new_order = load_release(new_path)
+    if old_key != new_key:
+        raise DeltaError(f"Key column changed from {old_key} to {new_key}")
+    if (old_geometry is None) != (new_geometry is None):
+        raise DeltaError("Cannot diff a GeoJSON release against a CSV release")
+
+    added_columns = [col for col in new_columns if col not in old_columns]
+    removed_columns = [col for col in old_columns if col not in new_columns]
+    shared_columns = [col for col in new_columns if col in old_columns and col != new_key]
+
+    removed = [key for key in old_records if key not in new_records]
+    added = [key for key in new_order if key not in old_records]
+    common = [key for key in new_order if key in old_records]
+
+    changed = {}
+    for col in shared_columns + added_columns:
+        values = {}
+        for key in common:
+            new_value = new_records[key].get(col)
+            if col in added_columns or old_records[key].get(col) != new_value:
+                values[key] = new_value
+        if values:
+            changed[col] = values
+
+    added_rows = []
+    for key in added:
+        row = dict(new_records[key])
+        if new_geometry is not None:
+            row = {'type': 'Feature', 'properties': row, 'geometry': new_geometry[key]}
+        added_rows.append(row)
+
+    # Clients keep their surviving rows in place and append the added ones; only ship
+    # the full order when the new release doesn't follow that
+    default_order = [key for key in old_order if key in new_records] + added
+
+    geometry = {}
+    if new_geometry is not None:
+        geometry = {key: new_geometry[key] for key in common if old_geometry[key] != new_geometry[key]}
+
+    patch = {
+        'format': PATCH_FORMAT,
+        'asset': asset,
+        'from': from_version,
+        'to': to_version,
+        'key': new_key,
+        'columns': new_columns,
+        'removed_columns': removed_columns,
+        'removed': removed,
+        'added': added_rows,
+        'changed': changed,
+        'geometry': geometry,
+        'order': None if default_order == new_order else new_order
+    }
+    logger.info(f"Diffed {asset or new_path}: {len(added)} added, {len(removed)} removed, "
+                f"{len(set().union(*changed.values())) if changed else 0} changed rows across "
+                f"{len(changed)} columns, {len(geometry)} geometries")
+    return patch
+
+def is_empty(patch):
+    return not (patch['removed'] or patch['added'] or patch['changed'] or patch['geometry']
+                or patch['removed_columns'])
+
+def apply_patch(data, patch):
+    """Apply a patch to a base release and return the updated copy
+
+    data may be a GeoJSON FeatureCollection dict, a list of row dicts (as parsed from the
+    CSV) or a pandas DataFrame with the key column. Rows keep their order, removed rows
+    are dropped and added rows appended, matching the order of the new release.
+    """
+    if patch.get('format') != PATCH_FORMAT:
+        raise DeltaError(f"Unsupported patch format: {patch.get('format')}")
+
+    key = patch['key']
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None and isinstance(data, pd.DataFrame):
+        rows = data.astype(object).where(data.notna(), None).to_dict('records')
+        updated = _apply_rows(rows, patch, key, geojson=False)
+        return _restore_dtypes(pd.DataFrame(updated, columns=patch['columns']), data.dtypes)
+
+    if isinstance(data, dict) and data.get('type') == 'FeatureCollection':
+        features = _apply_rows(data['features'], patch, key, geojson=True)
+        return {**data, 'features': features}
+
+    return _apply_rows(list(data), patch, key, geojson=False)
+
+def _restore_dtypes(frame, dtypes):
+    """Cast patched columns back to the base frame's dtypes
+
+    Patches diffed from CSV releases carry text values, so changed and added rows would
+    otherwise leave numeric columns as strings. Columns the patch introduced are parsed
+    as numbers when every value is numeric. Empty strings are treated as missing.
+    """
+    import pandas as pd
+
+    for col in frame.columns:
+        values = frame[col].mask(frame[col].eq(''))
+        if col not in dtypes:
+            numeric = pd.to_numeric(values, errors='coerce')
+            frame[col] = numeric if numeric.notna().sum() == values.notna().sum() else frame[col]
+            continue
+
+        dtype = dtypes[col]
+        if pd.api.types.is_bool_dtype(dtype):
+            values = values.map({'True': True, 'False': False, 'true': True, 'false': False}).fillna(values)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            values = pd.to_numeric(values, errors='coerce')
+        elif dtype == object:
+            continue
+
+        # Integer and boolean columns that gained missing values keep the widened type
+        if values.isna().any() and (pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)):
+            frame[col] = values
+        else:
+            frame[col] = values.astype(dtype)
+    return frame
+
+def _apply_rows(rows, patch, key, geojson):
+    def props(row):
+        return row['properties'] if geojson else row
+
+    index = {}
+    for row in rows:
+        index[_key_string(props(row).get(key))] = row
+
+    missing = [k for k in patch['removed'] if k not in index]
+    missing += [k for values in patch['changed'].values() for k in values if k not in index]
+    if missing:
+        raise DeltaError(f"Patch does not fit this release: {len(missing)} keys missing (e.g. {missing[0]})")
+
+    removed = set(patch['removed'])
+    columns = patch['columns']
+    updated = {}
+    for k, row in index.items():
+        if k in removed:
+            continue
+        properties = {col: props(row).get(col) for col in columns}
+        if geojson:
+            updated[k] = {**row, 'properties': properties}
+        else:
+            updated[k] = properties
+
+    for col, values in patch['changed'].items():
+        for k, value in values.items():
+            props(updated[k])[col] = value
+    for k, geometry in patch['geometry'].items():
+        updated[k]['geometry'] = geometry
+    for row in patch['added']:
+        updated[_key_string(props(row).get(key))] = dict(row)
+
+    order = patch.get('order') or list(updated)
+    return [updated[k] for k in order]
+
+def write_patch(patch, path):
+    path = Path(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(patch, f, separators=(',', ':'), ensure_ascii=False)
+    return path
+
+def load_patch(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def changelog_entry(patch):
+    """Affected geographies, states and metrics for one patch"""
+    changed_keys = set().union(*patch['changed'].values()) if patch['changed'] else set()
+    added_keys = [_key_string((row.get('properties') or row).get(patch['key'])) for row in patch['added']]
+    affected = changed_keys | set(patch['geometry']) | set(patch['removed']) | set(added_keys)
+    states = sorted({state for state in map(_state_fips, affected) if state})
+
+    return {
+        'asset': patch['asset'],
+        'from': patch['from'],
+        'to': patch['to'],
+        'geographies_added': len(added_keys),
+        'geographies_removed': len(patch['removed']),
+        'geographies_changed': len(changed_keys | set(patch['geometry'])),
+        'geometries_changed': len(patch['geometry']),
+        'states_affected': states,
+        'metrics_changed': {col: len(values) for col, values in
+                            sorted(patch['changed'].items(), key=lambda item: -len(item[1]))},
+        'columns_removed': patch['removed_columns'],
+        'sample_geographies': sorted(affected)[:20]
+    }
+
+def main():
+    """Diff two releases, or apply a patch to a release"""
+    parser = argparse.ArgumentParser(description="Diff ALICE dataset releases and apply delta patches")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = subparsers.add_parser('diff', help="Write the patch from OLD to NEW")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    diff_parser.add_argument('-o', '--output', required=True, help="Patch JSON path")
+
+    apply_parser = subparsers.add_parser('apply', help="Apply PATCH to BASE")
+    apply_parser.add_argument('base')
+    apply_parser.add_argument('patch')
+    apply_parser.add_argument('-o', '--output', required=True, help="Updated release path")
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        patch = diff_releases(args.old, args.new, asset=Path(args.new).name)
+        path = write_patch(patch, args.output)
+        entry = changelog_entry(patch)
+        print(f"Patch: {path} ({path.stat().st_size / 1024:.1f}KB vs {Path(args.new).stat().st_size / 1024:.1f}KB full)")
+        print(f"  {entry['geographies_changed']} changed, {entry['geographies_added']} added, "
+              f"{entry['geographies_removed']} removed in {len(entry['states_affected'])} states")
+        for metric, count in list(entry['metrics_changed'].items())[:10]:
+            print(f"  {metric}: {count}")
+        return
+
+    base = Path(args.base)
+    patch = load_patch(args.patch)
+    output = Path(args.output)
+    if base.suffix in ('.geojson', '.json'):
+        with open(base, encoding='utf-8') as f:
+            updated = apply_patch(json.load(f), patch)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(updated, f, separators=(',', ':'), ensure_ascii=False)
+    else:
+        with open(base, encoding='utf-8', newline='') as f:
+            updated = apply_patch(list(csv.DictReader(f)), patch)
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=patch['columns'])
+            writer.writeheader()
+            writer.writerows(updated)
+    print(f"Updated release: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+ALICE Excel Reader
+Pluggable workbook readers (calamine, streaming openpyxl, pandas) that locate the header
+row and pull only the requested columns
+"""
+
+import os
+import time
+import argparse
+from pathlib import Path
+import logging
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Overrides the automatic backend choice (calamine, openpyxl or pandas)
+BACKEND_ENV_VAR = "ALICE_EXCEL_BACKEND"
+
+# Preferred backends, fastest first; calamine needs the optional python-calamine package
+BACKENDS = ['calamine', 'openpyxl', 'pandas']
+
+# Rows searched for the header (the sheets sometimes carry a title or notes above it)
+HEADER_SCAN_ROWS = 20
+
+# A row needs at least this many expected column names to count as the header
+MIN_HEADER_MATCHES = 2
+
+def _header_key(value):
+    return ' '.join(str(value).split()).casefold() if value is not None else ''
+
+def find_header(rows, columns, scan_rows=HEADER_SCAN_ROWS):
+    """(row index, {column: position}) of the row naming the most expected columns
+
+    Names are compared ignoring case and repeated whitespace. Falls back to the first
+    non-empty row when no row has MIN_HEADER_MATCHES of the columns.
+    """
+    wanted = {_header_key(col): col for col in columns}
+    best = (None, {})
+    first_non_empty = None
+
+    for index, row in enumerate(rows[:scan_rows]):
+        if first_non_empty is None and any(value not in (None, '') for value in row):
+            first_non_empty = index
+        positions = {}
+        for position, value in enumerate(row):
+            col = wanted.get(_header_key(value))
+            if col is not None and col not in positions:
+                positions[col] = position
+        if len(positions) > len(best[1]):
+            best = (index, positions)
+        if len(positions) == len(wanted):
+            break
+
+    if wanted and len(best[1]) >= min(MIN_HEADER_MATCHES, len(wanted)):
+        return best
+    if first_non_empty is None:
+        return None, {}
+    # No recognizable header: take the first non-empty row as is
+    return first_non_empty, {}
+
+def _to_frame(rows, header_index, positions, columns):
+    """DataFrame of the requested columns from the rows below the header"""
+    data_rows = rows[header_index + 1:]
+    if not positions:
+        header = [str(value) if value not in (None, '') else f"Unnamed: {i}" for i, value in enumerate(rows[header_index])]
+        positions = {name: i for i, name in enumerate(header) if columns is None or name in columns}
+
+    frame = {}
+    for col, position in positions.items():
+        values = [row[position] if position < len(row) else None for row in data_rows]
+        frame[col] = [None if value == '' else value for value in values]
+    df = pd.DataFrame(frame, columns=list(positions))
+
+    # calamine hands back every number as a float; restore whole-number columns to int
+    # as pandas' own Excel readers do
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if df[col].dtype == np.float64 and len(values) and np.isfinite(values).all() and (np.mod(values, 1) == 0).all():
+            df[col] = values.astype(np.int64)
+    return df
+
+class CalamineWorkbook:
+    """Rust calamine parser via python-calamine; no per-cell Python objects until rows are read"""
+    name = 'calamine'
+
+    def __init__(self, path):
+        from python_calamine import CalamineWorkbook as Workbook
+        self._workbook = Workbook.from_path(str(path))
+        self.sheet_names = list(self._workbook.sheet_names)
+
+    def rows(self, sheet_name):
+        return self._workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+
+    def close(self):
+        self._workbook.close()
+
+class OpenpyxlWorkbook:
+    """openpyxl in read-only mode: rows are streamed from the sheet XML without a cell model"""
+    name = 'openpyxl'
+
+    def __init__(self, path):
+        import openpyxl
+        self._workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        self.sheet_names = list(self._workbook.sheetnames)
+
+    def rows(self, sheet_name):
+        return [list(row) for row in self._workbook[sheet_name].iter_rows(values_only=True)]
+
+    def close(self):
+        self._workbook.close()
+
+class PandasWorkbook:
+    """pandas.read_excel with its default engine, the consolidator's previous path"""
+    name = 'pandas'
+
+    def __init__(self, path):
+        self._file = pd.ExcelFile(path)
+        self.sheet_names = list(self._file.sheet_names)
+
+    def rows(self, sheet_name):
+        df = self._file.parse(sheet_name, header=None)
+        return df.astype(object).where(df.notna(), None).values.tolist()
+
+    def close(self):
+        self._file.close()
+
+WORKBOOK_CLASSES = {
+    'calamine': CalamineWorkbook,
+    'openpyxl': OpenpyxlWorkbook,
+    'pandas': PandasWorkbook
+}
+
+def available_backend(backend=None):
+    """The requested backend, $ALICE_EXCEL_BACKEND, or the fastest one installed"""
+    backend = backend or os.environ.get(BACKEND_ENV_VAR)
+    if backend:
+        if backend not in WORKBOOK_CLASSES:
+            raise ValueError(f"Unknown Excel backend {backend!r}; choose from {', '.join(BACKENDS)}")
+        return backend
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+class ExcelWorkbook:
+    def __init__(self, path, backend=None):
+        self.path = Path(path)
+        self.backend = available_backend(backend)
+        self._workbook = WORKBOOK_CLASSES[self.backend](self.path)
+        self.sheet_names = self._workbook.sheet_names
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._workbook.close()
+
+    def read_sheet(self, sheet_name, columns=None):
+        """Rows below the detected header, limited to the expected columns that exist
+
+        With columns=None every column of the first non-empty row is kept.
+        """
+        rows = self._workbook.rows(sheet_name)
+        header_index, positions = find_header(rows, columns or [])
+        if header_index is None:
+            return pd.DataFrame(columns=[])
+        if header_index > 0:
+            logger.info(f"{self.path.name}/{sheet_name}: header found on row {header_index + 1}")
+        if columns:
+            missing = [col for col in columns if col not in positions]
+            if positions and missing:
+                logger.debug(f"{self.path.name}/{sheet_name}: missing columns {', '.join(missing)}")
+        return _to_frame(rows, header_index, positions, columns)
+
+def main():
+    """Time each backend on a workbook's sheets"""
+    parser = argparse.ArgumentParser(description="Compare Excel reader backends on an ALICE workbook")
+    parser.add_argument('workbook')
+    parser.add_argument('--sheets', default='County,Subcounty')
+    args = parser.parse_args()
+
+    from alice_data_consolidator import COUNTY_COLUMNS, SUBCOUNTY_COLUMNS
+    columns = {'County': COUNTY_COLUMNS, 'Subcounty': SUBCOUNTY_COLUMNS}
+
+    print(f"{'Backend':<12} {'Sheet':<12} {'Rows':>8} {'Seconds':>9}")
+    for backend in BACKENDS:
+        try:
+            workbook = ExcelWorkbook(args.workbook, backend)
+        except ImportError:
+            print(f"{backend:<12} not installed")
+            continue
+        with workbook:
+            for sheet in args.sheets.split(','):
+                if sheet not in workbook.sheet_names:
+                    continue
+                start = time.perf_counter()
+                df = workbook.read_sheet(sheet, columns.get(sheet))
+                print(f"{backend:<12} {sheet:<12} {len(df):>8,} {time.perf_counter() - start:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+ALICE County Fact Sheets
+One-page ALICE and demographics profiles for every county in the Census-integrated dataset,
+rendered in a process pool as standalone HTML (optionally PDF) with inline SVG charts
+"""
+
+import os
+import json
+import html
+import string
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import logging
+
+import numpy as np
+import pandas as pd
+
+from alice_scenarios import ALL_BRACKET_COLUMNS, BRACKET_LABELS
+from alice_tracing import StageTracer, traced
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FACTSHEET_DIR = Path('alice_factsheets')
+SOURCE_PATH = Path('alice_census_output') / 'alice_census_integrated.arrow'
+
+# Per-county input digests, so unchanged sheets are skipped on the next run
+MANIFEST_NAME = 'factsheets_manifest.json'
+
+# Simplified, projected state outlines keyed by a digest of the state's county geometry
+OUTLINE_CACHE_NAME = 'factsheet_outlines.json'
+
+# Box the state outline map is fitted into, and the simplification tolerance in its pixels
+OUTLINE_SIZE = (260, 200)
+OUTLINE_TOLERANCE_PX = 0.6
+
+# Sheets per pool task; a task carries its state's outline paths once
+CHUNK_SIZE = 64
+
+# (column, label, colour) for the household composition bar, bottom of the ladder first
+HOUSEHOLD_SEGMENTS = [
+    ('Poverty_Percentage', 'Poverty', '#d73027'),
+    ('ALICE_Percentage', 'ALICE', '#fc8d59'),
+    ('Above_ALICE_Percentage', 'Above ALICE', '#4575b4'),
+]
+
+# (column, label, format) for the indicator table; compared against the state median
+INDICATORS = [
+    ('Total_Population', 'Population', 'count'),
+    ('Households', 'Households', 'count'),
+    ('Median_Household_Income', 'Median household income', 'money'),
+    ('Median_Home_Value', 'Median home value', 'money'),
+    ('Homeownership_Rate', 'Homeownership rate', 'percent'),
+    ('College_Degree_Rate', 'College degree rate', 'percent'),
+    ('Unemployment_Rate', 'Unemployment rate', 'percent'),
+    ('Elderly_Population_Rate', 'Population 65+', 'percent'),
+    ('Work_From_Home_Rate', 'Work from home', 'percent'),
+]
+
+HIGHLIGHT_COLOR = '#764ba2'
+OUTLINE_FILL = '#e9ecef'
+
+SHEET_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+  @page { size: letter; margin: 0.5in; }
+  body { font-family: -apple-system, "Segoe UI", Roboto, Arial, sans-serif; color: #212529; max-width: 7.5in; margin: 0 auto; }
+  header { border-bottom: 3px solid #667eea; margin-bottom: 12px; }
+  h1 { margin: 0; font-size: 24px; }
+  h2 { font-size: 15px; margin: 14px 0 6px; color: #495057; }
+  .subtitle { color: #6c757d; margin: 2px 0 8px; }
+  .row { display: flex; gap: 16px; align-items: flex-start; }
+  .headline { flex: 1; }
+  .big { font-size: 40px; font-weight: 700; color: $highlight; }
+  table { border-collapse: collapse; width: 100%; font-size: 13px; }
+  th, td { padding: 4px 6px; border-bottom: 1px solid #dee2e6; text-align: right; }
+  th:first-child, td:first-child { text-align: left; }
+  footer { margin-top: 14px; font-size: 11px; color: #6c757d; }
+</style>
+</head>
+<body>
+<header>
+  <h1>$county</h1>
+  <p class="subtitle">$state &middot; GEOID $geoid</p>
+</header>
+<div class="row">
+  <div class="headline">
+    <div class="big">$below_alice</div>
+    <div>of $households households are below the ALICE threshold ($alice ALICE, $poverty in poverty).</div>
+    <p>$rank</p>
+  </div>
+  $outline
+</div>
+<h2>Household financial status</h2>
+$household_chart
+<h2>Household income distribution</h2>
+$income_chart
+<h2>Key indicators</h2>
+<table>
+  <thead><tr><th>Indicator</th><th>$county_short</th><th>$state median</th></tr></thead>
+  <tbody>
+$indicator_rows
+  </tbody>
+</table>
+<footer>ALICE data: United For ALICE state data sheets. Demographics: American Community Survey 5-year estimates. Boundaries: Census TIGER/Line.</footer>
+</body>
+</html>
+"""
+
+INDICATOR_ROW_TEMPLATE = "    <tr><td>$label</td><td>$value</td><td>$state_value</td></tr>"
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>ALICE County Fact Sheets</title></head>
+<body style="font-family: Arial, sans-serif; max-width: 960px; margin: 0 auto;">
+<h1>ALICE County Fact Sheets</h1>
+$sections
+</body>
+</html>
+"""
+
+# Compiled once per process: at import in the parent and in each pool worker
+TEMPLATES = {
+    'sheet': string.Template(SHEET_TEMPLATE),
+    'indicator_row': string.Template(INDICATOR_ROW_TEMPLATE),
+    'index': string.Template(INDEX_TEMPLATE),
+}
+
+# Part of every sheet digest, so editing the templates or charts regenerates all sheets
+TEMPLATE_VERSION = hashlib.sha256(
+    (SHEET_TEMPLATE + INDICATOR_ROW_TEMPLATE + repr(HOUSEHOLD_SEGMENTS) + repr(INDICATORS)).encode()
+).hexdigest()[:12]
+
+def format_value(value, kind):
+    if value is None or (isinstance(value, float) and not np.isfinite(value)):
+        return '&ndash;'
+    if kind == 'count':
+        return f"{value:,.0f}"
+    if kind == 'money':
+        return f"${value:,.0f}"
+    if kind == 'percent':
+        return f"{value:.1f}%"
+    return f"{value:,.1f}"
+
+def _number(value):
+    """JSON-safe float (None for missing) so contexts hash and pickle the same everywhere"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return round(value, 6) if np.isfinite(value) else None
+
+def household_chart_svg(rows, width=520, bar_height=22):
+    """Stacked 100% bars of poverty / ALICE / above-ALICE shares, one per (label, shares) row"""
+    label_width = 110
+    bar_width = width - label_width - 10
+    height = len(rows) * (bar_height + 8) + 24
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img">',
+             '<title>Household financial status</title>']
+    for i, (label, shares) in enumerate(rows):
+        y = i * (bar_height + 8)
+        parts.append(f'<text x="0" y="{y + bar_height * 0.7:.1f}" font-size="12">{html.escape(label)}</text>')
+        x = label_width
+        for (_, name, color), share in zip(HOUSEHOLD_SEGMENTS, shares):
+            w = bar_width * max(share or 0, 0) / 100
+            parts.append(f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{bar_height}" fill="{color}">'
+                         f'<title>{name}: {format_value(share, "percent")}</title></rect>')
+            if w > 34:
+                parts.append(f'<text x="{x + w / 2:.1f}" y="{y + bar_height * 0.7:.1f}" font-size="11" '
+                             f'fill="#fff" text-anchor="middle">{share:.0f}%</text>')
+            x += w
+    y = len(rows) * (bar_height + 8) + 12
+    x = label_width
+    for _, name, color in HOUSEHOLD_SEGMENTS:
+        parts.append(f'<rect x="{x}" y="{y - 9}" width="10" height="10" fill="{color}"/>'
+                     f'<text x="{x + 14}" y="{y}" font-size="11">{name}</text>')
+        x += 100
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def income_chart_svg(counts, width=520, height=150):
+    """Column chart of the share of households in each income bracket"""
+    total = sum(count for count in counts if count)
+    if not total:
+        return '<p>No income distribution available.</p>'
+    shares = [(count or 0) / total for count in counts]
+    top = max(shares)
+    plot_height = height - 22
+    column = width / len(shares)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img">',
+             '<title>Household income distribution</title>']
+    for i, (label, share) in enumerate(zip(BRACKET_LABELS, shares)):
+        h = plot_height * share / top
+        parts.append(f'<rect x="{i * column + 1:.1f}" y="{plot_height - h:.1f}" width="{column - 2:.1f}" '
+                     f'height="{h:.1f}" fill="#667eea"><title>{label.replace("_", " ")}: '
+                     f'{share * 100:.1f}%</title></rect>')
+    # Label a handful of brackets; all sixteen don't fit at this width
+    for i in (0, 4, 9, 12, len(shares) - 1):
+        label = BRACKET_LABELS[i].replace('Less_', '<').replace('_Plus', '+').split('_')[0]
+        parts.append(f'<text x="{i * column + column / 2:.1f}" y="{height - 6}" font-size="10" '
+                     f'text-anchor="middle">{html.escape(label)}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def outline_svg(outline, geoid):
+    """The state's counties in grey with this county highlighted, from cached path data"""
+    if not outline:
+        return ''
+    width, height = outline['size']
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}" role="img"><title>Location</title>',
+             f'<path d="{"".join(d for key, d in outline["paths"].items() if key != geoid)}" '
+             f'fill="{OUTLINE_FILL}" stroke="#adb5bd" stroke-width="0.5"/>']
+    if geoid in outline['paths']:
+        parts.append(f'<path d="{outline["paths"][geoid]}" fill="{HIGHLIGHT_COLOR}" stroke="#fff" stroke-width="0.5"/>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def render_sheet(context, outline):
+    """HTML for one county from its context dict and its state's outline"""
+    templates = TEMPLATES
+    indicator_rows = '\n'.join(
+        templates['indicator_row'].substitute(label=html.escape(label),
+                                              value=format_value(context['indicators'].get(col), kind),
+                                              state_value=format_value(context['state_indicators'].get(col), kind))
+        for col, label, kind in INDICATORS
+    )
+    shares = context['shares']
+    household_rows = [(context['county_short'], shares['county']), (context['state'], shares['state'])]
+    below = None if shares['county'][1] is None else (shares['county'][0] or 0) + shares['county'][1]
+    rank = (f"Ranks {context['rank']} of {context['rank_of']} counties in {html.escape(context['state'])} "
+            "by ALICE share." if context['rank'] else '')
+    return templates['sheet'].substitute(
+        title=html.escape(f"{context['county']} ALICE Fact Sheet"),
+        highlight=HIGHLIGHT_COLOR,
+        county=html.escape(context['county']),
+        county_short=html.escape(context['county_short']),
+        state=html.escape(context['state']),
+        geoid=context['geoid'],
+        below_alice=format_value(below, 'percent'),
+        households=format_value(context['indicators'].get('Households'), 'count'),
+        alice=format_value(shares['county'][1], 'percent'),
+        poverty=format_value(shares['county'][0], 'percent'),
+        rank=rank,
+        outline=outline_svg(outline, context['geoid']),
+        household_chart=household_chart_svg(household_rows),
+        income_chart=income_chart_svg(context['income']),
+        indicator_rows=indicator_rows,
+    )
+
+def _write_text(path, text):
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    tmp.replace(path)
+
+def _render_batch(outline, contexts, output_dir, pdf):
+    """Pool task: render and write a chunk of one state's sheets; returns [(geoid, error)]"""
+    results = []
+    for context in contexts:
+        try:
+            sheet = render_sheet(context, outline)
+            path = Path(output_dir) / context['path']
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_text(path, sheet)
+            if pdf:
+                from weasyprint import HTML
+                HTML(string=sheet, base_url=str(path.parent)).write_pdf(path.with_suffix('.pdf'))
+            results.append((context['geoid'], None))
+        except Exception as e:
+            results.append((context['geoid'], str(e)))
+    return results
+
+def _ring_path(coords):
+    points = ' '.join(f"{x:.1f},{y:.1f}" for x, y in coords[:-1])
+    return f"M{points}Z"
+
+def svg_path(geometry):
+    """SVG path data for a (multi)polygon already in pixel coordinates"""
+    import shapely
+
+    rings = []
+    for polygon in shapely.get_parts(geometry):
+        if polygon.is_empty or polygon.geom_type != 'Polygon':
+            continue
+        rings.append(_ring_path(np.asarray(polygon.exterior.coords)))
+        rings.extend(_ring_path(np.asarray(ring.coords)) for ring in polygon.interiors)
+    return ''.join(rings)
+
+def project_outlines(geoids, geometries, size=OUTLINE_SIZE, tolerance_px=OUTLINE_TOLERANCE_PX):
+    """Fit a state's county geometries into a size box (equirectangular at the state's latitude)"""
+    import shapely
+
+    geometries = np.asarray(geometries)
+    minx, miny, maxx, maxy = shapely.total_bounds(geometries)
+    x_scale = np.cos(np.radians((miny + maxy) / 2))
+    extent_x, extent_y = max((maxx - minx) * x_scale, 1e-9), max(maxy - miny, 1e-9)
+    scale = min((size[0] - 4) / extent_x, (size[1] - 4) / extent_y)
+    width, height = int(np.ceil(extent_x * scale)) + 4, int(np.ceil(extent_y * scale)) + 4
+
+    def to_pixels(coords):
+        return np.column_stack([(coords[:, 0] - minx) * x_scale * scale + 2, (maxy - coords[:, 1]) * scale + 2])
+
+    projected = shapely.transform(geometries, to_pixels)
+    simplified = shapely.simplify(projected, tolerance_px, preserve_topology=False)
+    return {'size': [width, height],
+            'paths': {geoid: svg_path(geometry) for geoid, geometry in zip(geoids, simplified)
+                      if geometry is not None}}
+
+def load_integrated(path):
+    """(attribute DataFrame, WKB geometry array) from the Census snapshot or its GeoJSON"""
+    path = Path(path)
+    snapshot_file = path.with_suffix('.arrow')
+    if snapshot_file.exists():
+        from alice_snapshot import open_snapshot
+        snapshot = open_snapshot(snapshot_file)
+        frame = snapshot.to_pandas()
+        wkb = snapshot.table.column(snapshot.geometry_column).to_numpy(zero_copy_only=False) \
+            if snapshot.geometry_column else None
+        return frame, wkb
+
+    import geopandas as gpd
+    import shapely
+    source = path.with_suffix('.geojson')
+    if not source.exists():
+        raise FileNotFoundError(f"{snapshot_file} (or {source}) not found; run `alice integrate-census` first")
+    gdf = gpd.read_file(source)
+    return pd.DataFrame(gdf.drop(columns=[gdf.geometry.name])), shapely.to_wkb(gdf.geometry.values)
+
+class ALICEFactSheetGenerator:
+    def __init__(self, source=SOURCE_PATH, output_dir=FACTSHEET_DIR, pdf=False, max_workers=None):
+        self.source = Path(source)
+        self.output_dir = Path(output_dir)
+        self.pdf = pdf
+        self.max_workers = max_workers
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.outline_cache_path = self.output_dir / OUTLINE_CACHE_NAME
+        self.tracer = StageTracer('factsheets', self.output_dir)
+
+        if self.pdf:
+            try:
+                import weasyprint  # noqa: F401
+            except ImportError:
+                logger.warning("weasyprint is not installed; writing HTML fact sheets only")
+                self.pdf = False
+
+    @traced('load')
+    def load_data(self):
+        frame, wkb = load_integrated(self.source)
+        frame = frame.copy()
+        frame['GEOID'] = frame['GEOID'].astype(str)
+        frame['STATEFP'] = frame['GEOID'].str[:2]
+        frame['_wkb'] = list(wkb) if wkb is not None else None
+        return frame
+
+    @traced('outlines')
+    def build_outlines(self, frame):
+        """Per-state outline paths, reprojecting and simplifying only states whose geometry changed"""
+        import shapely
+
+        cache = json.loads(self.outline_cache_path.read_text()) if self.outline_cache_path.exists() else {}
+        outlines, rebuilt = {}, 0
+        for state_fips, state in frame.groupby('STATEFP', sort=True):
+            if state['_wkb'].isna().all():
+                continue
+            digest = hashlib.sha256()
+            for geoid, wkb in zip(state['GEOID'], state['_wkb']):
+                digest.update(geoid.encode())
+                digest.update(bytes(wkb) if wkb is not None else b'')
+            digest = digest.hexdigest()[:16]
+
+            cached = cache.get(state_fips)
+            if cached is None or cached['digest'] != digest:
+                outline = project_outlines(state['GEOID'].tolist(), shapely.from_wkb(state['_wkb'].to_numpy()))
+                cached = {'digest': digest, **outline}
+                rebuilt += 1
+            outlines[state_fips] = cached
+
+        if rebuilt or set(outlines) != set(cache):
+            _write_text(self.outline_cache_path, json.dumps(outlines, separators=(',', ':')))
+        logger.info(f"State outlines: {rebuilt} rebuilt, {len(outlines) - rebuilt} from cache")
+        return outlines
+
+    def build_contexts(self, frame):
+        """Everything a sheet shows, per county; its digest decides whether the sheet is rebuilt
+
+        Comparisons stop at the state level, so new data for one state only touches that
+        state's sheets. Counties the ALICE data doesn't cover (Puerto Rico, the island
+        areas, unmatched TIGER counties) get no sheet.
+        """
+        has_data = pd.to_numeric(frame['ALICE_Percentage'], errors='coerce').notna()
+        if not has_data.all():
+            logger.info(f"Skipping {int((~has_data).sum()):,} counties with no ALICE data")
+            frame = frame[has_data.to_numpy()]
+
+        share_columns = [col for col, _, _ in HOUSEHOLD_SEGMENTS]
+        indicator_columns = [col for col, _, _ in INDICATORS if col in frame.columns]
+        income_columns = [col for col in ALL_BRACKET_COLUMNS if col in frame.columns]
+
+        numeric = frame[share_columns + indicator_columns + income_columns].apply(pd.to_numeric, errors='coerce')
+        households = numeric['Households'].fillna(0) if 'Households' in numeric else pd.Series(1.0, index=frame.index)
+
+        weighted = numeric[share_columns].mul(households, axis=0)
+        weighted['_households'] = households
+        by_state = weighted.groupby(frame['STATEFP']).sum()
+        state_shares = {state_fips: [_number(row[col] / row['_households']) if row['_households'] else None
+                                     for col in share_columns]
+                        for state_fips, row in by_state.iterrows()}
+        medians = numeric[indicator_columns].groupby(frame['STATEFP']).median()
+        state_medians = {state_fips: {col: _number(value) for col, value in row.items()}
+                         for state_fips, row in medians.iterrows()}
+        ranks = numeric['ALICE_Percentage'].groupby(frame['STATEFP']).rank(ascending=False, method='min')
+        rank_of = frame.groupby('STATEFP')['GEOID'].transform('size')
+
+        # Plain lists: per-row pandas indexing would dominate the run when nothing changed
+        rounded = numeric.astype(np.float64).round(6)
+        rounded = rounded.astype(object).where(np.isfinite(rounded), None)
+        values = {col: rounded[col].tolist() for col in rounded.columns}
+        labels = (frame['NAME'] if 'NAME' in frame else frame['GEOID']).astype(object)
+        if 'GEO display_label' in frame:
+            labels = frame['GEO display_label'].astype(object).fillna(labels)
+        states = frame['STATEFP'].astype(object)
+        if 'State' in frame:
+            states = frame['State'].astype(object).fillna(states)
+        ranks, rank_of = ranks.tolist(), rank_of.tolist()
+
+        contexts = []
+        for i, (geoid, state_fips, county, state) in enumerate(zip(frame['GEOID'], frame['STATEFP'],
+                                                                   labels.astype(str), states.astype(str))):
+            contexts.append({
+                'geoid': geoid,
+                'path': f"{state_fips}/{geoid}.html",
+                'county': county,
+                'county_short': county.split(',')[0],
+                'state': state,
+                'shares': {
+                    'county': [values[col][i] for col in share_columns],
+                    'state': state_shares[state_fips],
+                },
+                'indicators': {col: values[col][i] for col in indicator_columns},
+                'state_indicators': state_medians[state_fips],
+                'income': [values[col][i] for col in income_columns],
+                'rank': int(ranks[i]) if np.isfinite(ranks[i]) else None,
+                'rank_of': int(rank_of[i]),
+            })
+        return contexts
+
+    def sheet_digest(self, context, outline):
+        payload = json.dumps(context, sort_keys=True) + TEMPLATE_VERSION + (outline or {}).get('digest', '')
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def render(self, jobs, outlines):
+        """Render (context, digest) jobs in a process pool, chunked by state"""
+        batches = []
+        by_state = {}
+        for context, _ in jobs:
+            by_state.setdefault(context['geoid'][:2], []).append(context)
+        for state_fips, contexts in sorted(by_state.items()):
+            for start in range(0, len(contexts), CHUNK_SIZE):
+                batches.append((outlines.get(state_fips), contexts[start:start + CHUNK_SIZE]))
+
+        failed = {}
+        if len(batches) == 1:
+            # Not worth starting a pool for a handful of sheets
+            results = [_render_batch(*batches[0], self.output_dir, self.pdf)]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(_render_batch, outline, contexts, self.output_dir, self.pdf)
+                           for outline, contexts in batches]
+                results = [future.result() for future in as_completed(futures)]
+        for batch in results:
+            for geoid, error in batch:
+                if error:
+                    failed[geoid] = error
+        for geoid, error in list(failed.items())[:5]:
+            logger.error(f"Fact sheet {geoid} failed: {error}")
+        return failed
+
+    def remove_sheets(self, geoids):
+        for geoid in geoids:
+            for suffix in ('.html', '.pdf'):
+                path = self.output_dir / geoid[:2] / f"{geoid}{suffix}"
+                if path.exists():
+                    path.unlink()
+
+    def write_index(self, contexts):
+        by_state = {}
+        for context in contexts:
+            by_state.setdefault(context['state'], []).append(context)
+        sections = []
+        for state, entries in sorted(by_state.items()):
+            links = ', '.join(f'<a href="{c["path"]}">{html.escape(c["county_short"])}</a>'
+                              for c in sorted(entries, key=lambda c: c['county_short']))
+            sections.append(f"<h2>{html.escape(state)}</h2>\n<p>{links}</p>")
+        index_path = self.output_dir / 'index.html'
+        _write_text(index_path, TEMPLATES['index'].substitute(sections='\n'.join(sections)))
+        return index_path
+
+    def generate(self, force=False):
+        """Regenerate the sheets whose inputs changed; returns counts and the index path"""
+        frame = self.load_data()
+        outlines = self.build_outlines(frame)
+        # Spans rather than @traced: counting rows would walk every nested context dict
+        with self.tracer.span('plan', 'build_contexts', rows_in=len(frame)) as span:
+            contexts = self.build_contexts(frame)
+            span.rows_out = len(contexts)
+
+        manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+        jobs = []
+        for context in contexts:
+            digest = self.sheet_digest(context, outlines.get(context['geoid'][:2]))
+            previous = manifest.get(context['geoid'], {})
+            if (not force and previous.get('digest') == digest and (previous.get('pdf') or not self.pdf)
+                    and (self.output_dir / context['path']).exists()):
+                continue
+            jobs.append((context, digest))
+
+        logger.info(f"Rendering {len(jobs):,} of {len(contexts):,} fact sheets "
+                    f"({len(contexts) - len(jobs):,} unchanged){' with PDFs' if self.pdf else ''}")
+        with self.tracer.span('render', 'render', rows_in=len(jobs)) as span:
+            failed = self.render(jobs, outlines) if jobs else {}
+            span.rows_out = len(jobs) - len(failed)
+
+        current = {context['geoid'] for context in contexts}
+        removed = sorted(set(manifest) - current)
+        self.remove_sheets(removed)
+        for context, digest in jobs:
+            if context['geoid'] not in failed:
+                manifest[context['geoid']] = {'digest': digest, 'pdf': self.pdf}
+        manifest = {geoid: entry for geoid, entry in manifest.items() if geoid in current}
+        _write_text(self.manifest_path, json.dumps(manifest, indent=1, sort_keys=True))
+
+        index_path = self.write_index(contexts)
+        self.tracer.write_report("alice_factsheets_report.json")
+        return {'rendered': len(jobs) - len(failed), 'unchanged': len(contexts) - len(jobs),
+                'failed': len(failed), 'removed': len(removed), 'index': index_path}
+
+def main():
+    """Render county fact sheets from the Census-integrated dataset"""
+    parser = argparse.ArgumentParser(description="Generate one-page ALICE county fact sheets")
+    parser.add_argument('--source', default=str(SOURCE_PATH),
+                        help="Census-integrated snapshot (.arrow) or GeoJSON")
+    parser.add_argument('--output-dir', default=str(FACTSHEET_DIR))
+    parser.add_argument('--pdf', action='store_true', help="Also write PDFs (needs weasyprint)")
+    parser.add_argument('--workers', type=int, default=None, help=f"Worker processes (default {os.cpu_count()})")
+    parser.add_argument('--force', action='store_true', help="Regenerate every sheet")
+    args = parser.parse_args()
+
+    generator = ALICEFactSheetGenerator(args.source, args.output_dir, pdf=args.pdf, max_workers=args.workers)
+    result = generator.generate(force=args.force)
+    print(f"Fact sheets: {result['rendered']:,} rendered, {result['unchanged']:,} unchanged, "
+          f"{result['removed']:,} removed, {result['failed']:,} failed")
+    print(f"Index: {result['index']}")
+    return 1 if result['failed'] else 0
+
+if __name__ == "__main__":
+    main()
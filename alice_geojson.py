@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+ALICE GeoJSON Writer
+Streams GeoDataFrames to compact GeoJSON feature by feature, with quantized coordinates
+and per-column float rounding
+"""
+
+import re
+import json
+import math
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Decimal places kept for coordinates: 5 is ~1 m, 4 is ~10 m (plenty at 0.01 simplification)
+DEFAULT_PRECISION = 5
+
+# Decimal places kept for float attributes unless a column is listed in column_precision
+DEFAULT_FLOAT_DIGITS = 2
+
+# Float digits for full-precision exports, enough to round-trip the float32 schema columns
+FULL_FLOAT_DIGITS = 10
+
+# Features quantized together in one vectorized shapely call
+CHUNK_SIZE = 1000
+
+def quantize_geometries(geometries, precision=DEFAULT_PRECISION):
+    """Snap coordinates to a 10^-precision grid and drop the vertices that become redundant
+
+    set_precision removes repeated points and collapsed rings while keeping polygons valid;
+    simplify(0) then removes vertices left exactly collinear on the grid.
+    """
+    import shapely
+
+    geometries = shapely.set_precision(np.asarray(geometries, dtype=object), 10.0 ** -precision)
+    geometries = shapely.simplify(geometries, 0)
+    # Grid snapping leaves float noise such as 30.226760000000002
+    return shapely.transform(geometries, lambda coords: np.round(coords, precision))
+
+def _property_values(series, digits):
+    """JSON-ready values for one column: None for missing, rounded floats, plain ints/strings"""
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = np.round(series.to_numpy(dtype=np.float64, na_value=np.nan), digits).tolist()
+    elif pd.api.types.is_integer_dtype(series.dtype):
+        values = series.fillna(0).to_numpy(dtype=np.int64).tolist()
+    elif pd.api.types.is_bool_dtype(series.dtype):
+        values = series.fillna(False).to_numpy(dtype=bool).tolist()
+    else:
+        values = series.astype(object).tolist()
+    return [None if m or (isinstance(v, float) and not math.isfinite(v)) else v for v, m in zip(values, missing)]
+
+def _crs_member(crs):
+    """Named CRS member as GDAL writes it (omitted for WGS84, the GeoJSON default)"""
+    epsg = crs.to_epsg() if crs is not None else None
+    if epsg is None or epsg == 4326:
+        return None
+    return {'type': 'name', 'properties': {'name': f"urn:ogc:def:crs:EPSG::{epsg}"}}
+
+def write_geojson(frames, path, precision=DEFAULT_PRECISION, column_precision=None,
+                  float_digits=DEFAULT_FLOAT_DIGITS, quantize=True):
+    """Write one GeoDataFrame, or an iterable of them, as a single FeatureCollection
+
+    Features are serialized CHUNK_SIZE at a time and written immediately, so only one
+    chunk of JSON is held at once; passing per-state frames keeps the input side flat too.
+    """
+    import shapely
+    import geopandas as gpd
+
+    if isinstance(frames, gpd.GeoDataFrame):
+        frames = [frames]
+    column_precision = column_precision or {}
+    path = Path(path)
+    features = 0
+    header_written = False
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for gdf in frames:
+            if not header_written:
+                header = {'type': 'FeatureCollection', 'name': path.stem}
+                crs = _crs_member(gdf.crs)
+                if crs is not None:
+                    header['crs'] = crs
+                f.write(json.dumps(header, separators=(',', ':'))[:-1] + ',"features":[\n')
+                header_written = True
+
+            columns = [col for col in gdf.columns if col != gdf.geometry.name]
+            for start in range(0, len(gdf), CHUNK_SIZE):
+                chunk = gdf.iloc[start:start + CHUNK_SIZE]
+                geometries = chunk.geometry.values
+                if quantize:
+                    geometries = quantize_geometries(geometries, precision)
+                geometry_json = shapely.to_geojson(geometries)
+
+                values = [_property_values(chunk[col], column_precision.get(col, float_digits)) for col in columns]
+                lines = []
+                for i, geometry in enumerate(geometry_json):
+                    properties = json.dumps({col: values[c][i] for c, col in enumerate(columns)},
+                                            separators=(',', ':'), ensure_ascii=False, default=str)
+                    empty = geometry is None or shapely.is_empty(geometries[i])
+                    lines.append(f'{{"type":"Feature","properties":{properties},'
+                                 f'"geometry":{"null" if empty else geometry}}}')
+                f.write((',\n' if features else '') + ',\n'.join(lines))
+                features += len(lines)
+
+        if not header_written:
+            f.write('{"type":"FeatureCollection","name":' + json.dumps(path.stem) + ',"features":[\n')
+        f.write('\n]}\n')
+
+    logger.info(f"Wrote {features:,} features to {path} ({path.stat().st_size / 1024 ** 2:.2f} MB, "
+                f"{precision} coordinate decimals)")
+    return path
+
+def _feature_key(line, key):
+    """Key property of a one-feature-per-line GeoJSON line, without parsing the geometry"""
+    match = re.search(r'"%s"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)' % re.escape(key), line)
+    if match is None:
+        return None
+    value = json.loads(match.group(1))
+    return None if value is None else str(value)
+
+def patch_geojson(path, frame, key='GEOID', remove=(), precision=DEFAULT_PRECISION, column_precision=None,
+                  float_digits=DEFAULT_FLOAT_DIGITS, quantize=True):
+    """Rewrite frame's rows into an existing one-feature-per-line FeatureCollection
+
+    Features whose key is in frame get frame's properties (and its geometry, when frame
+    is a GeoDataFrame); keys in remove that frame doesn't have are dropped and new keys
+    are appended. Every other line is copied through as text, so a state's worth of
+    changes costs a pass over the file rather than re-encoding its geometry. Files
+    written by write_geojson or GDAL qualify; anything else raises ValueError.
+    """
+    import shapely
+    import geopandas as gpd
+
+    path = Path(path)
+    column_precision = column_precision or {}
+    geometry_name = frame.geometry.name if isinstance(frame, gpd.GeoDataFrame) else None
+    columns = [col for col in frame.columns if col != geometry_name]
+    keys = frame[key].astype(str).tolist()
+    values = [_property_values(frame[col], column_precision.get(col, float_digits)) for col in columns]
+    properties = {k: {col: values[c][i] for c, col in enumerate(columns)} for i, k in enumerate(keys)}
+
+    geometries = {}
+    if geometry_name:
+        encoded = frame.geometry.values
+        if quantize:
+            encoded = quantize_geometries(encoded, precision)
+        geometries = {k: (None if g is None or shapely.is_empty(encoded[i]) else g)
+                      for i, (k, g) in enumerate(zip(keys, shapely.to_geojson(encoded)))}
+
+    def feature_line(k, feature=None):
+        if feature is not None:
+            feature = {**feature, 'properties': {**(feature.get('properties') or {}), **properties[k]}}
+            if geometry_name:
+                feature['geometry'] = json.loads(geometries[k]) if geometries[k] else None
+            return json.dumps(feature, separators=(',', ':'), ensure_ascii=False, default=str)
+        props = json.dumps(properties[k], separators=(',', ':'), ensure_ascii=False, default=str)
+        return f'{{"type":"Feature","properties":{props},"geometry":{geometries.get(k) or "null"}}}'
+
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    feature_lines = [i for i, line in enumerate(lines) if re.match(r'\{\s*"type"\s*:\s*"Feature"\s*,', line)]
+    if not feature_lines:
+        raise ValueError(f"{path} has no one-per-line features to patch; rewrite it with write_geojson")
+
+    head, tail = lines[:feature_lines[0]], lines[feature_lines[-1] + 1:]
+    remove = set(map(str, remove))
+    features, seen, patched = [], set(), 0
+    for i in feature_lines:
+        line = lines[i].rstrip().rstrip(',')
+        k = _feature_key(line, key)
+        if k in properties:
+            features.append(feature_line(k, json.loads(line)))
+            seen.add(k)
+            patched += 1
+        elif k not in remove:
+            features.append(line)
+    added = [k for k in keys if k not in seen]
+    features.extend(feature_line(k) for k in added)
+
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(head) + '\n' + ',\n'.join(features) + '\n' + '\n'.join(tail))
+    tmp.replace(path)
+    removed = len(feature_lines) - (len(features) - len(added))
+    logger.info(f"Patched {path}: {patched:,} updated, {len(added):,} added, {removed:,} removed")
+    return path
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+ALICE Name Matching
+Fuzzy county/place name resolution against TIGER boundaries: normalization rules,
+a per-state character trigram index and sparse-matrix similarity scoring
+"""
+
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Abbreviations expanded before comparison (applied to whole words)
+ABBREVIATIONS = {
+    'st': 'saint', 'ste': 'sainte', 'ft': 'fort', 'mt': 'mount', 'pt': 'point',
+    'n': 'north', 's': 'south', 'e': 'east', 'w': 'west', 'twp': 'township'
+}
+
+# Legal/statistical area descriptions, longest first; kept separately as the name's "kind"
+# so "Baltimore city" and "Baltimore County" still resolve to different boundaries
+AREA_KINDS = [
+    'consolidated government', 'metropolitan government', 'unified government',
+    'city and borough', 'charter township', 'planning region', 'census area', 'urban county',
+    'municipality', 'municipio', 'plantation', 'township', 'borough', 'village',
+    'county', 'parish', 'town', 'city', 'cdp'
+]
+
+# Trigram Dice score needed to accept a match, and the margin the best candidate
+# needs over the runner-up to count as unambiguous
+MIN_SCORE = 0.7
+AMBIGUITY_MARGIN = 0.02
+
+# A matching kind ("city" vs "city") adds this much; a conflicting one subtracts it
+KIND_WEIGHT = 0.1
+
+_KIND_PATTERN = re.compile(r'\s+(' + '|'.join(AREA_KINDS) + r')(\s+\(balance\))?$')
+
+def repair_mojibake(text):
+    """Undo UTF-8 read as Windows-1252 (the ALICE sheets have "DoÃ±a Ana" for "Doña Ana")"""
+    try:
+        return text.encode('cp1252').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
+
+def strip_diacritics(text):
+    return unicodedata.normalize('NFKD', repair_mojibake(text)).encode('ascii', 'ignore').decode('ascii')
+
+def normalize_name(name, split_kind=True):
+    """(base name, kind) for a county or place name
+
+    "St. Mary's County" -> ("saint marys", "county"); "Doña Ana" -> ("dona ana", "");
+    "Juneau City and Borough" -> ("juneau", "city and borough"). With split_kind=False
+    the name is taken as already bare (TIGER NAME), so "Charles City" stays whole.
+    """
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return '', ''
+    text = strip_diacritics(str(name)).lower()
+    text = text.split(',')[0].replace('&', ' and ')
+    text = re.sub(r"['’`]", '', text)
+    text = re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+    kind = ''
+    match = _KIND_PATTERN.search(text) if split_kind else None
+    if match and match.start() > 0:
+        kind = match.group(1)
+        text = text[:match.start()]
+
+    words = [ABBREVIATIONS.get(word, word) for word in text.split()]
+    return ' '.join(words), kind
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Binary trigram incidence matrix over a list of normalized names"""
+
+    def __init__(self, names, vocabulary):
+        from scipy import sparse
+
+        rows, cols = [], []
+        for i, name in enumerate(names):
+            for gram in trigrams(name):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(gram, len(vocabulary)))
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.n = len(names)
+        self.sizes = np.bincount(self.rows, minlength=self.n).astype(np.float64)
+        self._sparse = sparse
+
+    def matrix(self, n_grams):
+        return self._sparse.csr_matrix((np.ones(len(self.rows)), (self.rows, self.cols)), shape=(self.n, n_grams))
+
+class NameMatcher:
+    def __init__(self, candidates, id_column='GEOID', name_column='NAME', state_column='STUSPS', kind_column=None):
+        """Index candidate boundaries (e.g. TIGER counties or places), partitioned by state
+
+        kind_column holds the full legal name (e.g. TIGER NAMELSAD) when the name column
+        has had its "County"/"city" description removed.
+        """
+        self.vocabulary = {}
+        self.blocks = {}
+
+        has_kind = kind_column is not None and kind_column in candidates.columns
+        labels = candidates[kind_column] if has_kind else candidates[name_column]
+        normalized = [normalize_name(label, split_kind=has_kind) for label in labels.astype(object)]
+        states = candidates[state_column].astype(object).fillna('').to_numpy() if state_column else np.full(len(candidates), '')
+
+        frame = pd.DataFrame({
+            'id': candidates[id_column].astype(str).to_numpy(),
+            'name': candidates[name_column].astype(object).to_numpy(),
+            'base': [base for base, _ in normalized],
+            'kind': [kind for _, kind in normalized],
+            'state': states
+        })
+        for state, block in frame.groupby('state', sort=False):
+            block = block.reset_index(drop=True)
+            self.blocks[state] = (block, TrigramIndex(block['base'].tolist(), self.vocabulary))
+
+        logger.info(f"Indexed {len(frame)} candidate names across {len(self.blocks)} states "
+                    f"({len(self.vocabulary)} trigrams)")
+
+    def _score_block(self, queries, block, index):
+        """Dice similarity of every query against every candidate in one state block"""
+        query_index = TrigramIndex(queries['base'].tolist(), self.vocabulary)
+        n_grams = len(self.vocabulary)
+        shared = (query_index.matrix(n_grams) @ index.matrix(n_grams).T).toarray()
+        scores = 2 * shared / (query_index.sizes[:, None] + index.sizes[None, :])
+
+        query_kind = queries['kind'].to_numpy()[:, None]
+        candidate_kind = block['kind'].to_numpy()[None, :]
+        known = (query_kind != '') & (candidate_kind != '')
+        scores = scores + np.where(known, np.where(query_kind == candidate_kind, KIND_WEIGHT, -KIND_WEIGHT), 0.0)
+        return np.clip(scores, 0, 1 + KIND_WEIGHT)
+
+    def match(self, names, states=None):
+        """Best candidate per query name within its state, with score and confidence
+
+        Returns one row per query: matched id/name (None when rejected), score,
+        runner-up score and a confidence of exact/high/medium/ambiguous/low/no_candidates.
+        """
+        names = pd.Series(names).astype(object).reset_index(drop=True)
+        normalized = [normalize_name(name) for name in names]
+        queries = pd.DataFrame({
+            'query': names,
+            'base': [base for base, _ in normalized],
+            'kind': [kind for _, kind in normalized],
+            'state': (pd.Series(states).astype(object).fillna('').to_numpy() if states is not None
+                      else np.full(len(names), ''))
+        })
+
+        results = []
+        for state, state_queries in queries.groupby('state', sort=False):
+            if state not in self.blocks:
+                results.append(state_queries.assign(match_id=None, match_name=None, score=0.0,
+                                                    runner_up=0.0, confidence='no_candidates'))
+                continue
+
+            block, index = self.blocks[state]
+            scores = self._score_block(state_queries, block, index)
+            order = np.argsort(-scores, axis=1, kind='stable')
+            rows = np.arange(len(state_queries))
+            best_score = scores[rows, order[:, 0]]
+            runner_up = scores[rows, order[:, 1]] if scores.shape[1] > 1 else np.zeros(len(state_queries))
+            best = block.iloc[order[:, 0]]
+
+            exact = ((best['base'].to_numpy() == state_queries['base'].to_numpy())
+                     & ((best['kind'].to_numpy() == state_queries['kind'].to_numpy())
+                        | (best['kind'].to_numpy() == '') | (state_queries['kind'].to_numpy() == '')))
+            confidence = np.select(
+                [exact & (best_score - runner_up >= AMBIGUITY_MARGIN),
+                 best_score < MIN_SCORE,
+                 best_score - runner_up < AMBIGUITY_MARGIN,
+                 best_score >= 0.85],
+                ['exact', 'low', 'ambiguous', 'high'],
+                default='medium'
+            )
+            accepted = np.isin(confidence, ['exact', 'high', 'medium'])
+
+            results.append(state_queries.assign(
+                match_id=np.where(accepted, best['id'].to_numpy(), None),
+                match_name=np.where(accepted, best['name'].to_numpy(), None),
+                score=best_score.round(4),
+                runner_up=runner_up.round(4),
+                confidence=confidence
+            ))
+
+        matches = pd.concat(results).sort_index() if results else queries.iloc[0:0]
+        counts = matches['confidence'].value_counts().to_dict()
+        logger.info(f"Matched {matches['match_id'].notna().sum()} of {len(matches)} names {counts}")
+        return matches.drop(columns=['base', 'kind'])
+
+def save_match_report(matches, path):
+    """Write the per-name match confidence report as CSV"""
+    path = Path(path)
+    matches.to_csv(path, index=False)
+    logger.info(f"Saved name match report to {path}")
+    return path
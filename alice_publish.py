@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+ALICE Data Publisher
+Copies the data files the explorer pages fetch into content-hashed, immutable filenames
+with gzip/brotli precompressed siblings and delta patches from the previous release,
+plus a manifest the pages use to resolve them
+"""
+
+import gzip
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+import logging
+
+from alice_delta import DeltaError, MAX_PATCH_RATIO, diff_releases, is_empty, write_patch, changelog_entry
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Data files fetched by the HTML pages, as the pages name them (relative to the site root)
+PUBLISHED_ASSETS = [
+    'alice_demographics_explorer_web.geojson',
+    'alice_clean_data/ALICE_Mapping_County_Data.csv',
+    'alice_clean_data/ALICE_Mapping_Subcounty_Data.csv',
+    'alice_tiger_output/alice_counties_web.geojson',
+    'alice_tiger_output/alice_subcounty_web.geojson',
+    'alice_census_output/alice_census_web.geojson',
+    'alice_census_comprehensive/alice_census_comprehensive_web.geojson',
+    'alice_census_comprehensive/variable_categories.json',
+    'alice_census_output/alice_threshold_scenarios.json',
+]
+
+PUBLISH_DIR = Path('alice_published')
+MANIFEST_NAME = 'alice_manifest.json'
+CHANGELOG_NAME = 'alice_changelog.json'
+
+# Assets diffed against their previous release into delta patches
+PATCHED_SUFFIXES = ('.csv', '.geojson')
+
+# Hex digits of the SHA-256 kept in filenames; 12 is ample for a few hundred releases
+HASH_LENGTH = 12
+
+# Skip precompressing tiny files where the encoding headers outweigh the savings
+MIN_COMPRESS_BYTES = 1024
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Releases whose hashed files are kept so pages holding an older manifest still load
+KEEP_RELEASES = 2
+
+def content_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hashed_name(logical_path, digest):
+    """alice_tiger_output/alice_counties_web.geojson -> alice_counties_web.<hash>.geojson"""
+    path = Path(logical_path)
+    return f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+def precompress(path, encodings):
+    """Write .gz/.br siblings next to path, skipping ones that already exist"""
+    written = {}
+    data = None
+    for encoding in encodings:
+        target = path.with_name(path.name + ('.gz' if encoding == 'gzip' else '.br'))
+        if not target.exists():
+            if data is None:
+                data = path.read_bytes()
+            if encoding == 'gzip':
+                # mtime=0 keeps the output byte-identical across rebuilds
+                compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+            else:
+                compressed = _brotli().compress(data, quality=BROTLI_QUALITY)
+            tmp = target.with_name(target.name + '.tmp')
+            tmp.write_bytes(compressed)
+            tmp.replace(target)
+        written[encoding] = {'url': target.name, 'bytes': target.stat().st_size}
+    return written
+
+class ALICEPublisher:
+    def __init__(self, root='.', publish_dir=PUBLISH_DIR, assets=PUBLISHED_ASSETS):
+        self.root = Path(root)
+        self.publish_dir = self.root / publish_dir
+        self.assets = list(assets)
+        self.manifest_path = self.publish_dir / MANIFEST_NAME
+        self.changelog = []
+        self.encodings = ['br', 'gzip'] if _brotli() is not None else ['gzip']
+        if 'br' not in self.encodings:
+            logger.warning("brotli is not installed; publishing gzip siblings only")
+
+    def load_manifest(self):
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text())
+        return {'assets': {}, 'previous': []}
+
+    def publish_asset(self, logical_path, previous_entry=None):
+        """Hashed copy plus precompressed siblings for one asset; unchanged assets are skipped"""
+        source = self.root / logical_path
+        digest = content_hash(source)
+        name = hashed_name(logical_path, digest)
+        target = self.publish_dir / name
+
+        unchanged = previous_entry is not None and previous_entry.get('sha256') == digest and target.exists()
+        if not target.exists():
+            tmp = target.with_name(target.name + '.tmp')
+            shutil.copyfile(source, tmp)
+            tmp.replace(target)
+
+        size = target.stat().st_size
+        encodings = self.encodings if size >= MIN_COMPRESS_BYTES else []
+        compressed = precompress(target, encodings)
+
+        entry = {
+            'url': f"{self.publish_dir.name}/{name}",
+            'sha256': digest,
+            'bytes': size,
+            'encodings': {encoding: {'url': f"{self.publish_dir.name}/{info['url']}", 'bytes': info['bytes']}
+                          for encoding, info in compressed.items()}
+        }
+        if not unchanged and previous_entry is not None and Path(logical_path).suffix in PATCHED_SUFFIXES:
+            patch = self.create_patch(logical_path, previous_entry, entry)
+            if patch is not None:
+                entry['patches'] = {previous_entry['sha256']: patch}
+        return entry, unchanged
+
+    def create_patch(self, logical_path, previous_entry, entry):
+        """Delta patch from the previous release of an asset, if smaller than MAX_PATCH_RATIO of it"""
+        old_path = self.publish_dir / Path(previous_entry['url']).name
+        if not old_path.exists():
+            logger.warning(f"Previous release of {logical_path} is gone; no patch")
+            return None
+
+        try:
+            patch = diff_releases(old_path, self.root / logical_path, asset=logical_path,
+                                  from_version=previous_entry['sha256'], to_version=entry['sha256'])
+        except DeltaError as e:
+            logger.warning(f"No patch for {logical_path}: {e}")
+            return None
+        if is_empty(patch):
+            # Byte-level change only (e.g. formatting); clients just need the new hash
+            self.changelog.append(changelog_entry(patch))
+            return None
+
+        path = Path(logical_path)
+        name = f"{path.stem}.{previous_entry['sha256'][:HASH_LENGTH]}-{entry['sha256'][:HASH_LENGTH]}.patch.json"
+        target = write_patch(patch, self.publish_dir / name)
+        size = target.stat().st_size
+        self.changelog.append(changelog_entry(patch))
+        if size > entry['bytes'] * MAX_PATCH_RATIO:
+            logger.info(f"Patch for {logical_path} is {size / entry['bytes']:.0%} of the full file; not shipped")
+            target.unlink()
+            return None
+
+        compressed = precompress(target, self.encodings if size >= MIN_COMPRESS_BYTES else [])
+        return {
+            'url': f"{self.publish_dir.name}/{name}",
+            'bytes': size,
+            'encodings': {encoding: {'url': f"{self.publish_dir.name}/{info['url']}", 'bytes': info['bytes']}
+                          for encoding, info in compressed.items()}
+        }
+
+    def write_changelog(self, manifest):
+        """Prepend this release's affected geographies and metrics to the changelog"""
+        path = self.publish_dir / CHANGELOG_NAME
+        releases = json.loads(path.read_text()) if path.exists() else []
+        releases.insert(0, {
+            'version': manifest['version'],
+            'published': manifest['published'],
+            'changed_assets': manifest['changed'],
+            'assets': self.changelog
+        })
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps(releases, indent=2))
+        tmp.replace(path)
+        return path
+
+    def prune(self, manifest):
+        """Delete hashed files not referenced by this release or the last KEEP_RELEASES - 1"""
+        keep = {MANIFEST_NAME, CHANGELOG_NAME}
+        for release in [manifest['assets']] + [previous['assets'] for previous in manifest['previous']]:
+            for entry in release.values():
+                for item in [entry] + list(entry.get('patches', {}).values()):
+                    keep.add(Path(item['url']).name)
+                    keep.update(Path(info['url']).name for info in item['encodings'].values())
+
+        removed = 0
+        for path in self.publish_dir.iterdir():
+            if path.is_file() and path.name not in keep:
+                path.unlink()
+                removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} stale published files")
+        return removed
+
+    def publish(self):
+        """Publish every available asset and write the manifest; returns the manifest"""
+        self.publish_dir.mkdir(parents=True, exist_ok=True)
+        previous = self.load_manifest()
+        self.changelog = []
+
+        assets = {}
+        changed = []
+        for logical_path in self.assets:
+            if not (self.root / logical_path).exists():
+                logger.warning(f"Skipping {logical_path}: not built")
+                continue
+            entry, unchanged = self.publish_asset(logical_path, previous['assets'].get(logical_path))
+            assets[logical_path] = entry
+            if not unchanged:
+                changed.append(logical_path)
+
+        if not changed and set(assets) == set(previous['assets']):
+            logger.info("All published assets unchanged; manifest left as is")
+            return {**previous, 'changed': []}
+
+        history = [{'version': previous['version'], 'assets': previous['assets']}] if previous['assets'] else []
+        manifest = {
+            'version': hashlib.sha256(json.dumps({path: entry['sha256'] for path, entry in sorted(assets.items())})
+                                      .encode()).hexdigest()[:HASH_LENGTH],
+            'published': datetime.now().isoformat(timespec='seconds'),
+            'assets': assets,
+            'changed': changed,
+            'previous': (history + previous.get('previous', []))[:KEEP_RELEASES - 1]
+        }
+
+        # The manifest is the only mutable file: write it last so pages never see missing assets
+        tmp = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        tmp.write_text(json.dumps(manifest, indent=2))
+        tmp.replace(self.manifest_path)
+        if history:
+            self.write_changelog(manifest)
+        self.prune(manifest)
+
+        total = sum(entry['bytes'] for entry in assets.values())
+        smallest = sum(min([entry['bytes']] + [info['bytes'] for info in entry['encodings'].values()])
+                       for entry in assets.values())
+        logger.info(f"Published {len(assets)} assets ({len(changed)} changed), "
+                    f"{total / 1024 ** 2:.2f} MB raw / {smallest / 1024 ** 2:.2f} MB compressed")
+        return manifest
+
+def main():
+    """Publish the built data files for deployment"""
+    parser = argparse.ArgumentParser(description="Publish content-hashed, precompressed ALICE data assets")
+    parser.add_argument('--root', default='.', help="Site root the pages are served from")
+    parser.add_argument('--publish-dir', default=str(PUBLISH_DIR), help="Directory for hashed assets and manifest")
+    args = parser.parse_args()
+
+    publisher = ALICEPublisher(args.root, args.publish_dir)
+    manifest = publisher.publish()
+
+    print("\n" + "="*50)
+    print("ALICE DATA PUBLISH COMPLETE")
+    print("="*50)
+    print(f"Release: {manifest.get('version', '-')}")
+    for logical_path, entry in manifest['assets'].items():
+        marker = '*' if logical_path in manifest.get('changed', []) else ' '
+        encodings = ', '.join(f"{encoding} {info['bytes'] / 1024:.0f}KB" for encoding, info in entry['encodings'].items())
+        print(f" {marker} {logical_path} -> {entry['url']} ({entry['bytes'] / 1024:.0f}KB{'; ' + encodings if encodings else ''})")
+        for patch in entry.get('patches', {}).values():
+            print(f"     patch -> {patch['url']} ({patch['bytes'] / 1024:.1f}KB)")
+    print(f"Manifest: {publisher.manifest_path}")
+    print(f"Serve {publisher.publish_dir.name}/* with 'Cache-Control: public, max-age=31536000, immutable'")
+    print(f"and {MANIFEST_NAME} with 'Cache-Control: no-cache'.")
+
+if __name__ == "__main__":
+    main()
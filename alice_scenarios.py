@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+ALICE Threshold Scenarios
+Estimates the share of households below adjusted ALICE thresholds ("what if the threshold
+rose 10%?") for every county at once, by interpolating within the ACS household income
+brackets
+"""
+
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+import alice_schema
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# ACS B19001 / B19037 household income brackets
+BRACKET_LABELS = [
+    'Less_10K', '10K_15K', '15K_20K', '20K_25K', '25K_30K', '30K_35K', '35K_40K', '40K_45K',
+    '45K_50K', '50K_60K', '60K_75K', '75K_100K', '100K_125K', '125K_150K', '150K_200K', '200K_Plus'
+]
+
+# Lower bracket edges plus an assumed ceiling for the open-ended $200K+ bracket
+BRACKET_EDGES = np.array([
+    0, 10000, 15000, 20000, 25000, 30000, 35000, 40000, 45000,
+    50000, 60000, 75000, 100000, 125000, 150000, 200000, 250000
+], dtype=np.float64)
+
+# Same names as the comprehensive Census dataset's income columns
+ALL_BRACKET_COLUMNS = [f"Income_{label}" for label in BRACKET_LABELS]
+SENIOR_BRACKET_COLUMNS = [f"Income_65_Plus_{label}" for label in BRACKET_LABELS]
+
+# Census API variables: B19001_002E-017E (all households), B19037_054E-069E (householder 65+)
+ACS_BRACKET_VARIABLES = {
+    **{f"B19001_{i + 2:03d}E": column for i, column in enumerate(ALL_BRACKET_COLUMNS)},
+    **{f"B19037_{i + 54:03d}E": column for i, column in enumerate(SENIOR_BRACKET_COLUMNS)}
+}
+
+UNDER_65_THRESHOLD = 'ALICE Threshold - HH under 65'
+SENIOR_THRESHOLD = 'ALICE Threshold - HH 65 years and over'
+
+# Threshold multipliers from -20% to +50% in 5% steps, applied to both age groups
+DEFAULT_SCENARIOS = [(round(m, 2), round(m, 2)) for m in np.arange(0.80, 1.501, 0.05)]
+
+def households_below(counts, thresholds):
+    """Households below each threshold, linearly interpolated within income brackets
+
+    counts is (n, brackets); thresholds is (scenarios, n). Returns (scenarios, n).
+    """
+    n = counts.shape[0]
+    cumulative = np.concatenate([np.zeros((n, 1)), np.cumsum(counts, axis=1)], axis=1)
+    widths = np.diff(BRACKET_EDGES)
+
+    bracket = np.clip(np.searchsorted(BRACKET_EDGES, thresholds, side='right') - 1, 0, len(widths) - 1)
+    fraction = np.clip((thresholds - BRACKET_EDGES[bracket]) / widths[bracket], 0.0, 1.0)
+    rows = np.arange(n)[None, :]
+    return cumulative[rows, bracket] + fraction * counts[rows, bracket]
+
+class ALICEScenarioEngine:
+    def __init__(self, geoids, under_65_counts, senior_counts, under_65_thresholds, senior_thresholds,
+                 reported_below=None, cache_dir=None):
+        self.geoids = np.asarray(geoids, dtype=str)
+        self.under_65_counts = np.asarray(under_65_counts, dtype=np.float64)
+        self.senior_counts = np.asarray(senior_counts, dtype=np.float64)
+        self.under_65_thresholds = np.asarray(under_65_thresholds, dtype=np.float64)
+        self.senior_thresholds = np.asarray(senior_thresholds, dtype=np.float64)
+        self.households = self.under_65_counts.sum(axis=1) + self.senior_counts.sum(axis=1)
+        self.reported_below = (np.asarray(reported_below, dtype=np.float64) if reported_below is not None
+                               else np.full(len(self.geoids), np.nan))
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.version = self._dataset_version()
+        self._memory_cache = {}
+
+    @classmethod
+    def from_frame(cls, df, geoid_column='GEOID', reported_column='Below_ALICE_Threshold_Percentage', cache_dir=None):
+        """Engine over every row with an income distribution and both ALICE thresholds
+
+        Under-65 households are all households minus the 65+ householder brackets; without
+        the 65+ brackets every household is measured against the under-65 threshold.
+        """
+        required = ALL_BRACKET_COLUMNS + [UNDER_65_THRESHOLD, SENIOR_THRESHOLD]
+        missing = [col for col in required if col not in df.columns]
+        if missing:
+            raise ValueError(f"Scenario inputs missing: {', '.join(missing[:5])}")
+
+        def numeric(columns):
+            return df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+        total = numeric(ALL_BRACKET_COLUMNS)
+        if all(col in df.columns for col in SENIOR_BRACKET_COLUMNS):
+            senior = np.fmin(numeric(SENIOR_BRACKET_COLUMNS), total)
+        else:
+            senior = np.zeros_like(total)
+        under_65 = np.clip(total - senior, 0, None)
+        thresholds = numeric([UNDER_65_THRESHOLD, SENIOR_THRESHOLD])
+        reported = numeric([reported_column])[:, 0] if reported_column in df.columns else None
+
+        usable = (np.isfinite(total).all(axis=1) & np.isfinite(senior).all(axis=1)
+                  & (total.sum(axis=1) > 0) & np.isfinite(thresholds).all(axis=1))
+        logger.info(f"Scenario engine covers {usable.sum()} of {len(df)} geographies")
+
+        return cls(
+            df[geoid_column].astype(str).to_numpy()[usable],
+            under_65[usable], senior[usable],
+            thresholds[usable, 0], thresholds[usable, 1],
+            reported[usable] if reported is not None else None,
+            cache_dir
+        )
+
+    def _dataset_version(self):
+        digest = hashlib.sha256()
+        for array in (self.geoids.astype('U'), self.under_65_counts, self.senior_counts,
+                      self.under_65_thresholds, self.senior_thresholds):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()[:16]
+
+    def _cache_path(self, scenario):
+        under_65, senior = scenario
+        return self.cache_dir / f"scenario_{self.version}_{under_65:.4f}_{senior:.4f}.npy"
+
+    def _estimate(self, scenarios):
+        """Estimated share (%) of households below each scenario's thresholds, (scenarios, n)"""
+        multipliers = np.asarray(scenarios, dtype=np.float64)
+        below = (households_below(self.under_65_counts, multipliers[:, [0]] * self.under_65_thresholds[None, :])
+                 + households_below(self.senior_counts, multipliers[:, [1]] * self.senior_thresholds[None, :]))
+        return below / self.households * 100
+
+    def simulate(self, scenarios=DEFAULT_SCENARIOS):
+        """Estimated below-threshold shares for each (under-65, 65+) multiplier pair
+
+        All uncached scenarios are evaluated together in one vectorized pass; each result
+        is then cached in memory and, with a cache_dir, on disk.
+        """
+        scenarios = [(float(under_65), float(senior)) for under_65, senior in scenarios]
+        pending = []
+        for scenario in scenarios:
+            if scenario in self._memory_cache or scenario in pending:
+                continue
+            cache_path = self._cache_path(scenario) if self.cache_dir else None
+            if cache_path is not None and cache_path.exists():
+                self._memory_cache[scenario] = np.load(cache_path)
+            else:
+                pending.append(scenario)
+
+        if pending:
+            estimates = self._estimate(pending)
+            if self.cache_dir:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for scenario, estimate in zip(pending, estimates):
+                self._memory_cache[scenario] = estimate
+                if self.cache_dir:
+                    np.save(self._cache_path(scenario), estimate)
+            logger.info(f"Simulated {len(pending)} threshold scenarios for {len(self.geoids)} geographies "
+                        f"({len(set(scenarios)) - len(pending)} cached)")
+
+        return np.stack([self._memory_cache[scenario] for scenario in scenarios]) if scenarios else np.empty((0, len(self.geoids)))
+
+    def adjusted_shares(self, scenarios=DEFAULT_SCENARIOS):
+        """Reported below-ALICE shares shifted by each scenario's modelled change from baseline
+
+        The bracket model won't reproduce United For ALICE's published shares exactly, so
+        only its change relative to the unadjusted threshold is applied to the reported value.
+        """
+        estimates = self.simulate(list(scenarios) + [(1.0, 1.0)])
+        change = estimates[:-1] - estimates[-1]
+        reported = np.where(np.isfinite(self.reported_below), self.reported_below, estimates[-1])
+        return np.clip(reported[None, :] + change, 0, 100)
+
+    def export(self, path, scenarios=DEFAULT_SCENARIOS):
+        """Write per-county adjusted shares and household-weighted national totals per scenario"""
+        scenarios = list(scenarios)
+        shares = self.adjusted_shares(scenarios)
+        national = (shares * self.households[None, :]).sum(axis=1) / self.households.sum()
+
+        payload = {
+            'version': self.version,
+            'scenarios': [{'under_65': under_65, 'senior': senior} for under_65, senior in scenarios],
+            'geoids': self.geoids.tolist(),
+            'national_below_share': [round(float(value), 2) for value in national],
+            'below_share': np.round(shares, 2).tolist()
+        }
+        path = Path(path)
+        with open(path, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        logger.info(f"Saved {len(scenarios)} threshold scenarios to {path}")
+        return path
+
+def main():
+    """Run the default scenarios over the integrated ALICE + Census data"""
+    output_dir = Path('alice_census_output')
+    df = alice_schema.read_csv(output_dir / 'alice_census_data.csv', dtype={'GEOID': str})
+    current = alice_schema.read_csv('alice_clean_data/ALICE_Current_County_Data.csv')
+    current['GEOID'] = alice_schema.fips_codes(current['GEO id2'])
+    df = df.merge(current[['GEOID', UNDER_65_THRESHOLD, SENIOR_THRESHOLD]], on='GEOID', how='left')
+
+    engine = ALICEScenarioEngine.from_frame(df, cache_dir=output_dir / 'analytics_cache')
+    path = engine.export(output_dir / 'alice_threshold_scenarios.json')
+    print(f"Threshold scenarios: {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+ALICE Data Schema
+Central dtype declarations for ALICE and Census columns, shared by every loader
+"""
+
+import pandas as pd
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Geographic identifiers: GEO id2 is numeric in the ALICE sheets (and needs int64 for
+# 10-digit county subdivisions); TIGER/Census codes keep their leading zeros as strings
+ID_DTYPES = {
+    'GEO id2': 'Int64',
+    'GEOID': 'string',
+    'GEOIDFQ': 'string',
+    'FIPS': 'string',
+    'STATEFP': 'string',
+    'COUNTYFP': 'string',
+    'COUNTYNS': 'string',
+    'state': 'string',
+    'county': 'string'
+}
+
+# Low-cardinality labels repeated on every row
+CATEGORY_COLUMNS = [
+    'State', 'State Abbr', 'Type', 'STUSPS', 'STATE_NAME', 'LSAD',
+    'Data_Source_File', 'Processing_Date', 'TIGER_Layer'
+]
+
+ALICE_COUNT_COLUMNS = [
+    'Households', 'Poverty Households', 'ALICE Households',
+    'Above ALICE Households', 'Below_ALICE_Threshold_Total'
+]
+
+ALICE_FLOAT_COLUMNS = [
+    'ALICE Threshold - HH under 65', 'ALICE Threshold - HH 65 years and over',
+    'Poverty_Percentage', 'ALICE_Percentage', 'Above_ALICE_Percentage',
+    'Below_ALICE_Threshold_Percentage'
+]
+
+# Census ACS estimates (counts, dollar medians) from both the basic and comprehensive fetches
+CENSUS_COUNT_COLUMNS = [
+    # Population by age and gender
+    'Total_Population', 'Male_Population', 'Female_Population',
+    'Male_Under_5', 'Female_Under_5', 'Male_5_9', 'Female_5_9', 'Male_10_14', 'Female_10_14',
+    'Male_15_17', 'Female_15_17', 'Male_18_19', 'Female_18_19', 'Male_20_24', 'Female_20_24',
+    'Male_25_29', 'Female_25_29', 'Male_30_34', 'Female_30_34', 'Male_35_44', 'Female_35_44',
+    'Male_45_54', 'Female_45_54', 'Male_55_64', 'Female_55_64', 'Male_65_74', 'Female_65_74',
+    'Male_75_84', 'Female_75_84', 'Male_85_Plus', 'Female_85_Plus',
+    'Under_5_Years', 'Age_65_To_74', 'Age_75_To_84', 'Age_85_Plus',
+    # Race and ethnicity
+    'Total_Race_Population', 'White_Alone', 'Black_Alone', 'Native_American_Alone', 'Asian_Alone',
+    'Pacific_Islander_Alone', 'Other_Race_Alone', 'Two_Or_More_Races',
+    'Total_Hispanic_Population', 'Not_Hispanic_Latino', 'Hispanic_Latino',
+    # Education
+    'Total_Education_Population', 'No_School', 'Grade_12_No_Diploma', 'High_School_Graduate', 'GED',
+    'Some_College_Less_1_Year', 'Some_College_1_Plus_Years', 'Associates_Degree',
+    'Bachelors_Degree', 'Masters_Degree', 'Professional_Degree', 'Doctorate_Degree',
+    # Household income
+    'Total_Household_Income', 'Income_Less_10K', 'Income_10K_15K', 'Income_15K_20K', 'Income_20K_25K',
+    'Income_25K_30K', 'Income_30K_35K', 'Income_35K_40K', 'Income_40K_45K', 'Income_45K_50K',
+    'Income_50K_60K', 'Income_60K_75K', 'Income_75K_100K', 'Income_100K_125K', 'Income_125K_150K',
+    'Income_150K_200K', 'Income_200K_Plus', 'Median_Household_Income',
+    'Income_65_Plus_Less_10K', 'Income_65_Plus_10K_15K', 'Income_65_Plus_15K_20K', 'Income_65_Plus_20K_25K',
+    'Income_65_Plus_25K_30K', 'Income_65_Plus_30K_35K', 'Income_65_Plus_35K_40K', 'Income_65_Plus_40K_45K',
+    'Income_65_Plus_45K_50K', 'Income_65_Plus_50K_60K', 'Income_65_Plus_60K_75K', 'Income_65_Plus_75K_100K',
+    'Income_65_Plus_100K_125K', 'Income_65_Plus_125K_150K', 'Income_65_Plus_150K_200K', 'Income_65_Plus_200K_Plus',
+    'Income_Under_50_Poverty', 'Income_50_99_Poverty', 'Below_Poverty_Level',
+    # Employment
+    'Total_Labor_Force', 'In_Labor_Force', 'Employed', 'Unemployed', 'Not_In_Labor_Force',
+    # Housing
+    'Total_Housing_Units', 'Occupied_Housing_Units', 'Vacant_Housing_Units',
+    'Owner_Occupied_Housing', 'Renter_Occupied_Housing', 'Median_Home_Value',
+    # Transportation
+    'Total_Commuters', 'Commute_Car_Alone', 'Commute_Carpool', 'Commute_Public_Transport',
+    'Commute_Bicycle', 'Commute_Walked', 'Commute_Other', 'Work_From_Home',
+    'No_Vehicle_Available', 'One_Vehicle_Available', 'Two_Vehicles_Available',
+    'Three_Plus_Vehicles_Available', 'Three_Plus_Vehicles',
+    # Health, veterans and disability
+    'No_Health_Insurance_Under_19', 'No_Health_Insurance_19_34', 'No_Health_Insurance_35_64',
+    'No_Health_Insurance_65_Plus', 'Veteran_Population', 'With_Disability',
+    # Households, technology and language
+    'Family_Households', 'Married_Couple_Family', 'Householder_Living_Alone',
+    'Has_Computer', 'No_Computer', 'Has_Internet_Subscription', 'No_Internet_Subscription',
+    'English_Only', 'Spanish', 'Chinese', 'Vietnamese', 'Tagalog', 'Other_Language',
+    # Integrator-derived populations
+    'ALICE_Population', 'Poverty_Population'
+]
+
+CENSUS_RATE_COLUMNS = [
+    'Population_Density', 'Homeownership_Rate', 'College_Degree_Rate', 'Elderly_Population_Rate',
+    'Minority_Population_Rate', 'Work_From_Home_Rate', 'Unemployment_Rate', 'Population_Per_Household'
+]
+
+# TIGER land/water areas (square meters) overflow int32
+AREA_COLUMNS = ['ALAND', 'AWATER']
+
+COLUMN_DTYPES = {
+    **ID_DTYPES,
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+    **{col: 'Int32' for col in ALICE_COUNT_COLUMNS + CENSUS_COUNT_COLUMNS},
+    **{col: 'float32' for col in ALICE_FLOAT_COLUMNS + CENSUS_RATE_COLUMNS},
+    **{col: 'Int64' for col in AREA_COLUMNS},
+    'Year': 'Int16'
+}
+
+# Identifier and area columns are numeric but never analysed or mapped
+NON_VARIABLE_COLUMNS = set(ID_DTYPES) | set(AREA_COLUMNS) | {'Year'}
+
+def numeric_variables(df):
+    """Numeric ALICE/Census variable columns of a frame (excludes ids, areas and geometry)"""
+    return [col for col in df.columns
+            if col not in NON_VARIABLE_COLUMNS and col != 'geometry'
+            and pd.api.types.is_numeric_dtype(df[col])]
+
+def dtypes_for(columns):
+    """Declared dtypes for the given columns (undeclared columns keep pandas inference)"""
+    return {col: COLUMN_DTYPES[col] for col in columns if col in COLUMN_DTYPES}
+
+def apply_schema(df):
+    """Cast an already-loaded frame (Excel sheets, API responses, joins) to the compact schema"""
+    for col, dtype in dtypes_for(df.columns).items():
+        if dtype in ('Int16', 'Int32', 'Int64') and not pd.api.types.is_integer_dtype(df[col]):
+            # Round away float noise from ratio columns before the integer cast
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype(dtype)
+        elif dtype == 'float32':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def read_csv(path, **kwargs):
+    """Read an ALICE/Census CSV with the shared schema and log its memory footprint"""
+    columns = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(path, dtype=dtypes_for(columns), **kwargs)
+    logger.info(f"Loaded {Path(path).name}: {len(df):,} rows, {memory_usage_mb(df):.2f} MB")
+    return df
+
+def memory_usage_mb(df):
+    """Deep memory usage of a frame in megabytes"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def fips_codes(geo_ids, width=5):
+    """Zero-padded FIPS strings from an Int64 GEO id2 column (missing ids become '')"""
+    return geo_ids.astype('string').str.zfill(width).fillna('')
+
+def compare_memory(path):
+    """Load a CSV with default inference and with the schema, returning both footprints"""
+    default_mb = memory_usage_mb(pd.read_csv(path))
+    compact_mb = memory_usage_mb(read_csv(path))
+    return default_mb, compact_mb
+
+def main():
+    """Report the memory saving of the shared schema for each dataset on disk"""
+    datasets = [
+        'alice_master_data/ALICE_Master_County_Data.csv',
+        'alice_master_data/ALICE_Master_Subcounty_Data.csv',
+        'alice_clean_data/ALICE_Current_County_Data.csv',
+        'alice_clean_data/ALICE_Mapping_County_Data.csv',
+        'alice_clean_data/ALICE_Mapping_Subcounty_Data.csv',
+        'alice_clean_data/ALICE_TimeSeries_County_Data.csv',
+        'alice_tiger_output/alice_counties_choropleth_data.csv',
+        'alice_census_output/alice_census_data.csv',
+        'alice_census_comprehensive/alice_census_comprehensive.csv'
+    ]
+
+    print("\n" + "="*83)
+    print("ALICE SCHEMA MEMORY REPORT")
+    print("="*83)
+    print(f"{'Dataset':<60} {'Default':>8} {'Schema':>8} {'Saved':>5}")
+
+    for dataset in datasets:
+        path = Path(dataset)
+        if not path.exists():
+            continue
+        default_mb, compact_mb = compare_memory(path)
+        saving = (1 - compact_mb / default_mb) * 100 if default_mb else 0
+        print(f"{dataset:<60} {default_mb:>6.2f}MB {compact_mb:>6.2f}MB {saving:>4.0f}%")
+
+    print("="*83)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+ALICE Similar-County Index
+Nearest-neighbour search over standardized ALICE + Census profiles ("counties like this one")
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+import alice_schema
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# ALICE share, income, housing and demographic profile
+DEFAULT_FEATURES = [
+    'ALICE_Percentage', 'Poverty_Percentage', 'Below_ALICE_Threshold_Percentage',
+    'Median_Household_Income', 'Median_Home_Value', 'Homeownership_Rate',
+    'College_Degree_Rate', 'Elderly_Population_Rate', 'Minority_Population_Rate',
+    'Unemployment_Rate', 'Work_From_Home_Rate', 'Population_Per_Household'
+]
+
+# Skewed dollar amounts are compared on a log scale
+LOG_FEATURES = ['Median_Household_Income', 'Median_Home_Value']
+
+class ALICESimilarityIndex:
+    def __init__(self, geoids, labels, vectors, feature_names, mean, std, components=None):
+        self.geoids = np.asarray(geoids, dtype=str)
+        self.labels = np.asarray(labels, dtype=str)
+        self.vectors = np.asarray(vectors, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.components = components
+        self.geo_index = {geoid: i for i, geoid in enumerate(self.geoids)}
+        self.tree = self._build_tree()
+
+    def _build_tree(self):
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            logger.warning("scipy not installed, falling back to brute-force neighbour search")
+            return None
+        return cKDTree(self.vectors)
+
+    @classmethod
+    def from_frame(cls, df, features=None, pca_components=None, geoid_column='GEOID', label_column='GEO display_label'):
+        """Standardize feature vectors (median-imputed) and optionally reduce them with PCA"""
+        features = [col for col in (features or DEFAULT_FEATURES) if col in df.columns]
+        if not features:
+            raise ValueError("None of the similarity features are present in the dataset")
+
+        df = df[df[geoid_column].notna()]
+        values = df[features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+        # Rows without any profile data can't be compared
+        observed = np.isfinite(values).any(axis=1)
+        df, values = df[observed], values[observed]
+
+        for i, feature in enumerate(features):
+            if feature in LOG_FEATURES:
+                values[:, i] = np.log1p(np.clip(values[:, i], 0, None))
+
+        medians = np.nanmedian(values, axis=0)
+        values = np.where(np.isfinite(values), values, medians)
+
+        mean = values.mean(axis=0)
+        std = values.std(axis=0)
+        std[std == 0] = 1.0
+        vectors = (values - mean) / std
+
+        components = None
+        if pca_components:
+            _, singular_values, vt = np.linalg.svd(vectors, full_matrices=False)
+            components = vt[:pca_components]
+            explained = (singular_values[:pca_components] ** 2).sum() / (singular_values ** 2).sum()
+            vectors = vectors @ components.T
+            logger.info(f"PCA reduced {len(features)} features to {pca_components} components ({explained:.1%} variance)")
+
+        labels = df[label_column].astype(object).fillna('').to_numpy() if label_column in df.columns else df[geoid_column]
+        logger.info(f"Built similarity index over {len(df)} geographies")
+        return cls(df[geoid_column].astype(str).to_numpy(), labels, vectors, features, mean, std, components)
+
+    def _search(self, query_vectors, k):
+        if self.tree is not None:
+            distances, indices = self.tree.query(query_vectors, k=k)
+            return np.atleast_2d(distances), np.atleast_2d(indices)
+
+        distances = np.sqrt(((query_vectors[:, None, :] - self.vectors[None, :, :]) ** 2).sum(axis=2))
+        indices = np.argsort(distances, axis=1)[:, :k]
+        return np.take_along_axis(distances, indices, axis=1), indices
+
+    def query(self, geoid, k=10):
+        """Top-k most similar geographies to one GEOID (excluding itself)"""
+        distances, indices = self.query_batch([geoid], k=k)
+        return pd.DataFrame({
+            'GEOID': self.geoids[indices[0]],
+            'label': self.labels[indices[0]],
+            'distance': distances[0]
+        })
+
+    def query_batch(self, geoids=None, k=10):
+        """Top-k neighbours for many GEOIDs (all of them by default) in one tree query"""
+        rows = np.arange(len(self.geoids)) if geoids is None else np.array([self.geo_index[g] for g in geoids])
+        k = min(k, len(self.geoids) - 1)
+        distances, indices = self._search(self.vectors[rows], k + 1)
+
+        # Drop each row's self-match (not always in column 0 when profiles tie)
+        keep = indices != rows[:, None]
+        order = np.argsort(~keep, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+    def export_neighbours(self, path, k=10):
+        """Write every geography's top-k neighbours as {GEOID: [[GEOID, distance], ...]}"""
+        distances, indices = self.query_batch(k=k)
+        neighbours = {
+            geoid: [[self.geoids[j], round(float(d), 3)] for j, d in zip(indices[i], distances[i])]
+            for i, geoid in enumerate(self.geoids)
+        }
+        path = Path(path)
+        with open(path, 'w') as f:
+            json.dump({'features': self.feature_names, 'k': k, 'neighbours': neighbours}, f, separators=(',', ':'))
+        logger.info(f"Saved {k} nearest neighbours for {len(neighbours)} geographies to {path}")
+        return path
+
+    def save(self, path):
+        """Save the standardized vectors; the tree is rebuilt on load"""
+        np.savez(
+            path,
+            geoids=self.geoids,
+            labels=self.labels,
+            vectors=self.vectors,
+            feature_names=np.asarray(self.feature_names, dtype=str),
+            mean=self.mean,
+            std=self.std,
+            components=self.components if self.components is not None else np.empty((0, 0))
+        )
+        return Path(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            components = data['components'] if data['components'].size else None
+            return cls(data['geoids'], data['labels'], data['vectors'], data['feature_names'].tolist(),
+                       data['mean'], data['std'], components)
+
+def main():
+    """Build the similar-county index from the integrated ALICE + Census data"""
+    data_path = Path('alice_census_output/alice_census_data.csv')
+    if not data_path.exists():
+        data_path = Path('alice_census_comprehensive/alice_census_comprehensive.csv')
+
+    df = alice_schema.read_csv(data_path)
+    index = ALICESimilarityIndex.from_frame(df)
+    index.save(data_path.parent / 'alice_similarity_index.npz')
+    neighbours_path = index.export_neighbours(data_path.parent / 'alice_similar_counties.json')
+
+    print(f"Similarity index: {len(index.geoids)} geographies, features: {', '.join(index.feature_names)}")
+    print(f"Neighbour lists: {neighbours_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+ALICE Snapshots
+Uncompressed Arrow IPC (Feather v2) snapshots of integrated outputs, with WKB geometry,
+that worker processes memory-map instead of parsing their own copy
+"""
+
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = '.arrow'
+
+# Schema metadata key describing geometry columns (same layout as GeoParquet's "geo")
+GEO_METADATA_KEY = b'geo'
+
+# Record batch size; batches are the unit a reader can touch without faulting in the rest
+BATCH_ROWS = 64 * 1024
+
+def snapshot_path(path):
+    """alice_counties_choropleth.geojson -> alice_counties_choropleth.arrow"""
+    return Path(path).with_suffix(SNAPSHOT_SUFFIX)
+
+def write_snapshot(frame, path):
+    """Write a DataFrame or GeoDataFrame as an uncompressed Arrow IPC file
+
+    Geometry is stored as WKB in a binary column, with its CRS in the schema metadata.
+    Buffers are left uncompressed so readers can map them straight from the page cache.
+    """
+    import pyarrow as pa
+    from pyarrow import feather
+
+    path = Path(path)
+    geometry_name = frame.geometry.name if hasattr(frame, 'set_geometry') else None
+
+    attributes = frame.drop(columns=[geometry_name]) if geometry_name else frame
+    table = pa.Table.from_pandas(attributes, preserve_index=False)
+
+    if geometry_name:
+        import shapely
+        geometries = frame.geometry.values
+        table = table.append_column(geometry_name, pa.array(shapely.to_wkb(geometries), type=pa.binary()))
+        geo = {
+            'version': '1.0.0',
+            'primary_column': geometry_name,
+            'columns': {geometry_name: {
+                'encoding': 'WKB',
+                'crs': frame.crs.to_json_dict() if frame.crs is not None else None,
+                'geometry_types': sorted(set(frame.geometry.geom_type.dropna()))
+            }}
+        }
+        metadata = {**(table.schema.metadata or {}), GEO_METADATA_KEY: json.dumps(geo).encode()}
+        table = table.replace_schema_metadata(metadata)
+
+    tmp = path.with_name(path.name + '.tmp')
+    feather.write_feather(table, tmp, compression='uncompressed', chunksize=BATCH_ROWS)
+    tmp.replace(path)
+    logger.info(f"Wrote snapshot {path}: {table.num_rows:,} rows, {table.num_columns} columns, "
+                f"{path.stat().st_size / 1024 ** 2:.2f} MB")
+    return path
+
+def save_snapshot(frame, path):
+    """write_snapshot for pipeline stages: skipped with a warning when pyarrow is missing"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning(f"pyarrow is not installed; skipping snapshot {path}")
+        return None
+    return write_snapshot(frame, path)
+
+class ALICESnapshot:
+    """A memory-mapped snapshot; columns are Arrow views onto the file, not copies
+
+    Opening reads only the schema and batch offsets, so it costs the same regardless of
+    the file size, and every process mapping the same file shares its pages.
+    """
+
+    def __init__(self, path):
+        import pyarrow as pa
+
+        self.path = Path(path)
+        self._source = pa.memory_map(str(self.path), 'r')
+        self.table = pa.ipc.open_file(self._source).read_all()
+        geo = (self.table.schema.metadata or {}).get(GEO_METADATA_KEY)
+        self.geo = json.loads(geo) if geo else None
+        self.geometry_column = self.geo['primary_column'] if self.geo else None
+        self._positions = None
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def columns(self):
+        return [name for name in self.table.column_names if name != self.geometry_column]
+
+    def column(self, name):
+        """A column as numpy; zero-copy for numeric columns without nulls"""
+        return self.table.column(name).to_numpy(zero_copy_only=False)
+
+    def positions(self, geoids, key='GEOID'):
+        """Row positions of the given ids (-1 where absent); the id index is built once"""
+        import numpy as np
+
+        if self._positions is None:
+            ids = self.table.column(key).to_pylist()
+            self._positions = {str(geoid): i for i, geoid in enumerate(ids)}
+        return np.array([self._positions.get(str(geoid), -1) for geoid in geoids], dtype=np.int64)
+
+    def to_pandas(self, columns=None, rows=None):
+        """Attribute columns as a DataFrame (this materializes a copy of just what's selected)"""
+        table = self.table.select(columns or self.columns)
+        if rows is not None:
+            table = table.take(rows)
+        return table.to_pandas()
+
+    def geometries(self, rows=None):
+        import shapely
+
+        column = self.table.column(self.geometry_column)
+        if rows is not None:
+            column = column.take(rows)
+        return shapely.from_wkb(column.to_numpy(zero_copy_only=False))
+
+    def to_geodataframe(self, columns=None, rows=None):
+        import geopandas as gpd
+        from pyproj import CRS
+
+        if self.geometry_column is None:
+            raise ValueError(f"{self.path} has no geometry column")
+        crs = self.geo['columns'][self.geometry_column].get('crs')
+        return gpd.GeoDataFrame(self.to_pandas(columns, rows), geometry=self.geometries(rows),
+                                crs=CRS.from_user_input(crs) if crs else None)
+
+    def close(self):
+        self.table = None
+        self._source.close()
+
+def open_snapshot(path):
+    return ALICESnapshot(path)
+
+def _private_memory_mb():
+    """Memory this process doesn't share with others (Linux smaps_rollup), or None"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f.read().splitlines()[1:])
+        private = sum(int(fields[key].split()[0]) for key in ('Private_Clean', 'Private_Dirty'))
+        return private / 1024
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _worker_open(path, column, queue):
+    # Library import is a fixed per-process cost, measured apart from opening the data
+    import_start = time.perf_counter()
+    import pyarrow  # noqa: F401
+    imported = time.perf_counter() - import_start
+
+    baseline = _private_memory_mb()
+    start = time.perf_counter()
+    snapshot = open_snapshot(path)
+    opened = time.perf_counter() - start
+    total = float(snapshot.column(column).sum()) if column else None
+    after = _private_memory_mb()
+    queue.put({
+        'pid': os.getpid(),
+        'import_ms': imported * 1000,
+        'open_ms': opened * 1000,
+        'column_sum': total,
+        'private_mb_added': after - baseline if baseline is not None and after is not None else None
+    })
+
+def measure_workers(path, workers=4, column=None):
+    """Open the snapshot in fresh worker processes and report per-worker start cost"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [context.Process(target=_worker_open, args=(str(path), column, queue)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return results
+
+def main():
+    """Convert an integrated output to a snapshot, then time workers opening it"""
+    parser = argparse.ArgumentParser(description="Write and check memory-mapped ALICE snapshots")
+    parser.add_argument('source', help="GeoJSON, shapefile or CSV to snapshot (or an existing .arrow file)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--column', default='Households', help="Numeric column each worker scans")
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    if source.suffix == SNAPSHOT_SUFFIX:
+        path = source
+    elif source.suffix == '.csv':
+        import alice_schema
+        path = write_snapshot(alice_schema.read_csv(source), snapshot_path(source))
+    else:
+        import geopandas as gpd
+        import alice_schema
+        path = write_snapshot(alice_schema.apply_schema(gpd.read_file(source)), snapshot_path(source))
+
+    snapshot = open_snapshot(path)
+    column = args.column if args.column in snapshot.columns else None
+    print(f"Snapshot: {path} ({path.stat().st_size / 1024 ** 2:.2f} MB, {len(snapshot):,} rows, "
+          f"geometry: {snapshot.geometry_column or 'none'})")
+    for result in measure_workers(path, args.workers, column):
+        private = f"{result['private_mb_added']:.2f} MB" if result['private_mb_added'] is not None else '-'
+        print(f"  worker {result['pid']}: opened in {result['open_ms']:.2f} ms (pyarrow import "
+              f"{result['import_ms']:.0f} ms), private memory added {private}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+ALICE Spatial Autocorrelation
+Contiguity weights from county/subcounty boundaries, global Moran's I and LISA hotspots
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERMUTATIONS = 999
+PERMUTATION_BATCH = 100
+
+# Cap on neighbour draws held at once by local_morans_i (features x permutations x slots);
+# large, well-connected layers get smaller permutation batches
+MAX_BATCH_DRAWS = 8_000_000
+SIGNIFICANCE = 0.05
+
+LISA_CLUSTERS = {
+    1: 'High-High',
+    2: 'Low-High',
+    3: 'Low-Low',
+    4: 'High-Low'
+}
+
+class ContiguityWeights:
+    def __init__(self, ids, rows, cols):
+        from scipy import sparse
+
+        self.ids = np.asarray(ids, dtype=str)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        n = len(self.ids)
+        self.binary = sparse.csr_matrix((np.ones(len(self.rows)), (self.rows, self.cols)), shape=(n, n))
+        self.neighbour_counts = np.asarray(self.binary.sum(axis=1)).ravel().astype(np.int64)
+
+    @classmethod
+    def from_geodataframe(cls, gdf, id_column='GEOID', group_column=None):
+        """Queen contiguity from spatial-index candidate pairs (no all-pairs geometry tests)
+
+        Uses 'intersects' rather than 'touches' so slivers and overlaps in the generalized
+        cartographic boundaries still link neighbours. With group_column, only features in
+        the same group (e.g. the same TIGER layer) can be neighbours.
+        """
+        geometries = gdf.geometry.values
+        left, right = gdf.sindex.query(geometries, predicate='intersects')
+
+        keep = left != right
+        if group_column is not None:
+            groups = gdf[group_column].astype(object).to_numpy()
+            keep &= groups[left] == groups[right]
+
+        left, right = left[keep], right[keep]
+        logger.info(f"Built contiguity graph: {len(gdf)} features, {len(left) // 2} neighbour pairs")
+        return cls(gdf[id_column].astype(str).to_numpy(), left, right)
+
+    @classmethod
+    def cached(cls, gdf, cache_dir, id_column='GEOID', group_column=None):
+        """Load weights for these exact geometries from the cache, building them once"""
+        import shapely
+
+        digest = hashlib.sha256()
+        digest.update(gdf[id_column].astype(str).str.cat(sep='|').encode())
+        digest.update(b''.join(shapely.to_wkb(gdf.geometry.values)))
+        if group_column is not None:
+            digest.update(gdf[group_column].astype(str).str.cat(sep='|').encode())
+        cache_path = Path(cache_dir) / f"contiguity_{digest.hexdigest()[:16]}.npz"
+
+        if cache_path.exists():
+            with np.load(cache_path, allow_pickle=False) as data:
+                logger.info(f"Using cached contiguity weights from {cache_path}")
+                return cls(data['ids'], data['rows'], data['cols'])
+
+        weights = cls.from_geodataframe(gdf, id_column, group_column)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cache_path, ids=weights.ids, rows=weights.rows, cols=weights.cols)
+        return weights
+
+    def subset(self, mask):
+        """Weights restricted to the features where mask is True"""
+        positions = np.full(len(self.ids), -1)
+        positions[mask] = np.arange(mask.sum())
+        keep = mask[self.rows] & mask[self.cols]
+        return ContiguityWeights(self.ids[mask], positions[self.rows[keep]], positions[self.cols[keep]])
+
+    def row_standardized(self):
+        """Row-standardized sparse weights (islands keep an all-zero row)"""
+        from scipy import sparse
+
+        inverse = np.divide(1.0, self.neighbour_counts, out=np.zeros(len(self.ids)), where=self.neighbour_counts > 0)
+        return sparse.diags(inverse) @ self.binary
+
+def morans_i(values, weights, permutations=DEFAULT_PERMUTATIONS, seed=42):
+    """Global Moran's I with a batched permutation pseudo p-value"""
+    W = weights.row_standardized()
+    n = len(values)
+    z = values - values.mean()
+    s0 = W.sum()
+    denominator = (z * z).sum()
+
+    observed = (n / s0) * (z @ (W @ z)) / denominator
+
+    rng = np.random.default_rng(seed)
+    simulated = []
+    for start in range(0, permutations, PERMUTATION_BATCH):
+        batch = min(PERMUTATION_BATCH, permutations - start)
+        shuffled = rng.permuted(np.tile(z[:, None], (1, batch)), axis=0)
+        simulated.append((n / s0) * (shuffled * (W @ shuffled)).sum(axis=0) / denominator)
+    simulated = np.concatenate(simulated) if simulated else np.array([])
+
+    expected = -1.0 / (n - 1)
+    larger = (simulated >= observed).sum() if observed >= expected else (simulated <= observed).sum()
+    return {
+        'I': float(observed),
+        'expected_I': expected,
+        'p_value': float((larger + 1) / (permutations + 1)),
+        'z_score': float((observed - simulated.mean()) / simulated.std()) if len(simulated) else None,
+        'n': int(n),
+        'permutations': permutations
+    }
+
+def draw_neighbours(rng, counts, batch):
+    """Random stand-in neighbours for conditional permutations, shape (n, batch, max(counts))
+
+    Each feature gets counts[i] distinct draws from the other n - 1 features, sampled
+    without replacement as the conditional randomization test requires; slots past a
+    feature's count are padding (negative). Duplicates are redrawn until none are left,
+    which takes a handful of passes because neighbour counts are tiny next to n.
+    """
+    n = len(counts)
+    max_k = counts.max() if n else 0
+    slots = np.arange(max_k)
+    padding = slots[None, None, :] >= counts[:, None, None]
+    own = np.arange(n)[:, None, None]
+
+    draws = np.zeros((n, batch, max_k), dtype=np.int64)
+    redraw = ~padding & np.ones((n, batch, max_k), dtype=bool)
+    while redraw.any():
+        fresh = rng.integers(0, n - 1, size=int(redraw.sum()))
+        # Skip each feature's own index
+        fresh += fresh >= np.broadcast_to(own, draws.shape)[redraw]
+        draws[redraw] = fresh
+        # Padding gets distinct negative values so it never collides with a real draw
+        keyed = np.where(padding, -1 - slots[None, None, :], draws)
+        order = np.argsort(keyed, axis=2, kind='stable')
+        ordered = np.take_along_axis(keyed, order, axis=2)
+        repeated = np.zeros_like(redraw)
+        repeated[:, :, 1:] = ordered[:, :, 1:] == ordered[:, :, :-1]
+        redraw = np.zeros_like(redraw)
+        np.put_along_axis(redraw, order, repeated, axis=2)
+    return np.where(padding, -1, draws)
+
+def local_morans_i(values, weights, permutations=DEFAULT_PERMUTATIONS, seed=42):
+    """LISA statistics, conditional-permutation p-values and cluster quadrants
+
+    Each feature's neighbours are replaced by random draws, without replacement, from the
+    other features; all features are simulated together, up to PERMUTATION_BATCH
+    permutations at a time (fewer when MAX_BATCH_DRAWS would be exceeded).
+    """
+    W = weights.row_standardized()
+    n = len(values)
+    z = values - values.mean()
+    m2 = (z * z).sum() / n
+    lag = W @ z
+    local_i = z / m2 * lag
+
+    counts = weights.neighbour_counts
+    max_k = counts.max() if n else 0
+    rng = np.random.default_rng(seed)
+
+    larger = np.zeros(n)
+    slot_mask = np.arange(max_k)[None, :] < counts[:, None]
+    slot_weights = np.where(slot_mask, 1.0 / np.maximum(counts, 1)[:, None], 0.0)
+    batch_size = int(max(1, min(PERMUTATION_BATCH, MAX_BATCH_DRAWS // max(n * max_k, 1))))
+
+    for start in range(0, permutations, batch_size):
+        batch = min(batch_size, permutations - start)
+        draws = draw_neighbours(rng, counts, batch)
+        # Padding slots (-1) pick up z[-1] but carry zero weight
+        simulated_lag = (z[draws] * slot_weights[:, None, :]).sum(axis=2)
+        simulated_i = (z / m2)[:, None] * simulated_lag
+        larger += np.where(local_i[:, None] >= 0, simulated_i >= local_i[:, None], simulated_i <= local_i[:, None]).sum(axis=1)
+
+    p_values = (larger + 1) / (permutations + 1)
+
+    quadrant = np.select(
+        [(z > 0) & (lag > 0), (z <= 0) & (lag > 0), (z <= 0) & (lag <= 0), (z > 0) & (lag <= 0)],
+        [1, 2, 3, 4]
+    )
+    clusters = np.where(p_values < SIGNIFICANCE, pd.Series(quadrant).map(LISA_CLUSTERS).to_numpy(), 'Not significant')
+    clusters = np.where(counts == 0, 'Isolated', clusters)
+    p_values = np.where(counts == 0, np.nan, p_values)
+
+    return local_i, p_values, clusters
+
+def spatial_autocorrelation(gdf, weights, metrics, permutations=DEFAULT_PERMUTATIONS):
+    """Add <metric>_LISA_I/_p/_Cluster columns to gdf and return global Moran's I per metric"""
+    global_stats = {}
+    ids = gdf['GEOID'].astype(str).to_numpy()
+    if not np.array_equal(ids, weights.ids):
+        raise ValueError("Weights were built for a different set of features")
+
+    for metric in metrics:
+        if metric not in gdf.columns:
+            continue
+        values = pd.to_numeric(gdf[metric], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(values)
+        metric_weights = weights.subset(valid)
+        if valid.sum() < 3 or np.ptp(values[valid]) == 0 or len(metric_weights.rows) == 0:
+            logger.warning(f"Skipping spatial autocorrelation for {metric}: no variation or no neighbours")
+            continue
+
+        local_i, p_values, clusters = local_morans_i(values[valid], metric_weights, permutations)
+        gdf[f"{metric}_LISA_I"] = np.nan
+        gdf[f"{metric}_LISA_p"] = np.nan
+        gdf[f"{metric}_LISA_Cluster"] = 'No data'
+        gdf.loc[valid, f"{metric}_LISA_I"] = local_i.round(4)
+        gdf.loc[valid, f"{metric}_LISA_p"] = p_values.round(4)
+        gdf.loc[valid, f"{metric}_LISA_Cluster"] = clusters
+
+        global_stats[metric] = morans_i(values[valid], metric_weights, permutations)
+        hotspots = (clusters == 'High-High').sum()
+        logger.info(f"{metric}: Moran's I = {global_stats[metric]['I']:.3f} "
+                    f"(p = {global_stats[metric]['p_value']:.3f}), {hotspots} High-High hotspots")
+
+    return global_stats
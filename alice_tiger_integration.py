@@ -10,33 +10,152 @@ import geopandas as gpd
 import zipfile
 import tempfile
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import logging
 
+import alice_schema
+import alice_class_breaks
+import alice_tiles
+from alice_spatial import ContiguityWeights, spatial_autocorrelation
+from alice_name_matching import NameMatcher, save_match_report
+from alice_geojson import FULL_FLOAT_DIGITS, write_geojson
+from alice_snapshot import save_snapshot
+from alice_tracing import StageTracer, traced
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# TIGER cartographic boundary layers that carry ALICE subcounty geographies
+SUBCOUNTY_LAYERS = ['place', 'cousub']
+
+COUNTY_WEB_COLUMNS = [
+    'GEOID', 'NAME', 'State', 'County', 
+    'Households', 'ALICE_Percentage', 'Poverty_Percentage',
+    'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage',
+    'GEO display_label', 'geometry'
+]
+
+SUBCOUNTY_WEB_COLUMNS = [
+    'GEOID', 'NAME', 'TIGER_Layer', 'State', 'County', 'Type',
+    'Households', 'ALICE_Percentage', 'Poverty_Percentage',
+    'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage',
+    'GEO display_label', 'geometry'
+]
+
+# Metrics tested for spatial clustering (Moran's I / LISA hotspots)
+SPATIAL_METRICS = ['ALICE_Percentage', 'Below_ALICE_Threshold_Percentage']
+
+def web_column_precision(columns):
+    """Float digits kept per web column: 2 by default, 4 for LISA statistics and p-values"""
+    return {col: 4 for col in columns if '_LISA_' in col}
+
+def subcounty_geoid(geo_id):
+    """Format a subcounty GEO id2 as a TIGER place (7) or cousub (10) GEOID"""
+    geoid = str(geo_id).split('.')[0]
+    if not geoid.isdigit():
+        return None
+    # Place GEOIDs are state + 5 digits; county subdivisions are state + county + 5 digits
+    return geoid.zfill(7) if len(geoid) <= 7 else geoid.zfill(10)
+
+def _is_cache_fresh(cache_path, source_paths):
+    """Check whether a cached output is newer than all of its inputs"""
+    if not cache_path.exists():
+        return False
+    cache_mtime = cache_path.stat().st_mtime
+    return all(cache_mtime >= Path(src).stat().st_mtime for src in source_paths)
+
+def _integrate_subcounty_state(state_fips, layer_zips, alice_state_df, alice_file, cache_dir, simplify_tolerance):
+    """Join one state's ALICE subcounty rows with its TIGER place/cousub layers
+
+    Runs in a worker process; writes the joined and simplified state partitions
+    to the cache directory and returns their paths.
+    """
+    joined_path = cache_dir / f"alice_subcounty_{state_fips}.geojson"
+    web_path = cache_dir / f"alice_subcounty_{state_fips}_web.geojson"
+    sources = list(layer_zips.values()) + [alice_file]
+    
+    if _is_cache_fresh(joined_path, sources) and _is_cache_fresh(web_path, sources):
+        return state_fips, joined_path, web_path, None
+    
+    layers = []
+    for layer, zip_path in layer_zips.items():
+        # Read straight from the archive so only one state's layer is in memory
+        layer_gdf = gpd.read_file(f"zip://{zip_path}")
+        layer_gdf['GEOID'] = layer_gdf['GEOID'].astype(str)
+        layer_gdf['TIGER_Layer'] = layer
+        layers.append(layer_gdf)
+    
+    boundaries_gdf = gpd.GeoDataFrame(pd.concat(layers, ignore_index=True), crs=layers[0].crs)
+    merged_gdf = boundaries_gdf.merge(alice_state_df, on='GEOID', how='inner')
+    
+    # GEOIDs that don't exist in this TIGER vintage fall back to fuzzy name matching
+    unmatched = alice_state_df[~alice_state_df['GEOID'].isin(boundaries_gdf['GEOID'])]
+    if len(unmatched) > 0 and 'GEO display_label' in unmatched.columns:
+        remaining = boundaries_gdf[~boundaries_gdf['GEOID'].isin(merged_gdf['GEOID'])]
+        matcher = NameMatcher(remaining, state_column=None, kind_column='NAMELSAD')
+        matches = matcher.match(unmatched['GEO display_label'].to_numpy())
+        save_match_report(matches, cache_dir / f"alice_subcounty_{state_fips}_name_matches.csv")
+        
+        renamed = unmatched.assign(GEOID=matches['match_id'].to_numpy()).dropna(subset=['GEOID'])
+        renamed = renamed.drop_duplicates('GEOID')
+        if len(renamed) > 0:
+            merged_gdf = pd.concat([merged_gdf, remaining.merge(renamed, on='GEOID', how='inner')], ignore_index=True)
+    
+    merged_gdf.to_file(joined_path, driver='GeoJSON')
+    
+    web_gdf = merged_gdf[[col for col in SUBCOUNTY_WEB_COLUMNS if col in merged_gdf.columns]].copy()
+    web_gdf['geometry'] = web_gdf['geometry'].simplify(simplify_tolerance)
+    write_geojson(web_gdf, web_path)
+    
+    return state_fips, joined_path, web_path, (len(alice_state_df), len(merged_gdf))
+
 class ALICETigerIntegrator:
     def __init__(self, data_dir="data/tiger", alice_dir="alice_clean_data", output_dir="alice_tiger_output"):
         self.data_dir = Path(data_dir)
         self.alice_dir = Path(alice_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.tracer = StageTracer('tiger', self.output_dir)
         
+    @traced('load')
     def load_alice_data(self):
         """Load ALICE county data"""
         alice_file = self.alice_dir / "ALICE_Mapping_County_Data.csv"
         logger.info(f"Loading ALICE data from {alice_file}")
         
-        df = pd.read_csv(alice_file)
+        df = alice_schema.read_csv(alice_file)
         
-        # Clean FIPS codes (remove decimals)
-        df['FIPS'] = df['GEO id2'].astype(str).str.split('.').str[0].str.zfill(5)
+        # GEO id2 is an Int64 column, so FIPS only needs zero padding
+        df['FIPS'] = alice_schema.fips_codes(df['GEO id2'])
         
         logger.info(f"Loaded {len(df)} ALICE county records")
         return df
     
+    @traced('load')
+    def load_alice_subcounty_data(self):
+        """Load ALICE subcounty data keyed by TIGER GEOID"""
+        alice_file = self.alice_dir / "ALICE_Mapping_Subcounty_Data.csv"
+        logger.info(f"Loading ALICE subcounty data from {alice_file}")
+        
+        df = alice_schema.read_csv(alice_file)
+        df['GEOID'] = df['GEO id2'].map(subcounty_geoid)
+        df = df[df['GEOID'].notna()].copy()
+        df['STATEFP'] = df['GEOID'].str[:2]
+        
+        logger.info(f"Loaded {len(df)} ALICE subcounty records across {df['STATEFP'].nunique()} states")
+        return df
+    
+    def find_state_layer_zip(self, state_fips, layer):
+        """Locate a state's TIGER cartographic boundary zip for a subcounty layer"""
+        filename = f"cb_2023_{state_fips}_{layer}_500k.zip"
+        for candidate in [self.data_dir / "GENZ" / filename, self.data_dir / filename]:
+            if candidate.exists():
+                return candidate
+        return None
+    
+    @traced('load')
     def extract_county_shapefile(self):
         """Extract and load county shapefile from Tiger data"""
         county_zip = self.data_dir / "GENZ" / "cb_2023_us_county_500k.zip"
@@ -65,17 +184,20 @@ class ALICETigerIntegrator:
             
             return gdf
     
+    @traced('join')
     def create_county_choropleth_data(self):
         """Join ALICE data with county boundaries"""
         logger.info("Creating county choropleth data...")
         
-        # Load data
-        alice_df = self.load_alice_data()
-        counties_gdf = self.extract_county_shapefile()
+        # The CSV parse and the shapefile unzip/decode are independent, so overlap them
+        inputs = self.tracer.gather({
+            'alice_csv': self.load_alice_data,
+            'county_boundaries': self.extract_county_shapefile
+        })
+        alice_df, counties_gdf = inputs['alice_csv'], inputs['county_boundaries']
         
         # Ensure FIPS codes are strings and properly formatted
         counties_gdf['GEOID'] = counties_gdf['GEOID'].astype(str).str.zfill(5)
-        alice_df['FIPS'] = alice_df['GEO id2'].astype(str).str.split('.').str[0].str.zfill(5)
         
         # Filter out rows with missing or invalid FIPS codes
         valid_fips_alice = alice_df[alice_df['FIPS'].str.len() == 5].copy()
@@ -152,28 +274,27 @@ class ALICETigerIntegrator:
             
             missing_fips_alice['State_Abbr'] = missing_fips_alice['State'].map(state_mapping)
             
-            # Try to match on state and county name
-            for idx, alice_row in missing_fips_alice.iterrows():
-                if pd.isna(alice_row['County']) or pd.isna(alice_row['State_Abbr']):
+            # Fuzzy-match names within each state (St./Saint, diacritics, "City and Borough", ...)
+            matcher = NameMatcher(counties_gdf, name_column='NAME', state_column='STUSPS', kind_column='NAMELSAD')
+            query_names = missing_fips_alice['County'].astype(object)
+            if 'GEO display_label' in missing_fips_alice.columns:
+                query_names = missing_fips_alice['GEO display_label'].astype(object).fillna(query_names)
+            matches = matcher.match(query_names.to_numpy(), missing_fips_alice['State_Abbr'].to_numpy())
+            save_match_report(matches, self.output_dir / "alice_counties_name_matches.csv")
+            
+            matched = missing_fips_alice.assign(GEOID=matches['match_id'].to_numpy()).dropna(subset=['GEOID'])
+            matched = matched.drop_duplicates('GEOID').set_index('GEOID')
+            
+            # Update the merged data for the matched counties (non-missing values only)
+            for col in ['Households', 'Poverty_Percentage', 'ALICE_Percentage',
+                        'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage', 'State', 'County']:
+                if col not in matched.columns:
                     continue
-                    
-                # Find matching county in shapefile
-                county_match = counties_gdf[
-                    (counties_gdf['STUSPS'] == alice_row['State_Abbr']) & 
-                    (counties_gdf['NAME'].str.lower() == alice_row['County'].lower())
-                ]
-                
-                if len(county_match) == 1:
-                    geoid = county_match.iloc[0]['GEOID']
-                    # Update the merged data for this county
-                    mask = merged_gdf['GEOID'] == geoid
-                    for col in ['Households', 'Poverty_Percentage', 'ALICE_Percentage', 
-                               'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage']:
-                        if col in alice_row and pd.notna(alice_row[col]):
-                            merged_gdf.loc[mask, col] = alice_row[col]
-                    merged_gdf.loc[mask, 'State'] = alice_row['State']
-                    merged_gdf.loc[mask, 'County'] = alice_row['County']
-                    logger.info(f"Matched {alice_row['County']}, {alice_row['State']} via name lookup")
+                updates = merged_gdf['GEOID'].map(matched[col].astype(object))
+                dtype = merged_gdf[col].dtype
+                values = merged_gdf[col].astype(object).where(updates.isna(), updates)
+                merged_gdf[col] = values.astype('category' if isinstance(dtype, pd.CategoricalDtype) else dtype)
+            logger.info(f"Matched {len(matched)} of {len(missing_fips_alice)} counties via name lookup")
         
         logger.info(f"Merged {len(merged_gdf)} counties")
         logger.info(f"Counties with ALICE data: {merged_gdf['ALICE_Percentage'].notna().sum()}")
@@ -183,7 +304,8 @@ class ALICETigerIntegrator:
         
         return merged_gdf
     
-    def save_choropleth_data(self, gdf, format_types=['geojson', 'shapefile']):
+    @traced('save')
+    def save_choropleth_data(self, gdf, format_types=['geojson', 'shapefile', 'arrow']):
         """Save choropleth data in various formats"""
         base_name = "alice_counties_choropleth"
         
@@ -197,6 +319,10 @@ class ALICETigerIntegrator:
             logger.info(f"Saving Shapefile to {shp_path}")
             gdf.to_file(shp_path, driver='ESRI Shapefile')
         
+        if 'arrow' in format_types:
+            # Memory-mapped by serving/analysis workers instead of re-parsing the GeoJSON
+            save_snapshot(gdf, self.output_dir / f"{base_name}.arrow")
+        
         # Save attribute data as CSV for reference
         csv_path = self.output_dir / f"{base_name}_data.csv"
         logger.info(f"Saving attribute data to {csv_path}")
@@ -205,6 +331,7 @@ class ALICETigerIntegrator:
         
         return geojson_path if 'geojson' in format_types else shp_path
     
+    @traced('simplify')
     def create_web_ready_geojson(self, gdf, simplify_tolerance=0.01):
         """Create a web-optimized GeoJSON file"""
         logger.info("Creating web-optimized GeoJSON...")
@@ -214,31 +341,139 @@ class ALICETigerIntegrator:
         gdf_simplified['geometry'] = gdf_simplified['geometry'].simplify(simplify_tolerance)
         
         # Select key columns for web mapping
-        web_columns = [
-            'GEOID', 'NAME', 'State', 'County', 
-            'Households', 'ALICE_Percentage', 'Poverty_Percentage',
-            'Below_ALICE_Threshold_Percentage', 'Above_ALICE_Percentage',
-            'GEO display_label', 'geometry'
-        ]
+        web_columns = list(COUNTY_WEB_COLUMNS)
+        
+        # Hotspot attributes from create_spatial_autocorrelation, when present
+        web_columns += [col for col in gdf_simplified.columns if '_LISA_' in col]
         
         # Filter to existing columns
         available_columns = [col for col in web_columns if col in gdf_simplified.columns]
         web_gdf = gdf_simplified[available_columns].copy()
         
-        # Save web-optimized version
+        # Save web-optimized version (4 decimals is ~10 m, well under the simplify tolerance)
         web_path = self.output_dir / "alice_counties_web.geojson"
         logger.info(f"Saving web-optimized GeoJSON to {web_path}")
-        web_gdf.to_file(web_path, driver='GeoJSON')
+        write_geojson(web_gdf, web_path, precision=4, column_precision=web_column_precision(web_gdf.columns))
         
         return web_path
     
+    @traced('join')
+    def create_subcounty_choropleth_data(self, simplify_tolerance=0.001, max_workers=None):
+        """Join ALICE subcounty data with TIGER place and cousub boundaries, state by state"""
+        logger.info("Creating subcounty choropleth data...")
+        
+        alice_df = self.load_alice_subcounty_data()
+        alice_file = self.alice_dir / "ALICE_Mapping_Subcounty_Data.csv"
+        cache_dir = self.output_dir / "subcounty_states"
+        cache_dir.mkdir(exist_ok=True)
+        
+        jobs = []
+        for state_fips, alice_state_df in alice_df.groupby('STATEFP'):
+            layer_zips = {}
+            for layer in SUBCOUNTY_LAYERS:
+                zip_path = self.find_state_layer_zip(state_fips, layer)
+                if zip_path is not None:
+                    layer_zips[layer] = zip_path
+            
+            if not layer_zips:
+                logger.warning(f"No TIGER place/cousub boundaries found for state {state_fips}, skipping")
+                continue
+            
+            jobs.append((state_fips, layer_zips, alice_state_df.drop(columns=['STATEFP'])))
+        
+        state_outputs = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_integrate_subcounty_state, state_fips, layer_zips, alice_state_df,
+                                alice_file, cache_dir, simplify_tolerance)
+                for state_fips, layer_zips, alice_state_df in jobs
+            ]
+            for future in as_completed(futures):
+                state_fips, joined_path, web_path, counts = future.result()
+                state_outputs[state_fips] = (joined_path, web_path)
+                if counts is None:
+                    logger.info(f"State {state_fips}: using cached subcounty join")
+                else:
+                    logger.info(f"State {state_fips}: matched {counts[1]} of {counts[0]} ALICE subcounty records")
+        
+        logger.info(f"Integrated subcounty boundaries for {len(state_outputs)} states")
+        return dict(sorted(state_outputs.items()))
+    
+    @traced('save')
+    def save_subcounty_choropleth_data(self, state_outputs):
+        """Combine per-state subcounty partitions into national outputs
+
+        The hotspot statistics and the snapshot need every state at once; the GeoJSON
+        exports are streamed from the per-state partitions, one state in memory at a time.
+        """
+        base_name = "alice_subcounty_choropleth"
+        
+        joined_gdf = pd.concat([gpd.read_file(paths[0]) for paths in state_outputs.values()], ignore_index=True)
+        joined_gdf = gpd.GeoDataFrame(joined_gdf, crs=joined_gdf.crs)
+        
+        # Places and county subdivisions overlap, so each layer gets its own neighbour graph
+        self.create_spatial_autocorrelation(joined_gdf, group_column='TIGER_Layer',
+                                            stats_name="alice_subcounty_morans_i.json")
+        lisa_columns = [col for col in joined_gdf.columns if '_LISA_' in col]
+        
+        csv_path = self.output_dir / f"{base_name}_data.csv"
+        logger.info(f"Saving attribute data to {csv_path}")
+        joined_gdf.drop(columns=['geometry']).to_csv(csv_path, index=False)
+        save_snapshot(joined_gdf, self.output_dir / f"{base_name}.arrow")
+        
+        lisa_df = pd.DataFrame(joined_gdf[['GEOID'] + lisa_columns])
+        
+        def states(partition):
+            # One state's partition in memory at a time
+            for paths in state_outputs.values():
+                state_gdf = gpd.read_file(paths[partition])
+                yield state_gdf.merge(lisa_df, on='GEOID', how='left')
+        
+        geojson_path = self.output_dir / f"{base_name}.geojson"
+        logger.info(f"Saving GeoJSON to {geojson_path}")
+        write_geojson(states(0), geojson_path, float_digits=FULL_FLOAT_DIGITS, quantize=False)
+        
+        web_path = self.output_dir / "alice_subcounty_web.geojson"
+        logger.info(f"Saving web-optimized GeoJSON to {web_path}")
+        write_geojson(states(1), web_path, column_precision=web_column_precision(lisa_columns))
+        
+        return joined_gdf, geojson_path, web_path
+    
+    @traced('spatial')
+    def create_spatial_autocorrelation(self, gdf, metrics=SPATIAL_METRICS, group_column=None,
+                                       stats_name="alice_counties_morans_i.json"):
+        """Add LISA hotspot attributes to gdf and save global Moran's I per metric"""
+        weights = ContiguityWeights.cached(gdf, self.output_dir / "spatial_cache", group_column=group_column)
+        global_stats = spatial_autocorrelation(gdf, weights, metrics)
+        
+        stats_path = self.output_dir / stats_name
+        with open(stats_path, 'w') as f:
+            json.dump(global_stats, f, indent=2, default=str)
+        
+        logger.info(f"Spatial autocorrelation saved to {stats_path}")
+        return global_stats
+    
+    @traced('breaks')
+    def create_class_breaks(self, gdf, n_classes=alice_class_breaks.DEFAULT_CLASSES):
+        """Precompute national and per-state choropleth class breaks for the web layer"""
+        legend = alice_class_breaks.compute_class_breaks(gdf.drop(columns=['geometry']), n_classes=n_classes)
+        legend_path = self.output_dir / "alice_counties_legend.json"
+        return alice_class_breaks.save_legend(legend, legend_path, n_classes=n_classes)
+    
+    @traced('tiles')
+    def create_tiles(self, gdf, layer):
+        """Pre-render the low zoom choropleth tiles for every page metric"""
+        renderer = alice_tiles.seed_tiles(gdf, layer, alice_tiles.COLOR_SCALES, tiles_dir=self.output_dir / "tiles")
+        return renderer.cache.directory
+    
+    @traced('stats')
     def create_summary_stats(self, gdf):
         """Create summary statistics file"""
         stats = {
             'total_counties': len(gdf),
             'counties_with_alice_data': gdf['ALICE_Percentage'].notna().sum(),
-            'avg_alice_percentage': gdf['ALICE_Percentage'].mean(),
-            'avg_poverty_percentage': gdf['Poverty_Percentage'].mean(),
+            'avg_alice_percentage': float(gdf['ALICE_Percentage'].mean()),
+            'avg_poverty_percentage': float(gdf['Poverty_Percentage'].mean()),
             'total_households': gdf['Households'].sum(),
             'data_coverage_percent': (gdf['ALICE_Percentage'].notna().sum() / len(gdf)) * 100,
             'projection': str(gdf.crs) if gdf.crs else 'Unknown'
@@ -259,20 +494,32 @@ class ALICETigerIntegrator:
             # Create choropleth data
             choropleth_gdf = self.create_county_choropleth_data()
             
+            # Flag clusters of high-ALICE counties before the outputs are written
+            self.create_spatial_autocorrelation(choropleth_gdf)
+            
             # Save in multiple formats
             main_file = self.save_choropleth_data(choropleth_gdf)
             
             # Create web-optimized version
             web_file = self.create_web_ready_geojson(choropleth_gdf)
             
+            # Precompute legend class breaks so the pages don't classify in the browser
+            legend_file = self.create_class_breaks(choropleth_gdf)
+            
+            # Seed the raster tiles low-end clients use instead of the full GeoJSON
+            tiles_dir = self.create_tiles(choropleth_gdf, 'counties')
+            
             # Generate summary stats
             stats = self.create_summary_stats(choropleth_gdf)
             
+            self.tracer.write_report()
             logger.info("Integration complete!")
             
             return {
                 'choropleth_file': main_file,
                 'web_file': web_file,
+                'legend_file': legend_file,
+                'tiles_dir': tiles_dir,
                 'stats': stats,
                 'output_dir': self.output_dir
             }
@@ -280,6 +527,45 @@ class ALICETigerIntegrator:
         except Exception as e:
             logger.error(f"Integration failed: {e}")
             raise
+    
+    def run_subcounty_integration(self):
+        """Run the subcounty integration process"""
+        logger.info("Starting ALICE-Tiger subcounty integration...")
+        
+        try:
+            state_outputs = self.create_subcounty_choropleth_data()
+            if not state_outputs:
+                raise FileNotFoundError(f"No TIGER place/cousub boundaries found under {self.data_dir}")
+            
+            joined_gdf, main_file, web_file = self.save_subcounty_choropleth_data(state_outputs)
+            self.create_tiles(joined_gdf, 'subcounty')
+            
+            stats = {
+                'total_subcounty_areas': len(joined_gdf),
+                'states_integrated': len(state_outputs),
+                'areas_by_layer': joined_gdf['TIGER_Layer'].value_counts().to_dict(),
+                'avg_alice_percentage': float(joined_gdf['ALICE_Percentage'].mean()),
+                'total_households': joined_gdf['Households'].sum(),
+                'projection': str(joined_gdf.crs) if joined_gdf.crs else 'Unknown'
+            }
+            stats_path = self.output_dir / "alice_subcounty_integration_stats.json"
+            with open(stats_path, 'w') as f:
+                json.dump(stats, f, indent=2, default=str)
+            
+            self.tracer.write_report()
+            logger.info("Subcounty integration complete!")
+            
+            return {
+                'choropleth_file': main_file,
+                'web_file': web_file,
+                'state_dir': self.output_dir / "subcounty_states",
+                'stats': stats,
+                'output_dir': self.output_dir
+            }
+            
+        except Exception as e:
+            logger.error(f"Subcounty integration failed: {e}")
+            raise
 
 def main():
     """Main function"""
@@ -292,10 +578,19 @@ def main():
     print(f"Output directory: {result['output_dir']}")
     print(f"Main choropleth file: {result['choropleth_file']}")
     print(f"Web-optimized file: {result['web_file']}")
+    print(f"Class breaks legend: {result['legend_file']}")
+    print(f"Choropleth tiles: {result['tiles_dir']}")
     print("\nSummary Statistics:")
     for key, value in result['stats'].items():
         print(f"  {key}: {value}")
     print("\n" + "="*60)
+    
+    if (integrator.alice_dir / "ALICE_Mapping_Subcounty_Data.csv").exists():
+        sub_result = integrator.run_subcounty_integration()
+        print(f"Subcounty choropleth file: {sub_result['choropleth_file']}")
+        print(f"Subcounty web file: {sub_result['web_file']}")
+        print(f"Per-state partitions: {sub_result['state_dir']}")
+        print("\n" + "="*60)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+ALICE Choropleth Tiles
+Renders the joined county and subcounty geometries into 256px PNG map tiles for one
+metric and set of class breaks, with a memory LRU in front of an on-disk tile cache
+"""
+
+import json
+import zlib
+import struct
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+import logging
+
+import numpy as np
+
+import alice_class_breaks
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+TILES_DIR = Path('alice_tiger_output') / 'tiles'
+
+# Joined outputs the tiles are rendered from (the Arrow snapshot is preferred when present)
+LAYER_SOURCES = {
+    'counties': Path('alice_tiger_output') / 'alice_counties_choropleth.geojson',
+    'subcounty': Path('alice_tiger_output') / 'alice_subcounty_choropleth.geojson',
+}
+
+# Zoom levels rendered at build time; deeper tiles are rendered on first request
+SEED_MAX_ZOOM = 6
+
+# Tiles kept in memory; at ~2-20 KB per tile this stays well under 100 MB
+MEMORY_TILES = 4096
+
+# Geometry is simplified to half a pixel up to this zoom; deeper zooms use it as stored
+SIMPLIFY_MAX_ZOOM = 12
+
+# Feature outlines are drawn from this zoom on (below it they would cover the fill)
+OUTLINE_MIN_ZOOM = 6
+
+# Web Mercator latitude limit
+MAX_LATITUDE = 85.0511287798
+
+# Colour ramps and fixed thresholds used by tiger.html, so 'page' tiles match its legend
+COLOR_SCALES = {
+    'ALICE_Percentage': ['#ffeda0', '#fed976', '#feb24c', '#fd8d3c', '#fc4e2a', '#e31a1c', '#bd0026', '#800026'],
+    'Poverty_Percentage': ['#f7fbff', '#deebf7', '#c6dbef', '#9ecae1', '#6baed6', '#4292c6', '#2171b5', '#084594'],
+    'Below_ALICE_Threshold_Percentage': ['#fff5f0', '#fee0d2', '#fcbba1', '#fc9272', '#fb6a4a', '#ef3b2c', '#cb181d', '#99000d'],
+    'Above_ALICE_Percentage': ['#f7fcf5', '#e5f5e0', '#c7e9c0', '#a1d99b', '#74c476', '#41ab5d', '#238b45', '#005a32'],
+    'Households': ['#f7f4f9', '#e7e1ef', '#d4b9da', '#c994c7', '#df65b0', '#e7298a', '#ce1256', '#91003f']
+}
+PAGE_THRESHOLDS = [0, 5, 10, 15, 20, 30, 40, 50]
+PAGE_HOUSEHOLD_THRESHOLDS = [0, 1000, 5000, 10000, 25000, 50000, 100000, 200000]
+NO_DATA_COLOR = '#999999'
+OUTLINE_COLOR = '#ffffff'
+
+# fillOpacity / opacity of the page's vector style
+FILL_ALPHA = 179
+
+# Classification methods: the page's fixed thresholds or one of alice_class_breaks' methods
+METHODS = ['page'] + alice_class_breaks.METHODS
+
+def _rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+def lonlat_to_world(lon, lat):
+    """Longitude/latitude to Web Mercator world coordinates in [0, 1] (y grows southward)"""
+    lat = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    return x, y
+
+def tile_bounds(z, x, y):
+    """(left, top, right, bottom) of a tile in world coordinates"""
+    scale = 1.0 / (1 << z)
+    return x * scale, y * scale, (x + 1) * scale, (y + 1) * scale
+
+def rasterize(x0, y0, x1, y1, ids, size=TILE_SIZE):
+    """Scanline-fill polygon edges into a size x size array of ids (-1 where empty)
+
+    Coordinates are in tile pixels. Each edge is expanded into its crossings with the
+    pixel-centre rows it spans (half-open in y, so a shared vertex counts once); sorting
+    the crossings by (id, row, x) pairs them into the spans inside each feature under
+    the even-odd rule, which also cuts out holes. Rings must be closed.
+    """
+    image = np.full(size * size, -1, dtype=np.int32)
+
+    top = np.minimum(y0, y1)
+    bottom = np.maximum(y0, y1)
+    first_row = np.clip(np.ceil(top - 0.5), 0, size).astype(np.int64)
+    end_row = np.clip(np.ceil(bottom - 0.5), 0, size).astype(np.int64)
+    counts = end_row - first_row
+    crossing = counts > 0
+    if not crossing.any():
+        return image.reshape(size, size)
+
+    x0, y0, x1, y1, ids = x0[crossing], y0[crossing], x1[crossing], y1[crossing], ids[crossing]
+    first_row, counts = first_row[crossing], counts[crossing]
+    offsets = np.cumsum(counts) - counts
+    edge = np.repeat(np.arange(len(counts)), counts)
+    rows = first_row[edge] + (np.arange(counts.sum()) - offsets[edge])
+
+    slope = (x1 - x0) / (y1 - y0)
+    xs = x0[edge] + (rows + 0.5 - y0[edge]) * slope[edge]
+    feature = ids[edge]
+
+    order = np.lexsort((xs, rows, feature))
+    xs, rows, feature = xs[order], rows[order], feature[order]
+
+    # Pixel columns whose centre falls inside [start, end)
+    start = np.clip(np.ceil(xs[0::2] - 0.5), 0, size).astype(np.int64)
+    end = np.clip(np.ceil(xs[1::2] - 0.5), 0, size).astype(np.int64)
+    lengths = np.maximum(end - start, 0)
+    span = np.repeat(np.arange(len(lengths)), lengths)
+    span_offsets = np.cumsum(lengths) - lengths
+    pixels = rows[0::2][span] * size + start[span] + (np.arange(lengths.sum()) - span_offsets[span])
+    image[pixels] = feature[0::2][span]
+    return image.reshape(size, size)
+
+def encode_png(pixels, palette, alpha):
+    """Palette (colour type 3) PNG of a 2-D uint8 array of palette indices"""
+    height, width = pixels.shape
+    raw = np.zeros((height, width + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels
+
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+        chunk(b'PLTE', bytes(value for color in palette for value in color)),
+        chunk(b'tRNS', bytes(alpha)),
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)),
+        chunk(b'IEND', b'')
+    ])
+
+class TileCache:
+    """Memory LRU backed by a directory of PNGs; safe to share between server threads"""
+
+    def __init__(self, directory=TILES_DIR, memory_tiles=MEMORY_TILES):
+        self.directory = Path(directory)
+        self.memory_tiles = memory_tiles
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def path(self, key):
+        *prefix, z, x, y = key
+        return self.directory.joinpath(*map(str, prefix), str(z), str(x), f"{y}.png")
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_tiles:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return data
+        path = self.path(key)
+        if path.exists():
+            data = path.read_bytes()
+            self._remember(key, data)
+            self.stats['disk_hits'] += 1
+            return data
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key, data, persist=True):
+        self._remember(key, data)
+        if persist:
+            path = self.path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+
+class ALICETileRenderer:
+    def __init__(self, gdf, layer='counties', cache=None, n_classes=alice_class_breaks.DEFAULT_CLASSES):
+        import shapely
+
+        self.layer = layer
+        self.cache = cache or TileCache()
+        self.n_classes = n_classes
+        self.attributes = gdf.drop(columns=[gdf.geometry.name])
+        if gdf.crs is not None and not gdf.crs.is_geographic:
+            gdf = gdf.to_crs(4326)
+
+        # NAD83 and WGS84 differ by about a metre, far below a pixel at any useful zoom
+        def project(coords):
+            return np.column_stack(lonlat_to_world(coords[:, 0], coords[:, 1]))
+
+        self.geometries = shapely.transform(np.asarray(gdf.geometry.values), project)
+        self.bounds = shapely.bounds(self.geometries)
+        self._edges = {}
+        self._styles = {}
+        self._empty = None
+        self._geometry_digest = hashlib.sha256(shapely.get_coordinates(self.geometries).tobytes()).hexdigest()
+        logger.info(f"Tile renderer for {layer}: {len(self.geometries):,} features")
+
+    @classmethod
+    def from_file(cls, path, layer=None, **kwargs):
+        """Renderer over an integrated output, read from its Arrow snapshot when one exists"""
+        path = Path(path)
+        snapshot = path.with_suffix('.arrow')
+        if snapshot.exists():
+            from alice_snapshot import open_snapshot
+            gdf = open_snapshot(snapshot).to_geodataframe()
+        else:
+            import geopandas as gpd
+            gdf = gpd.read_file(path)
+        return cls(gdf, layer or path.stem, **kwargs)
+
+    def edges(self, z):
+        """(x0, y0, x1, y1, feature, feature edge offsets) for zoom z, simplified to half a pixel"""
+        level = min(z, SIMPLIFY_MAX_ZOOM)
+        if level not in self._edges:
+            import shapely
+
+            geometries = self.geometries
+            if level < SIMPLIFY_MAX_ZOOM:
+                # Plain Douglas-Peucker: a ring that self-intersects after simplifying still
+                # fills correctly under the even-odd rule, and is ~10x faster than
+                # topology-preserving simplification
+                geometries = shapely.simplify(geometries, 0.5 / (TILE_SIZE << level), preserve_topology=False)
+            parts, part_feature = shapely.get_parts(geometries, return_index=True)
+            rings, ring_part = shapely.get_rings(parts, return_index=True)
+            coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+
+            # Consecutive vertices of the same ring form an edge; horizontal edges never
+            # cross a scanline
+            same_ring = coord_ring[:-1] == coord_ring[1:]
+            start, end = coords[:-1][same_ring], coords[1:][same_ring]
+            feature = part_feature[ring_part[coord_ring[:-1][same_ring]]]
+            sloped = start[:, 1] != end[:, 1]
+            start, end, feature = start[sloped], end[sloped], feature[sloped]
+
+            offsets = np.searchsorted(feature, np.arange(len(self.geometries) + 1))
+            self._edges[level] = (start[:, 0], start[:, 1], end[:, 0], end[:, 1], feature, offsets)
+        return self._edges[level]
+
+    def style(self, metric, method='page', breaks=None):
+        """Palette index per feature, plus the palette, alpha and a version for cache keys
+
+        Explicit breaks ([min, upper_1, ..., max]) override the method and are filed
+        under the 'custom' method.
+        """
+        if breaks is not None:
+            method, breaks = 'custom', [float(value) for value in breaks]
+        key = (metric, method, tuple(breaks) if breaks is not None else None)
+        if key in self._styles:
+            return self._styles[key]
+        if metric not in self.attributes.columns:
+            raise KeyError(f"{self.layer} has no column {metric!r}")
+        if method not in METHODS and breaks is None:
+            raise ValueError(f"Unknown classification method {method!r}; choose from {', '.join(METHODS)}")
+
+        import pandas as pd
+        values = pd.to_numeric(self.attributes[metric], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        ramp = COLOR_SCALES.get(metric, COLOR_SCALES['ALICE_Percentage'])
+
+        if method == 'page':
+            # tiger.html's getColor: the colour of the highest threshold the value reaches
+            breaks = PAGE_HOUSEHOLD_THRESHOLDS if metric == 'Households' else PAGE_THRESHOLDS
+            classes = np.clip(np.searchsorted(breaks, values, side='right') - 1, 0, len(breaks) - 1)
+            colors = ramp[:len(breaks)]
+        else:
+            if breaks is None:
+                breaks = alice_class_breaks.BREAK_FUNCTIONS[method](values, self.n_classes)
+            # A value equal to a class's upper bound stays in that class
+            classes = np.searchsorted(np.asarray(breaks[1:-1]), values, side='left')
+            count = max(len(breaks) - 1, 1)
+            colors = [ramp[i] for i in np.linspace(0, len(ramp) - 1, count).round().astype(int)]
+
+        # Palette: 0 transparent, then the classes, no data and the outline colour
+        palette = [(0, 0, 0)] + [_rgb(color) for color in colors] + [_rgb(NO_DATA_COLOR), _rgb(OUTLINE_COLOR)]
+        alpha = [0] + [FILL_ALPHA] * (len(colors) + 2)
+        index = np.where(np.isfinite(values), classes + 1, len(colors) + 1).astype(np.uint8)
+        # -1 (no feature) maps to the last slot of the lookup, which is transparent
+        lookup = np.append(index, 0).astype(np.uint8)
+
+        digest = hashlib.sha256()
+        digest.update(self._geometry_digest.encode())
+        digest.update(json.dumps([metric, method, breaks, colors]).encode())
+        digest.update(np.nan_to_num(values, nan=-1.0).tobytes())
+
+        style = {
+            'metric': metric,
+            'method': method,
+            'breaks': breaks,
+            'colors': colors,
+            'lookup': lookup,
+            'palette': palette,
+            'alpha': alpha,
+            'outline': len(palette) - 1,
+            'version': digest.hexdigest()[:12]
+        }
+        self._styles[key] = style
+        return style
+
+    def render(self, z, x, y, style):
+        """PNG bytes of one tile, or None when no feature touches it"""
+        left, top, right, bottom = tile_bounds(z, x, y)
+        hit = np.flatnonzero((self.bounds[:, 0] < right) & (self.bounds[:, 2] > left)
+                             & (self.bounds[:, 1] < bottom) & (self.bounds[:, 3] > top))
+        if not len(hit):
+            return None
+
+        x0, y0, x1, y1, feature, offsets = self.edges(z)
+        # Every edge of a touched feature is needed, even off-tile ones, so that each
+        # scanline sees the feature's crossings in pairs
+        counts = offsets[hit + 1] - offsets[hit]
+        edge = np.repeat(offsets[hit] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        on_rows = (np.maximum(y0[edge], y1[edge]) > top) & (np.minimum(y0[edge], y1[edge]) < bottom)
+        edge = edge[on_rows]
+
+        scale = TILE_SIZE << z
+        ids = rasterize((x0[edge] * scale) - x * TILE_SIZE, (y0[edge] * scale) - y * TILE_SIZE,
+                        (x1[edge] * scale) - x * TILE_SIZE, (y1[edge] * scale) - y * TILE_SIZE,
+                        feature[edge])
+        if (ids < 0).all():
+            return None
+
+        pixels = style['lookup'][ids]
+        if z >= OUTLINE_MIN_ZOOM:
+            boundary = np.zeros(ids.shape, dtype=bool)
+            boundary[:, 1:] |= ids[:, 1:] != ids[:, :-1]
+            boundary[1:, :] |= ids[1:, :] != ids[:-1, :]
+            pixels[boundary] = style['outline']
+        return encode_png(pixels, style['palette'], style['alpha'])
+
+    def tile(self, metric, z, x, y, method='page', breaks=None):
+        """Cached PNG for a tile; empty tiles get a shared transparent image that isn't written to disk"""
+        style = self.style(metric, method, breaks)
+        key = (self.layer, metric, style['method'], style['version'], z, x, y)
+        data = self.cache.get(key)
+        if data is None:
+            data = self.render(z, x, y, style)
+            if data is None:
+                if self._empty is None:
+                    self._empty = encode_png(np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8), [(0, 0, 0)], [0])
+                data = self._empty
+                self.cache.put(key, data, persist=False)
+            else:
+                self.cache.put(key, data)
+        return data
+
+    def covered_tiles(self, z):
+        """Tiles at zoom z that some feature's bounding box touches"""
+        n = 1 << z
+        columns = np.clip(np.floor(self.bounds[:, [0, 2]] * n), 0, n - 1).astype(np.int64)
+        rows = np.clip(np.floor(self.bounds[:, [1, 3]] * n), 0, n - 1).astype(np.int64)
+        tiles = set()
+        for (c0, c1), (r0, r1) in zip(columns, rows):
+            for tx in range(c0, c1 + 1):
+                for ty in range(r0, r1 + 1):
+                    tiles.add((tx, ty))
+        return sorted(tiles)
+
+    def seed(self, metric, method='page', max_zoom=SEED_MAX_ZOOM):
+        """Render every non-empty tile up to max_zoom into the cache and drop stale versions"""
+        style = self.style(metric, method)
+        rendered = 0
+        for z in range(max_zoom + 1):
+            for x, y in self.covered_tiles(z):
+                key = (self.layer, metric, method, style['version'], z, x, y)
+                if not self.cache.path(key).exists():
+                    self.tile(metric, z, x, y, method)
+                    rendered += 1
+        self.prune(metric, method, style['version'])
+        self.write_legend(style, max_zoom)
+        logger.info(f"Seeded {self.layer}/{metric}/{method} to zoom {max_zoom}: {rendered} tiles rendered")
+        return rendered
+
+    def prune(self, metric, method, version):
+        """Remove disk tiles rendered from an older version of the data or breaks"""
+        import shutil
+        parent = self.cache.directory / self.layer / metric / method
+        if parent.exists():
+            for path in parent.iterdir():
+                if path.is_dir() and path.name != version:
+                    shutil.rmtree(path)
+
+    def write_legend(self, style, max_zoom):
+        """legend.json beside the tiles: the current version and the seeded zooms for static hosting"""
+        path = self.cache.directory / self.layer / style['metric'] / style['method'] / 'legend.json'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(legend_entry(style, max_zoom)))
+        return path
+
+def legend_entry(style, max_zoom=None):
+    """What a page needs to build tile URLs and draw the legend"""
+    entry = {key: style[key] for key in ('version', 'metric', 'method', 'breaks', 'colors')}
+    entry['max_zoom'] = max_zoom
+    return entry
+
+def seed_tiles(gdf, layer, metrics, tiles_dir=TILES_DIR, max_zoom=SEED_MAX_ZOOM, method='page'):
+    """Build-time seeding of the low zoom levels for each metric present in gdf"""
+    renderer = ALICETileRenderer(gdf, layer, TileCache(tiles_dir))
+    for metric in metrics:
+        if metric in renderer.attributes.columns:
+            renderer.seed(metric, method, max_zoom)
+    return renderer
+
+def _handler(renderers):
+    class TileHandler(BaseHTTPRequestHandler):
+        """GET /{layer}/{metric}/{method}/legend.json and /{layer}/{metric}/{method}/{version}/{z}/{x}/{y}.png
+
+        The same paths as the seeded tile directory, so pages use either interchangeably.
+        """
+
+        def do_GET(self):
+            parts = self.path.split('?')[0].strip('/').split('/')
+            try:
+                if len(parts) == 4 and parts[3] == 'legend.json':
+                    style = renderers[parts[0]].style(parts[1], parts[2])
+                    # No max_zoom: every zoom is rendered on demand
+                    body = json.dumps(legend_entry(style)).encode()
+                    self._send(200, body, 'application/json', 'no-cache')
+                    return
+                if len(parts) != 7 or not parts[6].endswith('.png'):
+                    raise KeyError(self.path)
+                # The version segment only busts browser caches; the current data is always served
+                layer, metric, method = parts[:3]
+                z, x, y = int(parts[4]), int(parts[5]), int(parts[6][:-4])
+                if not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+                    raise KeyError(self.path)
+                body = renderers[layer].tile(metric, z, x, y, method)
+                self._send(200, body, 'image/png', 'public, max-age=31536000, immutable')
+            except (KeyError, ValueError) as e:
+                self._send(404, str(e).encode(), 'text/plain', 'no-cache')
+
+        def _send(self, status, body, content_type, cache_control):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return TileHandler
+
+def main():
+    """Seed the low zoom levels, or serve tiles rendered on demand"""
+    parser = argparse.ArgumentParser(description="Render ALICE choropleth PNG tiles")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, help_text in [('seed', "Render tiles up to --max-zoom into the disk cache"),
+                               ('serve', "Serve tiles over HTTP, rendering cache misses")]:
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument('--layers', default=','.join(LAYER_SOURCES), help="Comma-separated layers")
+        sub.add_argument('--metrics', default=','.join(COLOR_SCALES), help="Comma-separated metrics")
+        sub.add_argument('--method', default='page', choices=METHODS)
+        sub.add_argument('--tiles-dir', default=str(TILES_DIR))
+        sub.add_argument('--max-zoom', type=int, default=SEED_MAX_ZOOM)
+    subparsers.choices['serve'].add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    cache = TileCache(args.tiles_dir)
+    renderers = {}
+    for layer in args.layers.split(','):
+        source = LAYER_SOURCES[layer]
+        if not source.exists() and not source.with_suffix('.arrow').exists():
+            logger.warning(f"Skipping {layer}: {source} not built")
+            continue
+        renderers[layer] = ALICETileRenderer.from_file(source, layer, cache=cache)
+
+    metrics = args.metrics.split(',')
+    for renderer in renderers.values():
+        for metric in metrics:
+            if metric in renderer.attributes.columns:
+                renderer.seed(metric, args.method, args.max_zoom)
+
+    if args.command == 'serve':
+        server = ThreadingHTTPServer(('', args.port), _handler(renderers))
+        print(f"Serving {', '.join(renderers)} tiles at http://localhost:{args.port}/<layer>/<metric>/<method>/<version>/{{z}}/{{x}}/{{y}}.png")
+        print(f"Open tiger.html?tiles=http://localhost:{args.port} to draw the county layer from tiles")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"Cache: {cache.stats}")
+
+if __name__ == "__main__":
+    main()
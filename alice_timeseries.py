@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+ALICE Time Series Store
+Dense (geography x year x metric) cube over the ALICE time series data for fast trend lookups
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import logging
+
+import alice_schema
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Household counts are summed when rolling counties up to states
+COUNT_METRICS = [
+    'Households', 'Poverty Households', 'ALICE Households',
+    'Above ALICE Households', 'Below_ALICE_Threshold_Total'
+]
+
+# Thresholds are household-weighted when rolling up
+THRESHOLD_METRICS = ['ALICE Threshold - HH under 65', 'ALICE Threshold - HH 65 years and over']
+
+# Percentages are recomputed from the summed counts when rolling up
+RATE_METRICS = {
+    'Poverty_Percentage': 'Poverty Households',
+    'ALICE_Percentage': 'ALICE Households',
+    'Above_ALICE_Percentage': 'Above ALICE Households',
+    'Below_ALICE_Threshold_Percentage': 'Below_ALICE_Threshold_Total'
+}
+
+def geography_key(row):
+    """Build the index key for a time series row: 5-digit FIPS, or 'ST:County' when FIPS is missing"""
+    if pd.notna(row['GEO id2']):
+        return str(row['GEO id2']).split('.')[0].zfill(5)
+    return f"{row['State Abbr']}:{row['County']}"
+
+class ALICETimeSeriesStore:
+    def __init__(self, geoids, years, metrics, values, states=None, labels=None):
+        self.geoids = np.asarray(geoids, dtype=str)
+        self.years = np.asarray(years, dtype=np.int32)
+        self.metrics = list(metrics)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.states = np.asarray(states if states is not None else [''] * len(self.geoids), dtype=str)
+        self.labels = np.asarray(labels if labels is not None else self.geoids, dtype=str)
+
+        self.geo_index = {geoid: i for i, geoid in enumerate(self.geoids)}
+        self.year_index = {int(year): i for i, year in enumerate(self.years)}
+        self.metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+
+        self.deltas = self._compute_deltas()
+        self.slopes = self._compute_slopes()
+
+    @classmethod
+    def from_frame(cls, df, metrics=None):
+        """Pivot a long-format ALICE time series frame into a dense cube"""
+        df = df.copy()
+        df['GEOID'] = df.apply(geography_key, axis=1)
+
+        if metrics is None:
+            candidates = COUNT_METRICS + THRESHOLD_METRICS + list(RATE_METRICS)
+            metrics = [col for col in candidates if col in df.columns]
+
+        # Rows without a year can't be placed on the year axis
+        missing_year = df['Year'].isna()
+        if missing_year.any():
+            logger.warning(f"Skipping {int(missing_year.sum())} time series rows with no Year")
+            df = df[~missing_year]
+
+        # Keep the latest row per geography/year in case a state sheet was loaded twice
+        df = df.drop_duplicates(subset=['GEOID', 'Year'], keep='last')
+
+        geoids = np.sort(df['GEOID'].unique())
+        years = np.sort(df['Year'].astype(int).unique())
+
+        geo_pos = pd.Index(geoids).get_indexer(df['GEOID'])
+        year_pos = pd.Index(years).get_indexer(df['Year'].astype(int))
+
+        values = np.full((len(geoids), len(years), len(metrics)), np.nan)
+        values[geo_pos, year_pos, :] = df[metrics].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+        latest = df.sort_values('Year').drop_duplicates(subset=['GEOID'], keep='last').set_index('GEOID')
+        states = latest['State'].astype(object).reindex(geoids).fillna('').astype(str).to_numpy()
+        labels = latest['GEO display_label'].astype(object).reindex(geoids).fillna('').astype(str).to_numpy() \
+            if 'GEO display_label' in latest.columns else geoids
+
+        logger.info(f"Built time series cube: {len(geoids)} geographies x {len(years)} years x {len(metrics)} metrics")
+        return cls(geoids, years, metrics, values, states=states, labels=labels)
+
+    @classmethod
+    def from_csv(cls, csv_path, metrics=None):
+        """Build a cube from ALICE_TimeSeries_County_Data.csv"""
+        logger.info(f"Loading time series data from {csv_path}")
+        return cls.from_frame(alice_schema.read_csv(csv_path), metrics=metrics)
+
+    def _compute_deltas(self):
+        """Change since the previous year in the cube (first year is NaN)
+
+        The ALICE releases skip years (there is no 2020 sheet), so a delta can span more
+        than one calendar year; annualized_delta_series() divides by the gap.
+        """
+        deltas = np.full_like(self.values, np.nan)
+        if len(self.years) > 1:
+            deltas[:, 1:, :] = np.diff(self.values, axis=1)
+        return deltas
+
+    def _compute_slopes(self):
+        """Least-squares trend per year for every geography and metric, ignoring missing years"""
+        mask = ~np.isnan(self.values)
+        x = np.broadcast_to(self.years[None, :, None].astype(np.float64), self.values.shape)
+        n = mask.sum(axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_mean = np.where(mask, x, 0).sum(axis=1) / n
+            y_mean = np.where(mask, self.values, 0).sum(axis=1) / n
+            dx = np.where(mask, x - x_mean[:, None, :], 0)
+            dy = np.where(mask, self.values - y_mean[:, None, :], 0)
+            slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+        slopes[n < 2] = np.nan
+        return slopes
+
+    def aggregate_by_state(self):
+        """Roll counties up to a state-level cube"""
+        states = np.unique(self.states[self.states != ''])
+        state_pos = pd.Index(states).get_indexer(self.states)
+        valid = state_pos >= 0
+
+        values = np.full((len(states), len(self.years), len(self.metrics)), np.nan)
+
+        def summed(metric):
+            column = self.values[valid, :, self.metric_index[metric]]
+            totals = np.zeros((len(states), len(self.years)))
+            np.add.at(totals, state_pos[valid], np.nan_to_num(column))
+            counts = np.zeros((len(states), len(self.years)))
+            np.add.at(counts, state_pos[valid], ~np.isnan(column))
+            totals[counts == 0] = np.nan
+            return totals
+
+        for metric in self.metrics:
+            if metric in COUNT_METRICS:
+                values[:, :, self.metric_index[metric]] = summed(metric)
+
+        if 'Households' in self.metric_index:
+            households = summed('Households')
+            hh_column = self.values[valid, :, self.metric_index['Households']]
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for metric, count_metric in RATE_METRICS.items():
+                    if metric in self.metric_index and count_metric in self.metric_index:
+                        values[:, :, self.metric_index[metric]] = (summed(count_metric) / households * 100).round(2)
+
+                for metric in THRESHOLD_METRICS:
+                    if metric in self.metric_index:
+                        column = self.values[valid, :, self.metric_index[metric]]
+                        weights = np.where(np.isnan(column), 0, np.nan_to_num(hh_column))
+                        weighted = np.zeros((len(states), len(self.years)))
+                        np.add.at(weighted, state_pos[valid], np.nan_to_num(column) * weights)
+                        weight_totals = np.zeros((len(states), len(self.years)))
+                        np.add.at(weight_totals, state_pos[valid], weights)
+                        values[:, :, self.metric_index[metric]] = weighted / weight_totals
+
+        logger.info(f"Aggregated {valid.sum()} geographies into {len(states)} states")
+        return ALICETimeSeriesStore(states, self.years, self.metrics, values, states=states, labels=states)
+
+    def series(self, geoid, metric):
+        """Full history of one metric for one geography (a view, indexed by self.years)"""
+        return self.values[self.geo_index[geoid], :, self.metric_index[metric]]
+
+    def history(self, geoid):
+        """All metrics for one geography as a year x metric array"""
+        return self.values[self.geo_index[geoid]]
+
+    def delta_series(self, geoid, metric):
+        """Changes of one metric for one geography since the previous year in the cube"""
+        return self.deltas[self.geo_index[geoid], :, self.metric_index[metric]]
+
+    def annualized_delta_series(self, geoid, metric):
+        """delta_series() divided by the number of calendar years each change spans"""
+        gaps = np.full(len(self.years), np.nan)
+        gaps[1:] = np.diff(self.years)
+        return self.delta_series(geoid, metric) / gaps
+
+    def slope(self, geoid, metric):
+        """Trend per year of one metric for one geography"""
+        return self.slopes[self.geo_index[geoid], self.metric_index[metric]]
+
+    def year_slice(self, year, metric):
+        """One metric for every geography in a single year"""
+        return self.values[:, self.year_index[int(year)], self.metric_index[metric]]
+
+    def sparkline(self, geoid, metric):
+        """Year -> value mapping for rendering a sparkline"""
+        return {int(year): (None if np.isnan(value) else float(value))
+                for year, value in zip(self.years, self.series(geoid, metric))}
+
+    def save(self, path):
+        """Save the cube and its precomputed trends as an .npz archive"""
+        path = Path(path)
+        np.savez(
+            path,
+            geoids=self.geoids,
+            years=self.years,
+            metrics=np.asarray(self.metrics, dtype=str),
+            values=self.values,
+            states=self.states,
+            labels=self.labels,
+            deltas=self.deltas,
+            slopes=self.slopes
+        )
+        logger.info(f"Saved time series cube to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load a cube saved with save()"""
+        with np.load(path, allow_pickle=False) as data:
+            store = cls.__new__(cls)
+            store.geoids = data['geoids']
+            store.years = data['years']
+            store.metrics = data['metrics'].tolist()
+            store.values = data['values']
+            store.states = data['states']
+            store.labels = data['labels']
+            store.deltas = data['deltas']
+            store.slopes = data['slopes']
+
+        store.geo_index = {geoid: i for i, geoid in enumerate(store.geoids)}
+        store.year_index = {int(year): i for i, year in enumerate(store.years)}
+        store.metric_index = {metric: i for i, metric in enumerate(store.metrics)}
+        return store
+
+def main():
+    """Build county and state time series cubes from the cleaned ALICE data"""
+    output_dir = Path('alice_clean_data')
+
+    county_store = ALICETimeSeriesStore.from_csv(output_dir / 'ALICE_TimeSeries_County_Data.csv')
+    county_store.save(output_dir / 'ALICE_TimeSeries_County_Cube.npz')
+
+    state_store = county_store.aggregate_by_state()
+    state_store.save(output_dir / 'ALICE_TimeSeries_State_Cube.npz')
+
+    print(f"""
+ALICE Time Series Cubes Built
+=============================
+- Counties: {len(county_store.geoids):,}
+- States: {len(state_store.geoids):,}
+- Years: {county_store.years.min()}-{county_store.years.max()}
+- Metrics: {len(county_store.metrics)}
+""")
+
+if __name__ == "__main__":
+    main()
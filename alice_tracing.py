@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+ALICE Pipeline Tracing
+Stage-level timing, memory, row and I/O instrumentation with machine-readable run reports
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import resource
+import threading
+import functools
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Set to a stage (e.g. "join") or "stage:pyinstrument" to profile that stage
+PROFILE_ENV_VAR = "ALICE_PROFILE_STAGE"
+
+# Set to 1 to record per-stage peak memory with tracemalloc; off by default because it
+# slows allocation-heavy stages down and would skew their timings
+TRACE_MEMORY_ENV_VAR = "ALICE_TRACE_MEMORY"
+
+def _io_counters():
+    """Bytes read and written by this process so far (Linux /proc), or None"""
+    try:
+        with open('/proc/self/io') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def count_rows(value):
+    """Row count of a DataFrame-like value, summed over tuples/lists/dicts of them"""
+    if value is None or isinstance(value, (str, bytes, Path)):
+        return None
+    if hasattr(value, 'shape') and hasattr(value, 'columns'):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        counts = [count_rows(item) for item in value]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+class Span:
+    def __init__(self, stage, method, parent=None):
+        self.stage = stage
+        self.method = method
+        self.parent = parent
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = {}
+        self.start_ns = None
+        self.end_ns = None
+        self.rows_in = None
+        self.rows_out = None
+        self.status = 'OK'
+
+        self._cpu_start = None
+        self._io_start = None
+        self._traced_start = None
+        self._peak_seen = 0
+
+    def to_dict(self, pipeline, trace_id):
+        """OpenTelemetry-style span record"""
+        return {
+            'trace_id': trace_id,
+            'span_id': self.span_id,
+            'parent_span_id': self.parent.span_id if self.parent else None,
+            'name': f"{pipeline}.{self.stage}",
+            'start_time_unix_nano': self.start_ns,
+            'end_time_unix_nano': self.end_ns,
+            'status': self.status,
+            'attributes': {
+                'alice.stage': self.stage,
+                'alice.method': self.method,
+                'alice.rows_in': self.rows_in,
+                'alice.rows_out': self.rows_out,
+                **self.attributes
+            }
+        }
+
+class StageTracer:
+    def __init__(self, pipeline, output_dir, profile_stage=None, trace_memory=None):
+        self.pipeline = pipeline
+        self.output_dir = Path(output_dir)
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self.spans = []
+        self.input_timings = []
+        self._local = threading.local()
+
+        profile_stage = profile_stage if profile_stage is not None else os.environ.get(PROFILE_ENV_VAR)
+        self.profile_stage, _, profiler = (profile_stage or '').partition(':')
+        self.profiler = profiler or 'cprofile'
+
+        if trace_memory is None:
+            trace_memory = os.environ.get(TRACE_MEMORY_ENV_VAR, '0') != '0'
+        self.trace_memory = trace_memory
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def _stack(self):
+        """Open spans of the calling thread"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, stage, method, rows_in=None):
+        """Record one stage invocation; nested spans keep their parent's peak memory intact
+
+        Spans opened by gather() loaders overlap each other, so they skip the process-wide
+        tracemalloc peak and /proc I/O counters and report their own thread's CPU time.
+        """
+        parent = self._stack[-1] if self._stack else None
+        span = Span(stage, method, parent)
+        span.rows_in = rows_in
+        concurrent = getattr(self._local, 'concurrent', False)
+        trace_memory = self.trace_memory and not concurrent
+        cpu_time = time.thread_time if concurrent else time.process_time
+
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent._peak_seen = max(parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            span._traced_start = current
+
+        span._io_start = None if concurrent else _io_counters()
+        span._cpu_start = cpu_time()
+        span.start_ns = time.time_ns()
+        wall_start = time.perf_counter()
+        self._stack.append(span)
+
+        profiler = self._start_profiler(stage, method)
+        try:
+            yield span
+        except Exception as e:
+            span.status = 'ERROR'
+            span.attributes['alice.error'] = str(e)
+            raise
+        finally:
+            if profiler is not None:
+                self._stop_profiler(profiler, stage, method)
+
+            self._stack.pop()
+            span.end_ns = time.time_ns()
+            span.attributes['alice.wall_s'] = round(time.perf_counter() - wall_start, 6)
+            span.attributes['alice.cpu_s'] = round(cpu_time() - span._cpu_start, 6)
+            span.attributes['alice.peak_rss_mb'] = round(_peak_rss_mb(), 2)
+
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                span._peak_seen = max(span._peak_seen, peak)
+                span.attributes['alice.peak_memory_mb'] = round((span._peak_seen - span._traced_start) / 1024 ** 2, 3)
+                if parent is not None:
+                    parent._peak_seen = max(parent._peak_seen, span._peak_seen)
+                tracemalloc.reset_peak()
+
+            io_end = None if concurrent else _io_counters()
+            if span._io_start is not None and io_end is not None:
+                span.attributes['alice.bytes_read'] = io_end[0] - span._io_start[0]
+                span.attributes['alice.bytes_written'] = io_end[1] - span._io_start[1]
+
+            self.spans.append(span)
+            logger.debug(f"{self.pipeline}.{stage} ({method}): {span.attributes['alice.wall_s']:.3f}s")
+
+    def gather(self, loaders, max_workers=None):
+        """Run independent input loaders concurrently and return {name: result} once all arrive
+
+        loaders maps an input name to a zero-argument callable. Each runs on its own thread
+        (GDAL decoding, zlib, the CSV parser and network waits all release the GIL), and
+        spans they open nest under the current span. The per-input start/end offsets are
+        logged and kept for the run report; the input finishing last is the critical path.
+        """
+        parent = self._stack[-1] if self._stack else None
+        timings = {}
+        start = time.perf_counter()
+
+        def run(name, loader):
+            self._local.stack = [parent] if parent is not None else []
+            self._local.concurrent = True
+            began = time.perf_counter()
+            try:
+                return loader()
+            finally:
+                ended = time.perf_counter()
+                timings[name] = {
+                    'start_s': round(began - start, 6),
+                    'end_s': round(ended - start, 6),
+                    'wall_s': round(ended - began, 6)
+                }
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(loaders),
+                                thread_name_prefix=f"{self.pipeline}-input") as executor:
+            futures = {name: executor.submit(run, name, loader) for name, loader in loaders.items()}
+            results = {name: future.result() for name, future in futures.items()}
+
+        elapsed = time.perf_counter() - start
+        critical = max(timings, key=lambda name: timings[name]['end_s'])
+        sequential = sum(timing['wall_s'] for timing in timings.values())
+        record = {
+            'stage': parent.stage if parent else None,
+            'method': parent.method if parent else None,
+            'wall_s': round(elapsed, 6),
+            'sequential_s': round(sequential, 6),
+            'critical_path': critical,
+            'inputs': timings
+        }
+        self.input_timings.append(record)
+        if parent is not None:
+            parent.attributes['alice.inputs_wall_s'] = record['wall_s']
+            parent.attributes['alice.inputs_critical_path'] = critical
+            for name, timing in timings.items():
+                parent.attributes[f"alice.input.{name}.wall_s"] = timing['wall_s']
+
+        breakdown = ', '.join(f"{name} {timing['wall_s']:.2f}s" for name, timing in
+                              sorted(timings.items(), key=lambda item: -item[1]['wall_s']))
+        logger.info(f"Loaded {len(loaders)} inputs in {elapsed:.2f}s (sequential {sequential:.2f}s): "
+                    f"{breakdown}; critical path: {critical}")
+        return results
+
+    def _start_profiler(self, stage, method):
+        if not self.profile_stage or self.profile_stage not in (stage, method):
+            return None
+        if self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profiler(self, profiler, stage, method):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.profiler == 'pyinstrument':
+            profiler.stop()
+            profile_path = self.output_dir / f"profile_{self.pipeline}_{stage}_{method}.html"
+            profile_path.write_text(profiler.output_html())
+        else:
+            profiler.disable()
+            profile_path = self.output_dir / f"profile_{self.pipeline}_{stage}_{method}.prof"
+            profiler.dump_stats(profile_path)
+        logger.info(f"Saved {self.profiler} profile of {stage} to {profile_path}")
+
+    def stage_summary(self):
+        """Totals per stage across all of its invocations"""
+        summary = {}
+        for span in self.spans:
+            stage = summary.setdefault(span.stage, {
+                'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_memory_mb': None,
+                'rows_in': None, 'rows_out': None, 'bytes_read': None, 'bytes_written': None
+            })
+            stage['calls'] += 1
+            stage['wall_s'] = round(stage['wall_s'] + span.attributes['alice.wall_s'], 6)
+            stage['cpu_s'] = round(stage['cpu_s'] + span.attributes['alice.cpu_s'], 6)
+            for key, value in [('rows_in', span.rows_in), ('rows_out', span.rows_out),
+                               ('bytes_read', span.attributes.get('alice.bytes_read')),
+                               ('bytes_written', span.attributes.get('alice.bytes_written'))]:
+                if value is not None:
+                    stage[key] = (stage[key] or 0) + value
+            peak = span.attributes.get('alice.peak_memory_mb')
+            if peak is not None:
+                stage['peak_memory_mb'] = max(stage['peak_memory_mb'] or 0, peak)
+        return summary
+
+    def write_report(self, filename="alice_run_report.json"):
+        """Write the run report next to the pipeline's *_stats.json output"""
+        report = {
+            'pipeline': self.pipeline,
+            'trace_id': self.trace_id,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'total_wall_s': round(time.time() - self.started_at, 3),
+            'peak_rss_mb': round(_peak_rss_mb(), 2),
+            'stages': self.stage_summary(),
+            'inputs': self.input_timings,
+            'spans': [span.to_dict(self.pipeline, self.trace_id) for span in self.spans]
+        }
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = self.output_dir / filename
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+        logger.info(f"Run report saved to {report_path}")
+        return report_path
+
+def traced(stage):
+    """Decorate a pipeline method so each call is recorded on self.tracer"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, 'tracer', None)
+            if tracer is None:
+                return method(self, *args, **kwargs)
+            with tracer.span(stage, method.__name__, rows_in=count_rows(list(args) + list(kwargs.values()))) as span:
+                result = method(self, *args, **kwargs)
+                span.rows_out = count_rows(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+ALICE Watch Mode
+Watches alice_state_data for new, changed or removed state workbooks and rebuilds only
+those states' partitions of the consolidated, cleaned and joined outputs
+"""
+
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import logging
+
+import numpy as np
+import pandas as pd
+
+import alice_schema
+from alice_data_consolidator import ALICEDataConsolidator
+from alice_data_cleaner import CLEAN_DIR, MAPPING_FIELDS, SUBCOUNTY_MAPPING_FIELDS, create_aggregates
+from alice_geojson import FULL_FLOAT_DIGITS, patch_geojson
+from alice_snapshot import save_snapshot
+from alice_tracing import StageTracer, traced
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+WATCH_PATTERN = "*.xlsx"
+
+# Seconds between directory scans (polling works on network shares, where inotify doesn't)
+POLL_INTERVAL_S = 2.0
+
+# Quiet period after the last arrival before rebuilding, so a burst of states (or a
+# workbook still being copied) lands in one rebuild
+DEBOUNCE_S = 15.0
+
+# Built workbook digests, kept in the master data directory so restarts catch up
+STATE_FILE = "alice_watch_state.json"
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def replace_partition(frame, mask, rows, schema=True):
+    """frame with the rows under mask replaced by rows, placed where the old ones started
+
+    Other rows keep their order, so a patched output matches what a full run over the
+    same workbooks would write. Works for DataFrames and GeoDataFrames alike; pass
+    schema=False for outputs a full run writes without the compact schema.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    positions = np.flatnonzero(mask)
+    at = positions[0] if len(positions) else len(frame)
+    parts = [frame.iloc[:at], rows, frame.iloc[at:][~mask[at:]]]
+    result = pd.concat([part for part in parts if len(part)] or [frame.iloc[:0]], ignore_index=True)
+    return alice_schema.apply_schema(result) if schema else result
+
+def _write_csv(df, path):
+    tmp = Path(path).with_name(Path(path).name + '.tmp')
+    df.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+def _subcounty_fips(geo_ids):
+    from alice_tiger_integration import subcounty_geoid
+    return {geoid[:2] for geoid in map(subcounty_geoid, geo_ids.dropna()) if geoid}
+
+class WorkbookWatcher:
+    """Polls a directory and reports workbooks that changed since they were last built
+
+    A change is only reported once the directory has been quiet for `debounce` seconds.
+    Files are compared by content hash, so a touched or re-copied workbook with the same
+    bytes doesn't trigger a rebuild.
+    """
+
+    def __init__(self, directory, state_path, debounce=DEBOUNCE_S, pattern=WATCH_PATTERN):
+        self.directory = Path(directory)
+        self.state_path = Path(state_path)
+        self.debounce = debounce
+        self.pattern = pattern
+        self.built = json.loads(self.state_path.read_text()) if self.state_path.exists() else None
+        self._seen = None
+        self._last_change = None
+
+    def scan(self):
+        """{name: (mtime_ns, size)}, skipping Excel lock files and partial downloads"""
+        signatures = {}
+        for path in self.directory.glob(self.pattern):
+            if path.name.startswith(('~$', '.')):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signatures[path.name] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def record_baseline(self):
+        """Treat the workbooks present now as built (first run against existing outputs)"""
+        self.built = {name: {'sha256': file_digest(self.directory / name)} for name in self.scan()}
+        self.save()
+        logger.info(f"Recorded {len(self.built)} workbooks in {self.directory} as the built baseline")
+
+    def pending(self):
+        """(changed workbook paths, removed workbook names) relative to the last build"""
+        signatures = self.scan()
+        changed = []
+        for name, signature in sorted(signatures.items()):
+            entry = self.built.get(name)
+            if entry is not None and entry.get('signature') == list(signature):
+                continue
+            digest = file_digest(self.directory / name)
+            if entry is None or digest not in (entry['sha256'], entry.get('failed')):
+                changed.append(self.directory / name)
+            elif digest == entry['sha256']:
+                entry['signature'] = list(signature)
+        removed = sorted(name for name in self.built if name not in signatures)
+        return changed, removed
+
+    def poll(self, now=None):
+        """A settled batch of (changed, removed) workbooks, or None"""
+        now = time.monotonic() if now is None else now
+        signatures = self.scan()
+        if signatures != self._seen:
+            if self._seen is not None:
+                self._last_change = now
+            self._seen = signatures
+            return None
+        if self._last_change is None or now - self._last_change < self.debounce:
+            return None
+        self._last_change = None
+        changed, removed = self.pending()
+        return (changed, removed) if changed or removed else None
+
+    def mark_built(self, changed, removed, failed=()):
+        for path in changed:
+            stat = path.stat()
+            entry = self.built.setdefault(path.name, {})
+            digest = file_digest(path)
+            if path.name in failed:
+                # Not retried until the file changes again
+                entry['failed'] = digest
+                entry.setdefault('sha256', None)
+            else:
+                entry.update(sha256=digest, signature=[stat.st_mtime_ns, stat.st_size])
+                entry.pop('failed', None)
+        for name in removed:
+            self.built.pop(name, None)
+        self.save()
+
+    def save(self):
+        tmp = self.state_path.with_name(self.state_path.name + '.tmp')
+        tmp.write_text(json.dumps(self.built, indent=2, sort_keys=True))
+        tmp.replace(self.state_path)
+
+class ALICEIncrementalBuilder:
+    """Per-state rebuild of every output downstream of the state workbooks
+
+    Rows are patched in place in the master and cleaned CSVs, the Arrow snapshots and the
+    GeoJSON exports; aggregates that span states (trend cubes, LISA hotspots, class breaks,
+    summary statistics, tiles, the Census analytics) are recomputed from the patched data.
+    The Excel copies of the master and cleaned datasets are left to full runs.
+    """
+
+    def __init__(self, input_dir="alice_state_data", master_dir="alice_master_data", clean_dir=CLEAN_DIR,
+                 tiger_dir="alice_tiger_output", census_dir="alice_census_output", data_dir="data/tiger",
+                 excel_backend=None):
+        self.input_dir = Path(input_dir)
+        self.master_dir = Path(master_dir)
+        self.clean_dir = Path(clean_dir)
+        self.tiger_dir = Path(tiger_dir)
+        self.census_dir = Path(census_dir)
+        self.data_dir = Path(data_dir)
+        self.excel_backend = excel_backend
+        self.master_dir.mkdir(exist_ok=True)
+        self.tracer = StageTracer('watch', self.master_dir)
+
+    def _consolidator(self):
+        return ALICEDataConsolidator(self.input_dir, self.master_dir, self.excel_backend)
+
+    @traced('parse')
+    def read_partitions(self, workbooks):
+        """County and subcounty rows of the given workbooks, plus the ones that failed to parse
+
+        Each workbook is parsed on its own, so one that fails partway (say after its
+        County sheet) contributes no rows at all rather than half a state.
+        """
+        county_parts, subcounty_parts, failed = [], [], []
+        for path in workbooks:
+            consolidator = self._consolidator()
+            try:
+                consolidator.process_single_file(path)
+            except Exception as e:
+                logger.error(f"Skipping {path.name}: {e}")
+                failed.append(path.name)
+                continue
+            county_parts.append(consolidator.master_county)
+            subcounty_parts.append(consolidator.master_subcounty)
+
+        def combined(parts):
+            parts = [part for part in parts if not part.empty]
+            return alice_schema.apply_schema(pd.concat(parts, ignore_index=True) if parts else pd.DataFrame())
+        return combined(county_parts), combined(subcounty_parts), failed
+
+    @traced('consolidate')
+    def patch_master(self, sources, county_rows, subcounty_rows):
+        """Swap the workbooks' rows in the master CSVs; returns the patched frames and affected states"""
+        patched = {}
+        states, county_fips, subcounty_fips = set(), set(), set()
+        for level, rows in [('County', county_rows), ('Subcounty', subcounty_rows)]:
+            path = self.master_dir / f"ALICE_Master_{level}_Data.csv"
+            master = alice_schema.read_csv(path) if path.exists() else rows.iloc[:0]
+            mask = master['Data_Source_File'].astype(str).isin(sources).to_numpy() if len(master) else []
+            old = master[mask] if len(master) else master
+
+            for frame in (old, rows):
+                if 'State' in frame.columns:
+                    states.update(frame['State'].dropna().astype(str))
+                if 'GEO id2' in frame.columns:
+                    if level == 'County':
+                        county_fips.update(code[:2] for code in alice_schema.fips_codes(frame['GEO id2']) if code)
+                    else:
+                        subcounty_fips.update(_subcounty_fips(frame['GEO id2']))
+
+            patched[level] = replace_partition(master, mask, rows) if len(master) else rows
+            _write_csv(patched[level], path)
+            logger.info(f"Master {level.lower()} data: replaced {int(np.sum(mask)):,} rows with {len(rows):,}")
+        return patched['County'], patched['Subcounty'], states, county_fips, subcounty_fips
+
+    @traced('clean')
+    def patch_clean(self, county_df, subcounty_df):
+        """Current-year, mapping and time series CSVs plus the aggregates, from the patched masters"""
+        self.clean_dir.mkdir(exist_ok=True)
+        current_county = county_df[county_df['Year'] == county_df['Year'].max()].copy()
+        current_subcounty = subcounty_df[subcounty_df['Year'] == subcounty_df['Year'].max()].copy()
+
+        outputs = {
+            'ALICE_Current_County_Data.csv': current_county,
+            'ALICE_Current_Subcounty_Data.csv': current_subcounty,
+            'ALICE_TimeSeries_County_Data.csv': county_df,
+            'ALICE_TimeSeries_Subcounty_Data.csv': subcounty_df,
+            'ALICE_Mapping_County_Data.csv': current_county[MAPPING_FIELDS],
+            'ALICE_Mapping_Subcounty_Data.csv': current_subcounty[SUBCOUNTY_MAPPING_FIELDS],
+        }
+        for name, frame in outputs.items():
+            _write_csv(frame, self.clean_dir / name)
+        create_aggregates(county_df, current_county, self.clean_dir)
+        return current_county[MAPPING_FIELDS]
+
+    def _integrator(self):
+        from alice_tiger_integration import ALICETigerIntegrator
+        integrator = ALICETigerIntegrator(self.data_dir, self.clean_dir, self.tiger_dir)
+        # Spans from the integrator's traced methods land in this rebuild's report
+        integrator.tracer = self.tracer
+        return integrator
+
+    @traced('join')
+    def patch_county_join(self, mapping_county, fips):
+        """Refresh the states' ALICE attributes on the joined counties without re-reading TIGER"""
+        from alice_snapshot import open_snapshot
+        from alice_tiger_integration import COUNTY_WEB_COLUMNS, web_column_precision
+
+        snapshot = self.tiger_dir / "alice_counties_choropleth.arrow"
+        if not snapshot.exists():
+            logger.warning(f"{snapshot} not found; run `alice integrate-tiger` once before watching")
+            return None
+
+        integrator = self._integrator()
+        gdf = open_snapshot(snapshot).to_geodataframe()
+        before = gdf.drop(columns=[gdf.geometry.name]).copy()
+
+        rows = mapping_county.assign(FIPS=alice_schema.fips_codes(mapping_county['GEO id2']))
+        rows = rows[rows['FIPS'].str[:2].isin(fips)]
+        unkeyed = rows[rows['FIPS'].str.len() != 5]
+        if len(unkeyed):
+            logger.warning(f"{len(unkeyed)} county rows have no FIPS code; a full `alice integrate-tiger` "
+                           "run matches them by name")
+        rows = rows[rows['FIPS'].str.len() == 5].drop_duplicates('FIPS').set_index('FIPS')
+
+        in_state = gdf['GEOID'].astype(str).str[:2].isin(fips).to_numpy()
+        for col in MAPPING_FIELDS:
+            if col in gdf.columns:
+                updates = gdf['GEOID'].map(rows[col].astype(object))
+                gdf[col] = gdf[col].astype(object).where(~in_state, updates)
+        gdf = alice_schema.apply_schema(gdf)
+
+        # Hotspots depend on neighbours and national moments, so they're recomputed for
+        # every county (the contiguity weights come from the cache: geometry is unchanged)
+        integrator.create_spatial_autocorrelation(gdf)
+
+        save_snapshot(gdf, snapshot)
+        gdf.drop(columns=[gdf.geometry.name]).to_csv(self.tiger_dir / "alice_counties_choropleth_data.csv", index=False)
+
+        attributes = gdf.drop(columns=[gdf.geometry.name])
+        changed = ~(attributes.astype(object).fillna(-1) == before.reindex(columns=attributes.columns).astype(object).fillna(-1)).all(axis=1)
+        changed = changed.to_numpy()
+        full_path = self.tiger_dir / "alice_counties_choropleth.geojson"
+        if full_path.exists():
+            patch_geojson(full_path, attributes[changed], float_digits=FULL_FLOAT_DIGITS)
+        web_path = self.tiger_dir / "alice_counties_web.geojson"
+        if web_path.exists():
+            web_columns = [col for col in COUNTY_WEB_COLUMNS + [c for c in attributes.columns if '_LISA_' in c]
+                           if col in attributes.columns]
+            patch_geojson(web_path, attributes.loc[changed, web_columns],
+                          column_precision=web_column_precision(web_columns))
+
+        integrator.create_class_breaks(gdf)
+        integrator.create_summary_stats(gdf)
+        if (self.tiger_dir / "tiles").exists():
+            integrator.create_tiles(gdf, 'counties')
+        logger.info(f"Patched {int(in_state.sum())} counties in {len(fips)} states ({int(changed.sum())} rows changed)")
+        return gdf
+
+    @traced('join')
+    def patch_subcounty_join(self, fips):
+        """Re-join the states' subcounty partitions and splice them into the national outputs"""
+        import geopandas as gpd
+        from alice_snapshot import open_snapshot
+        from alice_tiger_integration import (SUBCOUNTY_LAYERS, SUBCOUNTY_WEB_COLUMNS, _integrate_subcounty_state,
+                                             web_column_precision)
+
+        snapshot = self.tiger_dir / "alice_subcounty_choropleth.arrow"
+        if not snapshot.exists():
+            logger.info("No subcounty join yet; skipping subcounty partitions")
+            return None
+
+        integrator = self._integrator()
+        alice_df = integrator.load_alice_subcounty_data()
+        alice_file = self.clean_dir / "ALICE_Mapping_Subcounty_Data.csv"
+        cache_dir = self.tiger_dir / "subcounty_states"
+        cache_dir.mkdir(exist_ok=True)
+
+        jobs = []
+        for state_fips in sorted(fips):
+            layer_zips = {layer: path for layer in SUBCOUNTY_LAYERS
+                          if (path := integrator.find_state_layer_zip(state_fips, layer)) is not None}
+            state_df = alice_df[alice_df['STATEFP'] == state_fips].drop(columns=['STATEFP'])
+            if layer_zips and len(state_df):
+                jobs.append((state_fips, layer_zips, state_df))
+            else:
+                logger.warning(f"State {state_fips}: no subcounty rows or TIGER layers; dropping its partition")
+
+        partitions = {}
+        with ProcessPoolExecutor(max_workers=max(1, min(len(jobs), 4))) as executor:
+            futures = [executor.submit(_integrate_subcounty_state, state_fips, layer_zips, state_df,
+                                       alice_file, cache_dir, 0.001)
+                       for state_fips, layer_zips, state_df in jobs]
+            for future in futures:
+                state_fips, joined_path, web_path, _ = future.result()
+                partitions[state_fips] = (joined_path, web_path)
+
+        gdf = open_snapshot(snapshot).to_geodataframe()
+        before = gdf.drop(columns=[gdf.geometry.name]).set_index('GEOID')
+        old_keys = gdf.loc[gdf['GEOID'].astype(str).str[:2].isin(fips), 'GEOID'].astype(str)
+        in_state = gdf['GEOID'].astype(str).str[:2].isin(fips).to_numpy()
+        joined = [gpd.read_file(paths[0]) for paths in partitions.values()]
+        rows = gpd.GeoDataFrame(pd.concat(joined, ignore_index=True), crs=joined[0].crs) if joined else gdf.iloc[:0]
+        # The national subcounty outputs keep the partitions' float64 values (see
+        # save_subcounty_choropleth_data), so the spliced rows aren't downcast
+        gdf = gpd.GeoDataFrame(replace_partition(gdf, in_state, rows, schema=False), crs=gdf.crs)
+
+        integrator.create_spatial_autocorrelation(gdf, group_column='TIGER_Layer',
+                                                  stats_name="alice_subcounty_morans_i.json")
+        lisa_columns = [col for col in gdf.columns if '_LISA_' in col]
+        save_snapshot(gdf, snapshot)
+        gdf.drop(columns=['geometry']).to_csv(self.tiger_dir / "alice_subcounty_choropleth_data.csv", index=False)
+
+        # The states' features are replaced outright; elsewhere only hotspot attributes move
+        new_keys = set(rows['GEOID'].astype(str)) if len(rows) else set()
+        is_new = gdf['GEOID'].astype(str).isin(new_keys).to_numpy()
+        others = gdf.loc[~is_new, ['GEOID'] + lisa_columns]
+        previous = before.reindex(others['GEOID'])[lisa_columns]
+        moved = ~(others[lisa_columns].astype(object).fillna(-1).to_numpy()
+                  == previous.astype(object).fillna(-1).to_numpy()).all(axis=1)
+
+        full_path = self.tiger_dir / "alice_subcounty_choropleth.geojson"
+        if full_path.exists():
+            patch_geojson(full_path, gdf[is_new], remove=old_keys, quantize=False, float_digits=FULL_FLOAT_DIGITS)
+            if moved.any():
+                patch_geojson(full_path, others[moved], float_digits=FULL_FLOAT_DIGITS)
+
+        web_path = self.tiger_dir / "alice_subcounty_web.geojson"
+        if web_path.exists():
+            precision = web_column_precision(lisa_columns)
+            web_rows = [gpd.read_file(paths[1]) for paths in partitions.values()]
+            if web_rows:
+                web = gpd.GeoDataFrame(pd.concat(web_rows, ignore_index=True), crs=web_rows[0].crs)
+                web = web[[col for col in SUBCOUNTY_WEB_COLUMNS if col in web.columns]]
+                web = web.merge(gdf[['GEOID'] + lisa_columns], on='GEOID', how='left')
+            else:
+                web = gdf.iloc[:0][['GEOID', 'geometry']]
+            patch_geojson(web_path, web, remove=old_keys, column_precision=precision)
+            if moved.any():
+                patch_geojson(web_path, others[moved], column_precision=precision)
+
+        if (self.tiger_dir / "tiles").exists():
+            integrator.create_tiles(gdf, 'subcounty')
+        logger.info(f"Spliced subcounty partitions for {len(partitions)} states "
+                    f"({len(old_keys):,} areas out, {len(rows):,} in)")
+        return gdf
+
+    @traced('census')
+    def patch_census(self, county_gdf):
+        """Carry the patched county attributes into the Census join and rerun its national analytics
+
+        The ACS demographics don't depend on the workbooks, so the ACS fetch and the join
+        are skipped: the county columns (ALICE values and hotspots) are copied over, the
+        ALICE populations re-derived, and the GeoJSON exports patched for the rows that
+        moved. Correlations, the similarity index, threshold scenarios and the summary
+        statistics span states and are recomputed from the patched frame.
+        """
+        from alice_snapshot import open_snapshot
+        from alice_census_integration import ALICECensusIntegrator, CENSUS_WEB_COLUMNS, add_alice_populations
+
+        integrator = ALICECensusIntegrator(self.data_dir, self.clean_dir, self.census_dir)
+        integrator.tracer = self.tracer
+        snapshot = self.census_dir / "alice_census_integrated.arrow"
+        gdf = open_snapshot(snapshot).to_geodataframe()
+        before = gdf.drop(columns=[gdf.geometry.name]).copy()
+
+        source = county_gdf.drop(columns=[county_gdf.geometry.name]).drop_duplicates('GEOID').set_index('GEOID')
+        known = gdf['GEOID'].isin(source.index).to_numpy()
+        updates = source.reindex(gdf['GEOID'])
+        for col in source.columns:
+            if col in gdf.columns:
+                gdf[col] = gdf[col].astype(object).where(~known, updates[col].astype(object).to_numpy())
+        gdf = add_alice_populations(alice_schema.apply_schema(gdf))
+
+        save_snapshot(gdf, snapshot)
+        attributes = gdf.drop(columns=[gdf.geometry.name])
+        attributes.to_csv(self.census_dir / "alice_census_data.csv", index=False)
+
+        changed = ~(attributes.astype(object).fillna(-1) == before.reindex(columns=attributes.columns).astype(object).fillna(-1)).all(axis=1)
+        changed = changed.to_numpy()
+        full_path = self.census_dir / "alice_census_integrated.geojson"
+        if full_path.exists():
+            patch_geojson(full_path, attributes[changed], float_digits=4)
+        web_path = self.census_dir / "alice_census_web.geojson"
+        if web_path.exists():
+            web_columns = [col for col in CENSUS_WEB_COLUMNS if col in attributes.columns]
+            patch_geojson(web_path, attributes.loc[changed, web_columns])
+
+        integrator.save_stats(gdf)
+        integrator.compute_correlation_analytics(gdf)
+        integrator.build_similarity_index(gdf)
+        integrator.simulate_threshold_scenarios(gdf)
+        logger.info(f"Patched the Census join: {int(changed.sum())} of {len(gdf)} counties changed")
+        return gdf
+
+    def rebuild(self, changed, removed=()):
+        """Rebuild the partitions of changed workbooks and drop those of removed ones"""
+        start = time.perf_counter()
+        self.tracer = StageTracer('watch', self.master_dir)
+        consolidator = self._consolidator()
+        sources = [consolidator.extract_state_name(name) for name in [path.name for path in changed] + list(removed)]
+
+        county_rows, subcounty_rows, failed = self.read_partitions(changed)
+        failed_sources = {consolidator.extract_state_name(name) for name in failed}
+        # A workbook that didn't parse keeps its previously built rows
+        sources = [source for source in sources if source not in failed_sources]
+        if not sources:
+            return {'failed': failed, 'states': [], 'seconds': time.perf_counter() - start}
+
+        county_df, subcounty_df, states, county_fips, subcounty_fips = self.patch_master(
+            sources, county_rows, subcounty_rows)
+        mapping_county = self.patch_clean(county_df, subcounty_df)
+
+        county_gdf = self.patch_county_join(mapping_county, county_fips) if county_fips else None
+        if subcounty_fips:
+            self.patch_subcounty_join(subcounty_fips)
+        if county_gdf is not None and (self.census_dir / "alice_census_integrated.arrow").exists():
+            self.patch_census(county_gdf)
+            from alice_factsheets import FACTSHEET_DIR, MANIFEST_NAME as FACTSHEET_MANIFEST, ALICEFactSheetGenerator
+            if (FACTSHEET_DIR / FACTSHEET_MANIFEST).exists():
+                # Only the sheets whose rows (or state comparisons) changed are re-rendered
+                ALICEFactSheetGenerator().generate()
+
+        from alice_publish import PUBLISH_DIR, MANIFEST_NAME, ALICEPublisher
+        if (PUBLISH_DIR / MANIFEST_NAME).exists():
+            ALICEPublisher().publish()
+
+        self.tracer.write_report("alice_watch_report.json")
+        seconds = time.perf_counter() - start
+        logger.info(f"Rebuilt {len(states)} states ({', '.join(sorted(states))}) in {seconds:.1f}s")
+        return {'failed': failed, 'states': sorted(states), 'seconds': seconds}
+
+def main():
+    """Watch the state data directory and rebuild changed states as workbooks arrive"""
+    parser = argparse.ArgumentParser(description="Rebuild ALICE outputs state by state as workbooks arrive")
+    parser.add_argument('--input-dir', default="alice_state_data")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL_S, help="Seconds between scans")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_S,
+                        help="Quiet seconds after the last change before rebuilding")
+    parser.add_argument('--once', action='store_true', help="Rebuild whatever changed since the last build and exit")
+    args = parser.parse_args()
+
+    builder = ALICEIncrementalBuilder(input_dir=args.input_dir)
+    watcher = WorkbookWatcher(args.input_dir, builder.master_dir / STATE_FILE, debounce=args.debounce)
+    if watcher.built is None:
+        watcher.record_baseline()
+
+    def run(batch):
+        changed, removed = batch
+        logger.info(f"Rebuilding: {len(changed)} new or changed, {len(removed)} removed workbooks")
+        result = builder.rebuild(changed, removed)
+        watcher.mark_built(changed, removed, failed=result['failed'])
+        return result
+
+    if args.once:
+        changed, removed = watcher.pending()
+        if changed or removed:
+            run((changed, removed))
+        else:
+            print("Nothing to rebuild")
+        return
+
+    print(f"Watching {watcher.directory} (debounce {args.debounce:.0f}s); Ctrl-C to stop")
+    try:
+        while True:
+            batch = watcher.poll()
+            if batch is not None:
+                try:
+                    result = run(batch)
+                    print(f"Rebuilt {', '.join(result['states']) or 'nothing'} in {result['seconds']:.1f}s")
+                except Exception as e:
+                    # Keep watching; the batch is retried when its workbooks change again
+                    logger.error(f"Rebuild failed: {e}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
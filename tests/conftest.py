@@ -0,0 +1,68 @@
+import sys
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The pipeline stages are top-level modules in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# States and grid size of the synthetic TIGER place layers
+PLACE_STATES = {'41': 'Oregon', '53': 'Washington'}
+PLACE_GRID = 4
+
+def write_place_layer(data_dir, state_fips, origin):
+    """A cb_2023_<fips>_place_500k.zip of PLACE_GRID x PLACE_GRID adjacent square places"""
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    records, geometries = [], []
+    for i in range(PLACE_GRID * PLACE_GRID):
+        x, y = origin + i % PLACE_GRID * 0.1, 45 + i // PLACE_GRID * 0.1
+        name = f"Place {i + 1}"
+        records.append({'STATEFP': state_fips, 'GEOID': f"{state_fips}{i + 1:05d}", 'NAME': name,
+                        'NAMELSAD': f"{name} city"})
+        geometries.append(box(x, y, x + 0.1, y + 0.1))
+
+    shp_dir = data_dir / f"shp_{state_fips}"
+    shp_dir.mkdir(parents=True)
+    gpd.GeoDataFrame(records, geometry=geometries, crs='EPSG:4269').to_file(shp_dir / "place.shp")
+    with zipfile.ZipFile(data_dir / f"cb_2023_{state_fips}_place_500k.zip", 'w') as zip_ref:
+        for component in shp_dir.iterdir():
+            zip_ref.write(component, component.name)
+
+def subcounty_rows(state_fips, state, seed=0):
+    """ALICE mapping rows for every synthetic place of one state"""
+    rng = np.random.default_rng(seed)
+    n = PLACE_GRID * PLACE_GRID
+    alice = rng.uniform(10, 40, n).round(2)
+    poverty = rng.uniform(5, 20, n).round(2)
+    return pd.DataFrame({
+        'State': state,
+        'Type': 'Place',
+        'GEO id2': [int(f"{state_fips}{i + 1:05d}") for i in range(n)],
+        'GEO display_label': [f"Place {i + 1} city, {state}" for i in range(n)],
+        'County': 'County 1',
+        'Households': rng.integers(100, 5000, n),
+        'Poverty_Percentage': poverty,
+        'ALICE_Percentage': alice,
+        'Below_ALICE_Threshold_Percentage': (alice + poverty).round(2),
+        'Above_ALICE_Percentage': (100 - alice - poverty).round(2),
+    })
+
+@pytest.fixture
+def subcounty_workspace(tmp_path):
+    """tmp_path with data/tiger place layers and alice_clean_data subcounty mapping rows"""
+    data_dir = tmp_path / "data" / "tiger"
+    data_dir.mkdir(parents=True)
+    for s, state_fips in enumerate(PLACE_STATES):
+        write_place_layer(data_dir, state_fips, origin=-124 + s)
+
+    clean_dir = tmp_path / "alice_clean_data"
+    clean_dir.mkdir()
+    mapping = pd.concat([subcounty_rows(fips, state, seed=s) for s, (fips, state) in enumerate(PLACE_STATES.items())],
+                        ignore_index=True)
+    mapping.to_csv(clean_dir / "ALICE_Mapping_Subcounty_Data.csv", index=False)
+    return tmp_path
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import alice
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Fastest of a few runs, so one slow scheduler tick doesn't fail the budget
+STARTUP_RUNS = 3
+
+# Runs `alice --help` in-process and reports the heavy modules it left in sys.modules
+LOADED_MODULES_SCRIPT = """
+import json, sys
+import alice
+try:
+    alice.main(['--help'])
+except SystemExit:
+    pass
+print(json.dumps(sorted(name for name in alice.HEAVY_MODULES if name in sys.modules)))
+"""
+
+def test_help_starts_within_budget():
+    timings = []
+    for _ in range(STARTUP_RUNS):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, str(REPO_ROOT / 'alice.py'), '--help'],
+                                capture_output=True, text=True, cwd=REPO_ROOT)
+        timings.append(time.perf_counter() - start)
+        assert result.returncode == 0
+        assert 'usage' in result.stdout.lower()
+
+    assert min(timings) < alice.STARTUP_BUDGET_S
+
+def test_help_does_not_import_heavy_modules():
+    result = subprocess.run([sys.executable, '-c', LOADED_MODULES_SCRIPT],
+                            capture_output=True, text=True, cwd=REPO_ROOT, check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
@@ -0,0 +1,26 @@
+import pandas as pd
+import pandas.testing as pdt
+
+from alice_delta import apply_patch, diff_releases
+
+def write_release(path, households, states):
+    frame = pd.DataFrame({
+        'GEOID': ['01001', '01003', '01005'][:len(households)],
+        'State': states,
+        'Households': households,
+        'ALICE_Percentage': [31.5, 28.25, 40.0][:len(households)],
+    })
+    frame.to_csv(path, index=False)
+    return frame
+
+def test_csv_patch_applied_to_frame_keeps_dtypes(tmp_path):
+    write_release(tmp_path / 'old.csv', [100, 200], ['Alabama', 'Alabama'])
+    write_release(tmp_path / 'new.csv', [100, 250, 300], ['Alabama', 'Alabama', 'Alabama'])
+    patch = diff_releases(tmp_path / 'old.csv', tmp_path / 'new.csv')
+
+    base = pd.read_csv(tmp_path / 'old.csv', dtype={'GEOID': str})
+    updated = apply_patch(base, patch)
+    expected = pd.read_csv(tmp_path / 'new.csv', dtype={'GEOID': str})
+
+    pdt.assert_frame_equal(updated, expected)
+    assert updated['Households'].dtype == base['Households'].dtype
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from alice_factsheets import MANIFEST_NAME, ALICEFactSheetGenerator
+from alice_snapshot import save_snapshot
+
+def census_frame():
+    """Four Alabama counties plus two TIGER counties the ALICE data doesn't cover"""
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    geoids = ['01001', '01003', '01005', '01007', '72001', '78010']
+    matched = [True, True, True, True, False, False]
+    alice = [31.5, 28.0, 40.25, 35.0, np.nan, np.nan]
+    poverty = [12.0, 10.5, 20.0, 15.5, np.nan, np.nan]
+    return gpd.GeoDataFrame({
+        'GEOID': geoids,
+        'NAME': ['Autauga', 'Baldwin', 'Barbour', 'Bibb', 'Adjuntas', 'St. Croix'],
+        'State': ['Alabama' if m else None for m in matched],
+        # One matched county is missing its label too
+        'GEO display_label': ['Autauga County, Alabama', 'Baldwin County, Alabama', None,
+                              'Bibb County, Alabama', None, None],
+        'Households': [20000, 80000, 9000, 7000, np.nan, np.nan],
+        'ALICE_Percentage': alice,
+        'Poverty_Percentage': poverty,
+        'Above_ALICE_Percentage': [100 - a - p for a, p in zip(alice, poverty)],
+        'Median_Household_Income': [65000, 70000, 38000, 50000, np.nan, np.nan],
+    }, geometry=[box(i, 0, i + 1, 1) for i in range(len(geoids))], crs='EPSG:4269')
+
+def test_counties_without_alice_data_get_no_sheet(tmp_path):
+    source = tmp_path / "alice_census_integrated.arrow"
+    save_snapshot(census_frame(), source)
+    output_dir = tmp_path / "alice_factsheets"
+
+    result = ALICEFactSheetGenerator(source, output_dir, max_workers=1).generate()
+
+    assert result['rendered'] == 4 and result['failed'] == 0
+    assert sorted(json.loads((output_dir / MANIFEST_NAME).read_text())) == ['01001', '01003', '01005', '01007']
+    assert not (output_dir / "72").exists()
+    assert 'Barbour' in (output_dir / "01" / "01005.html").read_text()
+    index = (output_dir / "index.html").read_text()
+    assert 'Alabama' in index and 'nan' not in index
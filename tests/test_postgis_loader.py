@@ -0,0 +1,106 @@
+"""PostGIS loader tests; the database ones need ALICE_DATABASE_URL pointing at a throwaway
+PostGIS-enabled database (each test works in its own schema and drops it afterwards)"""
+
+import os
+import uuid
+
+import pandas as pd
+import pytest
+
+from alice_postgis_loader import DATABASE_URL_ENV_VAR, MAX_IDENTIFIER_LENGTH, ALICEPostGISLoader, pg_identifier
+
+DATABASE_URL = os.environ.get(DATABASE_URL_ENV_VAR)
+requires_database = pytest.mark.skipif(not DATABASE_URL, reason=f"{DATABASE_URL_ENV_VAR} is not set")
+
+# Long enough to push generated partition, staging and index names past 63 bytes
+LONG_STATE = 'District of Columbia'
+
+def test_long_identifiers_are_shortened_uniquely():
+    partition = 'alice_subcounty_history_p_2023_district_of_columbia'
+    names = [pg_identifier(f"{partition}__stg_geo_id2_idx"), pg_identifier(f"{partition}_geo_id2_idx"),
+             pg_identifier(f"{partition}__stg_partition_key_idx")]
+    assert all(len(name.encode()) <= MAX_IDENTIFIER_LENGTH for name in names)
+    assert len(set(names)) == len(names)
+    assert pg_identifier('alice_counties_geom_idx') == 'alice_counties_geom_idx'
+
+@pytest.fixture
+def loader():
+    psycopg = pytest.importorskip('psycopg')
+    schema = f"alice_test_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(f'CREATE SCHEMA "{schema}"')
+    yield ALICEPostGISLoader(DATABASE_URL, schema)
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(f'DROP SCHEMA "{schema}" CASCADE')
+
+def query(loader, statement, params=()):
+    with loader.connect() as conn:
+        return conn.execute(statement, params).fetchall()
+
+def counties(households):
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    return gpd.GeoDataFrame({
+        'GEOID': ['01001', '01003', '11001'],
+        'State': ['Alabama', 'Alabama', LONG_STATE],
+        'Households': households,
+    }, geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1), box(2, 0, 3, 1)], crs='EPSG:4326')
+
+def history(households):
+    rows = [(year, state, geo_id) for year in (2021, 2023)
+            for state, geo_id in [('Alabama', 1001.0), ('Alabama', 1003.0), (LONG_STATE, 11001.0)]]
+    df = pd.DataFrame(rows, columns=['Year', 'State', 'GEO id2'])
+    df['Households'] = households
+    return df
+
+@requires_database
+def test_full_load(loader):
+    assert loader.load_table(counties([10, 20, 30]), 'alice_counties') == 3
+
+    rows = query(loader, f'SELECT "GEOID", "Households", GeometryType(geometry), ST_SRID(geometry) '
+                         f'FROM "{loader.schema}".alice_counties ORDER BY "GEOID"')
+    assert [row[:2] for row in rows] == [('01001', 10), ('01003', 20), ('11001', 30)]
+    assert {row[2:] for row in rows} == {('MULTIPOLYGON', 4326)}
+
+    indexes = {row[0] for row in query(loader, 'SELECT indexname FROM pg_indexes WHERE schemaname = %s',
+                                       [loader.schema])}
+    assert indexes == {'alice_counties_geom_idx', 'alice_counties_geoid_idx'}
+
+@requires_database
+def test_reload_swaps_in_new_table(loader):
+    loader.load_table(counties([10, 20, 30]), 'alice_counties')
+    loader.load_table(counties([11, 21, 31]), 'alice_counties')
+
+    rows = query(loader, f'SELECT "Households" FROM "{loader.schema}".alice_counties ORDER BY "GEOID"')
+    assert [row[0] for row in rows] == [11, 21, 31]
+    tables = {row[0] for row in query(loader, 'SELECT tablename FROM pg_tables WHERE schemaname = %s',
+                                      [loader.schema])}
+    assert tables == {'alice_counties'}
+    indexes = {row[0] for row in query(loader, 'SELECT indexname FROM pg_indexes WHERE schemaname = %s',
+                                       [loader.schema])}
+    assert indexes == {'alice_counties_geom_idx', 'alice_counties_geoid_idx'}
+
+@requires_database
+def test_single_partition_reload(loader):
+    table = 'alice_subcounty_history'
+    loader.load_partitioned(history([1, 2, 3, 4, 5, 6]), table, ['Year', 'State'], index_columns=('GEO id2',))
+    partitions = query(loader, 'SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass(%s)',
+                       [f"{loader.schema}.{table}"])
+    assert partitions[0][0] == 4
+
+    loaded = loader.load_partitioned(history([1, 2, 3, 4, 5, 60]), table, ['Year', 'State'],
+                                     partitions=[(2023, LONG_STATE)], index_columns=('GEO id2',))
+    assert loaded == 1
+
+    rows = query(loader, f'SELECT "Year", "State", "Households" FROM "{loader.schema}".{table} '
+                         f'ORDER BY "Year", "GEO id2"')
+    assert [row[2] for row in rows] == [1, 2, 3, 4, 5, 60]
+    assert query(loader, 'SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass(%s)',
+                 [f"{loader.schema}.{table}"])[0][0] == 4
+    # The parent, its four partitions, and three indexes on each of them; no staging leftovers
+    tables = query(loader, 'SELECT tablename FROM pg_tables WHERE schemaname = %s', [loader.schema])
+    indexes = query(loader, 'SELECT indexname FROM pg_indexes WHERE schemaname = %s', [loader.schema])
+    assert len(tables) == 5
+    assert len(indexes) == 15
+    assert all(len(name.encode()) <= MAX_IDENTIFIER_LENGTH for (name,) in tables + indexes)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from alice_spatial import draw_neighbours
+
+def test_neighbour_draws_are_without_replacement():
+    rng = np.random.default_rng(0)
+    # Feature 0 needs every other feature: only a without-replacement draw can manage it
+    counts = np.array([5, 2, 1, 0, 3, 5])
+    draws = draw_neighbours(rng, counts, batch=200)
+    assert draws.shape == (6, 200, 5)
+
+    for feature, count in enumerate(counts):
+        valid = draws[feature, :, :count]
+        assert (draws[feature, :, count:] == -1).all()
+        assert (valid != feature).all()
+        assert ((valid >= 0) & (valid < 6)).all()
+        for row in valid:
+            assert len(set(row.tolist())) == count
+    assert sorted(draws[0, 0].tolist()) == [1, 2, 3, 4, 5]
+
+def test_neighbour_draws_cover_other_features_uniformly():
+    rng = np.random.default_rng(1)
+    draws = draw_neighbours(rng, np.array([3] * 10), batch=2000)
+    hits = np.bincount(draws[0].ravel(), minlength=10)
+    assert hits[0] == 0
+    expected = 2000 * 3 / 9
+    assert np.all(np.abs(hits[1:] - expected) < 0.1 * expected)
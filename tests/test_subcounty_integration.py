@@ -0,0 +1,35 @@
+import json
+
+import pandas as pd
+
+from alice_geojson import patch_geojson
+from alice_snapshot import open_snapshot
+from alice_tiger_integration import ALICETigerIntegrator
+from conftest import PLACE_GRID, PLACE_STATES
+
+def test_national_subcounty_outputs_stream_from_state_partitions(subcounty_workspace):
+    root = subcounty_workspace
+    integrator = ALICETigerIntegrator(root / "data" / "tiger", root / "alice_clean_data", root / "alice_tiger_output")
+    state_outputs = integrator.create_subcounty_choropleth_data(max_workers=1)
+    assert sorted(state_outputs) == sorted(PLACE_STATES)
+
+    joined_gdf, geojson_path, web_path = integrator.save_subcounty_choropleth_data(state_outputs)
+    n = len(PLACE_STATES) * PLACE_GRID * PLACE_GRID
+    assert len(joined_gdf) == n
+
+    full = json.loads(geojson_path.read_text())
+    web = json.loads(web_path.read_text())
+    snapshot = open_snapshot(root / "alice_tiger_output" / "alice_subcounty_choropleth.arrow")
+    assert len(full['features']) == len(web['features']) == len(snapshot) == n
+
+    by_geoid = {feature['properties']['GEOID']: feature['properties'] for feature in full['features']}
+    expected = joined_gdf.set_index('GEOID')
+    for geoid, properties in by_geoid.items():
+        assert properties['ALICE_Percentage'] == expected.loc[geoid, 'ALICE_Percentage']
+        assert properties['ALICE_Percentage_LISA_Cluster'] == expected.loc[geoid, 'ALICE_Percentage_LISA_Cluster']
+    assert all('ALICE_Percentage_LISA_p' in feature['properties'] for feature in web['features'])
+
+    # Written one feature per line, so watch mode can patch it in place
+    patch_geojson(geojson_path, pd.DataFrame({'GEOID': ['4100001'], 'Households': [1]}))
+    patched = {f['properties']['GEOID']: f['properties'] for f in json.loads(geojson_path.read_text())['features']}
+    assert patched['4100001']['Households'] == 1
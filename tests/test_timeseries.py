@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from alice_timeseries import ALICETimeSeriesStore
+
+def make_frame(years):
+    return pd.DataFrame({
+        'GEO id2': [1001.0] * len(years),
+        'State': ['Alabama'] * len(years),
+        'State Abbr': ['AL'] * len(years),
+        'County': ['Autauga'] * len(years),
+        'Year': pd.array(years, dtype='Int64'),
+        'Households': [100.0, 110.0, 130.0, 999.0][:len(years)],
+    })
+
+def test_rows_without_year_are_skipped():
+    store = ALICETimeSeriesStore.from_frame(make_frame([2019, 2021, 2022, None]), metrics=['Households'])
+    assert store.years.tolist() == [2019, 2021, 2022]
+    assert store.series('01001', 'Households').tolist() == [100.0, 110.0, 130.0]
+
+def test_annualized_deltas_divide_by_year_gap():
+    store = ALICETimeSeriesStore.from_frame(make_frame([2019, 2021, 2022]), metrics=['Households'])
+    assert np.isnan(store.delta_series('01001', 'Households')[0])
+    assert store.delta_series('01001', 'Households')[1:].tolist() == [10.0, 20.0]
+    assert store.annualized_delta_series('01001', 'Households')[1:].tolist() == [5.0, 20.0]
@@ -0,0 +1,23 @@
+import tracemalloc
+
+from alice_tracing import TRACE_MEMORY_ENV_VAR, StageTracer
+
+def test_memory_tracing_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv(TRACE_MEMORY_ENV_VAR, raising=False)
+    tracemalloc.stop()
+    tracer = StageTracer('test', tmp_path)
+    assert not tracer.trace_memory
+    assert not tracemalloc.is_tracing()
+
+    with tracer.span('stage', 'method'):
+        pass
+    assert tracer.stage_summary()['stage']['peak_memory_mb'] is None
+
+def test_memory_tracing_enabled_by_env(tmp_path, monkeypatch):
+    monkeypatch.setenv(TRACE_MEMORY_ENV_VAR, '1')
+    try:
+        tracer = StageTracer('test', tmp_path)
+        assert tracer.trace_memory
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,89 @@
+import json
+
+import pandas as pd
+
+from alice_data_consolidator import ALICEDataConsolidator
+from alice_snapshot import open_snapshot
+from alice_tiger_integration import ALICETigerIntegrator
+from alice_watch import ALICEIncrementalBuilder
+from conftest import PLACE_STATES, subcounty_rows
+
+def write_workbook(input_dir, state, abbr, state_fips):
+    """A 2025_ALICE_<State>_Data_Sheet.xlsx with two counties and two places"""
+    county = pd.DataFrame({
+        'State': state, 'Year': 2022, 'GEO id2': [int(f"{state_fips}001"), int(f"{state_fips}003")],
+        'GEO display_label': [f"County 1, {state}", f"County 3, {state}"], 'County': ['County 1', 'County 3'],
+        'State Abbr': abbr, 'Households': [1000, 2000], 'Poverty Households': [100, 300],
+        'ALICE Households': [300, 500], 'Above ALICE Households': [600, 1200],
+    })
+    subcounty = pd.DataFrame({
+        'State': state, 'Year': 2022, 'Type': 'Place', 'GEO id2': [int(f"{state_fips}00001"), int(f"{state_fips}00002")],
+        'GEO display_label': [f"Place 1 city, {state}", f"Place 2 city, {state}"], 'Households': [400, 500],
+        'Poverty Households': [40, 60], 'ALICE Households': [120, 100], 'Above ALICE Households': [240, 340],
+        'County': 'County 1',
+    })
+    path = input_dir / f"2025_ALICE_{state}_Data_Sheet.xlsx"
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        county.to_excel(writer, sheet_name='County', index=False)
+        subcounty.to_excel(writer, sheet_name='Subcounty', index=False)
+    return path
+
+def test_workbook_failing_partway_contributes_no_rows(tmp_path, monkeypatch):
+    input_dir = tmp_path / "alice_state_data"
+    input_dir.mkdir()
+    workbooks = [write_workbook(input_dir, 'Oregon', 'OR', '41'),
+                 write_workbook(input_dir, 'Washington', 'WA', '53')]
+
+    clean_subcounty = ALICEDataConsolidator.clean_subcounty_data
+
+    def broken_washington(self, df, state_name):
+        if state_name == 'Washington':
+            raise ValueError("corrupt Subcounty sheet")
+        return clean_subcounty(self, df, state_name)
+
+    monkeypatch.setattr(ALICEDataConsolidator, 'clean_subcounty_data', broken_washington)
+
+    builder = ALICEIncrementalBuilder(input_dir=input_dir, master_dir=tmp_path / "alice_master_data")
+    county, subcounty, failed = builder.read_partitions(workbooks)
+
+    assert failed == [workbooks[1].name]
+    assert set(county['Data_Source_File'].astype(str)) == {'Oregon'}
+    assert set(subcounty['Data_Source_File'].astype(str)) == {'Oregon'}
+    assert len(county) == 2 and len(subcounty) == 2
+
+def build_subcounty_outputs(root, output_dir):
+    integrator = ALICETigerIntegrator(root / "data" / "tiger", root / "alice_clean_data", root / output_dir)
+    integrator.save_subcounty_choropleth_data(integrator.create_subcounty_choropleth_data(max_workers=1))
+    return root / output_dir
+
+def feature_properties(path):
+    return {feature['properties']['GEOID']: feature['properties'] for feature in json.loads(path.read_text())['features']}
+
+def test_patch_subcounty_join_matches_full_run(subcounty_workspace):
+    root = subcounty_workspace
+    tiger_dir = build_subcounty_outputs(root, "alice_tiger_output")
+
+    # Oregon's workbook is revised: new ALICE shares and one place dropped
+    mapping_path = root / "alice_clean_data" / "ALICE_Mapping_Subcounty_Data.csv"
+    mapping = pd.read_csv(mapping_path)
+    oregon = mapping['GEO id2'].astype(str).str[:2] == '41'
+    mapping.loc[oregon, 'ALICE_Percentage'] = subcounty_rows('41', PLACE_STATES['41'], seed=7)['ALICE_Percentage'].to_numpy()
+    mapping = mapping[mapping['GEO id2'] != 4100016]
+    mapping.to_csv(mapping_path, index=False)
+
+    builder = ALICEIncrementalBuilder(input_dir=root / "alice_state_data", master_dir=root / "alice_master_data",
+                                      clean_dir=root / "alice_clean_data", tiger_dir=tiger_dir,
+                                      data_dir=root / "data" / "tiger")
+    patched = builder.patch_subcounty_join({'41'})
+    expected_dir = build_subcounty_outputs(root, "expected_tiger_output")
+
+    assert '4100016' not in set(patched['GEOID'])
+    actual = open_snapshot(tiger_dir / "alice_subcounty_choropleth.arrow").to_pandas().set_index('GEOID')
+    expected = open_snapshot(expected_dir / "alice_subcounty_choropleth.arrow").to_pandas().set_index('GEOID')
+    assert sorted(actual.index) == sorted(expected.index)
+    actual = actual.loc[expected.index]
+    for col in ['ALICE_Percentage', 'ALICE_Percentage_LISA_p', 'ALICE_Percentage_LISA_Cluster']:
+        assert actual[col].tolist() == expected[col].tolist()
+
+    for name in ["alice_subcounty_choropleth.geojson", "alice_subcounty_web.geojson"]:
+        assert feature_properties(tiger_dir / name) == feature_properties(expected_dir / name)